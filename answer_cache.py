@@ -0,0 +1,214 @@
+# 시맨틱 답변 캐시 (질문 임베딩 유사도 기반)
+"""
+같은 질문을 조금씩 다르게 물어보는 경우 ("수학 공부는 어떻게 해야 할까요?" / "수학 공부 어떻게 하나요?")
+전체 파이프라인(복잡도 판별 → 파인튜닝/LangGraph → 재가공/평가)을 다시 돌리지 않고
+이전 답변을 바로 반환합니다.
+
+- 조회: 질문 임베딩과 코사인 유사도가 ANSWER_CACHE_THRESHOLD 이상인 가장 가까운 항목
+- 범위: 답변에 영향을 주는 프로필 필드(목표 대학, 계열), force_mode, 질문에 나온 대학/연도별로 분리
+  (임베딩이 거의 같은 "중앙대 편입 영어 시험 범위" / "한양대 편입 영어 시험 범위"가 서로 히트하지 않도록)
+- 만료: ANSWER_CACHE_TTL(초) 경과 시 제거
+- 무효화: GuidelineDB(Chroma 파일)가 바뀌면 이전 버전 항목은 모두 미스 처리
+- 최근 대화 내역이 있는 요청은 답변이 대화 맥락에 따라 달라지므로 캐시하지 않음
+
+사용법:
+    from answer_cache import get_answer_cache
+
+    cache = get_answer_cache()
+    scope = cache.scope_for(student_profile, recent_dialogues, force_mode, question=question)
+    hit, vector = cache.lookup(question, scope)
+    if hit is None:
+        result = ...
+        cache.store(vector, scope, result)
+"""
+
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from components import component
+from question_rules import question_entities
+from step3_db_and_search import get_embeddings_model, guideline_db_version
+
+
+ANSWER_CACHE_ENABLED = os.getenv("ANSWER_CACHE_ENABLED", "1") == "1"
+ANSWER_CACHE_THRESHOLD = float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.92"))
+ANSWER_CACHE_TTL = float(os.getenv("ANSWER_CACHE_TTL", str(24 * 60 * 60)))
+ANSWER_CACHE_MAX_ITEMS = int(os.getenv("ANSWER_CACHE_MAX_ITEMS", "2000"))
+
+# 답변에 영향을 주는 프로필 필드 (get_answer 기본값과 동일한 기본값 사용)
+SCOPE_FIELDS = (("target_university", "미지정"), ("track", "계열 미지정"))
+
+
+class AnswerCache:
+    """범위(scope)별 질문 임베딩 목록을 메모리에 보관하는 시맨틱 캐시"""
+
+    def __init__(
+        self,
+        threshold: float = ANSWER_CACHE_THRESHOLD,
+        ttl: float = ANSWER_CACHE_TTL,
+        max_items: int = ANSWER_CACHE_MAX_ITEMS,
+    ):
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_items = max_items
+
+        # scope -> [{"vector", "result", "created_at"}] (오래된 순)
+        self._entries: Dict[Tuple, List[Dict]] = {}
+        self._size = 0
+        self._db_version = guideline_db_version()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "skipped": 0, "invalidations": 0}
+
+    # --------------------------------------
+    # 범위 / 버전
+    # --------------------------------------
+    def scope_for(
+        self,
+        student_profile: Optional[Dict[str, str]],
+        recent_dialogues: Optional[List[Dict[str, str]]] = None,
+        force_mode: Optional[str] = None,
+        question: Optional[str] = None,
+    ) -> Optional[Tuple]:
+        """캐시 범위 키 (None이면 이 요청은 캐시하지 않음, question이 있으면 질문에 나온 대학/연도 포함)"""
+        if recent_dialogues:
+            return None
+        profile = student_profile or {}
+        values = []
+        for field, default in SCOPE_FIELDS:
+            value = profile.get(field)
+            if field == "track" and not value:
+                # prepare_context와 동일하게 major_category도 계열로 인정
+                value = profile.get("major_category")
+            values.append(" ".join(str(value or default).split()))
+        universities, dates = question_entities(question or "")
+        return tuple(values) + (force_mode or "auto", universities, dates)
+
+    def invalidate(self):
+        """모든 항목 제거 (GuidelineDB 갱신 직후 같은 프로세스에서 호출)"""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+            self._db_version = guideline_db_version()
+            self._stats["invalidations"] += 1
+
+    def _check_db_version(self):
+        version = guideline_db_version()
+        if version != self._db_version:
+            print(f" [answer-cache] GuidelineDB 변경 감지 → 캐시 초기화")
+            self.invalidate()
+
+    # --------------------------------------
+    # 임베딩
+    # --------------------------------------
+    @staticmethod
+    def _normalize(vector) -> np.ndarray:
+        v = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(v)
+        return v / norm if norm > 0 else v
+
+    def embed(self, question: str) -> np.ndarray:
+        return self._normalize(get_embeddings_model().embed_query(question))
+
+    async def aembed(self, question: str) -> np.ndarray:
+        return self._normalize(await get_embeddings_model().aembed_query(question))
+
+    # --------------------------------------
+    # 조회 / 저장
+    # --------------------------------------
+    def _search(self, vector: np.ndarray, scope: Tuple) -> Optional[Dict]:
+        now = time.time()
+        with self._lock:
+            entries = self._entries.get(scope)
+            if not entries:
+                self._stats["misses"] += 1
+                return None
+
+            # 만료 항목 정리
+            alive = [e for e in entries if now - e["created_at"] < self.ttl]
+            self._size -= len(entries) - len(alive)
+            self._entries[scope] = alive
+            if not alive:
+                self._stats["misses"] += 1
+                return None
+
+            matrix = np.stack([e["vector"] for e in alive])
+            scores = matrix @ vector
+            best = int(np.argmax(scores))
+            if scores[best] < self.threshold:
+                self._stats["misses"] += 1
+                return None
+
+            self._stats["hits"] += 1
+            print(f" [answer-cache] 히트 (유사도 {scores[best]:.3f})")
+            return dict(alive[best]["result"])
+
+    def _lookup_ready(self, scope: Optional[Tuple]) -> bool:
+        if not ANSWER_CACHE_ENABLED or scope is None:
+            with self._lock:
+                self._stats["skipped"] += 1
+            return False
+        self._check_db_version()
+        return True
+
+    def lookup(self, question: str, scope: Optional[Tuple]) -> Tuple[Optional[Dict], Optional[np.ndarray]]:
+        """
+        (캐시된 결과 또는 None, 질문 임베딩) 반환
+        임베딩은 미스일 때 store()에 그대로 넘겨 재계산을 피함
+        """
+        if not self._lookup_ready(scope):
+            return None, None
+        try:
+            vector = self.embed(question)
+            return self._search(vector, scope), vector
+        except Exception as e:
+            # 캐시 문제로 요청이 실패하지 않도록 미스로 처리
+            print(f" [answer-cache] 조회 실패 → 캐시 생략: {str(e)[:100]}")
+            return None, None
+
+    async def alookup(self, question: str, scope: Optional[Tuple]) -> Tuple[Optional[Dict], Optional[np.ndarray]]:
+        """lookup의 비동기 버전"""
+        if not self._lookup_ready(scope):
+            return None, None
+        try:
+            vector = await self.aembed(question)
+            return self._search(vector, scope), vector
+        except Exception as e:
+            print(f" [answer-cache] 조회 실패 → 캐시 생략: {str(e)[:100]}")
+            return None, None
+
+    def store(self, vector: Optional[np.ndarray], scope: Optional[Tuple], result: Dict):
+        """성공한 답변만 저장 (용량 초과 시 가장 오래된 항목부터 제거)"""
+        if vector is None or scope is None or not result.get("success"):
+            return
+        entry = {
+            "vector": vector,
+            "result": {k: v for k, v in result.items() if k != "cache_hit"},
+            "created_at": time.time(),
+        }
+        with self._lock:
+            self._entries.setdefault(scope, []).append(entry)
+            self._size += 1
+            while self._size > self.max_items:
+                oldest_scope = min(
+                    (s for s in self._entries if self._entries[s]),
+                    key=lambda s: self._entries[s][0]["created_at"],
+                )
+                self._entries[oldest_scope].pop(0)
+                self._size -= 1
+
+    def stats(self) -> Dict:
+        total = self._stats["hits"] + self._stats["misses"]
+        return {
+            **self._stats,
+            "items": self._size,
+            "hit_rate": round(self._stats["hits"] / total, 3) if total else 0.0,
+        }
+
+
+@component("answer_cache")
+def get_answer_cache() -> AnswerCache:
+    return AnswerCache()
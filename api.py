@@ -6,14 +6,22 @@ get_answer() 함수 하나로 모든 기능을 사용할 수 있습니다.
     
     result = get_answer("중앙대학교 이과 편입은 어떤 과목을 준비해야 하나요?")
     print(result["final_answer"])
+
+    # 비동기 (FastAPI 등 이벤트 루프 안에서)
+    result = await aget_answer("중앙대학교 이과 편입은 어떤 과목을 준비해야 하나요?")
+
+    # 토큰 스트리밍 (main.py /api/chat/stream)
+    async for event, data in astream_answer("중앙대학교 이과 편입은 어떤 과목을 준비해야 하나요?"):
+        ...
 """
 
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from dotenv import load_dotenv
 import os
-import requests
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Literal
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.output_parsers import StrOutputParser
 
 # ======================================
 # 1단계: 환경 변수 로드
@@ -21,25 +29,55 @@ from typing import Literal
 load_dotenv()
 
 # ======================================
-# 2단계: 모든 필요한 모듈 import 및 초기화
+# 2단계: 모든 필요한 모듈 import
 # ======================================
-print("CSmart API 초기화 중...")
+# - import 시점에는 아무것도 초기화하지 않음 (Chroma, LLM, 그래프는 최초 사용 시 생성)
+# - 서버 시작 시 미리 초기화하려면 warm_up() 호출 (main.py lifespan 참고)
+
+# 지연 초기화 레지스트리
+from components import warm_up, readiness
 
 # States
 from step2_states import QAState, prepare_context
 
-# DB and Search (자동으로 초기화됨)
+# DB and Search
 from step3_db_and_search import guideline_search, web_search, tools
 
-# LLM (자동으로 초기화됨)
-from step4_llm import llm, llm_with_tools
+# LLM
+from step4_llm import get_llm, get_llm_with_tools
+
+# Agents
+from step5_guideline_agent import get_guideline_agent
+from step6_web_agent import get_search_web_agent
+from step7_integrated_agent import get_integrated_agent, build_context, decide_route, adecide_route, RouteDecision, FINAL_ANSWER_TAG
+
+# 시맨틱 답변 캐시
+from answer_cache import get_answer_cache
+
+# 규칙 기반 질문 복잡도 분류 (LLM 판별 전 fast path)
+from question_rules import classify_by_rules
+
+# 로컬 라우팅 모델 (LLM 라우팅 결정 로그로 학습, local_router.py 참고)
+from local_router import local_route, log_routing_decision
 
-# Agents (자동으로 컴파일됨)
-from step5_guideline_agent import guideline_agent
-from step6_web_agent import search_web_agent
-from step7_integrated_agent import integrated_agent
+# 파인튜닝 모델 HTTP 클라이언트 (연결 풀, 백오프, 헤지 요청)
+from finetuned_client import get_finetuned_client, FINETUNED_API_URL
 
-print("CSmart API 초기화 완료!\n")
+# 스트리밍 API 진행 상황 이벤트 / 단계별 지연 시간 통계
+from progress import ProgressTracker
+
+# 요청 단위 시간 예산 (모든 노드/LLM/검색 호출에 전파, deadline.py 참고)
+from deadline import (
+    request_deadline, bounded, abounded, abounded_iter, has_budget, mark_degraded, DeadlineExceeded,
+    REQUEST_TIMEOUT, MIN_FALLBACK_BUDGET,
+)
+
+RULE_CLASSIFIER_ENABLED = os.getenv("RULE_CLASSIFIER_ENABLED", "1") == "1"
+
+# 파인튜닝 답변 후처리 방식
+# - combined: 재가공 + 품질 평가를 구조화된 출력 1회 호출로 처리 (기본값)
+# - two_step: 재가공(refine_finetuned_answer) → 품질 평가(evaluate_answer_quality) 2회 호출
+FINETUNED_POSTPROCESS_MODE = os.getenv("FINETUNED_POSTPROCESS_MODE", "combined")
 
 
 # ======================================
@@ -61,9 +99,138 @@ class AnswerQuality(BaseModel):
     score: int = None  # 1-10 점수
 
 
+# ======================================
+# 🎯 파인튜닝 답변 재가공 + 품질 평가 (1회 호출) 데이터 모델
+# ======================================
+class RefinedAnswerQuality(BaseModel):
+    """파인튜닝 모델 답변을 재가공하고, 재가공된 답변의 품질을 함께 평가합니다."""
+    refined_answer: str = Field(description="1-3줄로 재가공된 최종 답변")
+    quality: Literal["good", "poor"] = Field(description="재가공된 답변의 품질")
+    score: int = Field(description="재가공된 답변의 품질 점수 (1-10)")
+    reason: str = Field(default="", description="평가 근거")
+
+
+# ======================================
+# 📝 프롬프트 정의 (동기/비동기 함수에서 공유)
+# ======================================
+complexity_prompt = ChatPromptTemplate.from_messages([
+    ("system", """당신은 질문의 복잡도를 판별하는 분류기입니다.
+
+질문을 다음 두 가지 카테고리로 분류하세요:
+
+1. **simple (간단한 질문)**:
+   - 일반적인 학습 방법, 공부 조언, 학습 전략에 대한 질문
+   - 특정 대학명, 연도, 일정이 포함되지 않은 일반적인 질문
+   - 예: "수학 공부는 어떻게 해야 할까요?", "오답노트 정리법", "영어 단어 암기법"
+
+2. **complex (복잡한 질문)**:
+   - 특정 대학명이 포함된 질문 (예: 중앙대, 연세대, 고려대 등)
+   - 특정 연도나 일정을 물어보는 질문 (예: 2025학년도, 시험 일정)
+   - 구체적인 전형/모집요강/시험 과목 등을 물어보는 질문
+   - 검색이나 데이터베이스 조회가 필요한 질문
+
+판단 근거를 reason 필드에 간단히 적어주세요."""),
+    ("human", "다음 질문을 분류하세요:\n\n{question}")
+])
+
+refine_prompt = ChatPromptTemplate.from_messages([
+    ("system", """당신은 편입 상담 전문가입니다. 파인튜닝 모델이 생성한 답변을 받아서 간결하고 도움이 되는 답변으로 재가공해주세요.
+
+다음 기준으로 답변을 개선하세요:
+
+**개선 방향:**
+1. **간결성**: 핵심 내용만 1-3줄로 간단명료하게 정리
+2. **구체성**: 모호한 표현을 구체적이고 실행 가능한 조언으로 변경
+3. **실용성**: 학생이 실제로 따라할 수 있는 구체적인 방법 제시
+4. **자연스러운 표현**: 부자연스러운 부분을 자연스럽고 읽기 쉽게 수정
+
+**주의사항:**
+- 답변은 반드시 1-3줄 이내로 작성
+- 핵심 내용만 간단명료하게 전달
+- 편입 상담에 적합한 전문적인 톤 유지
+- 구체적이고 실행 가능한 조언 제공
+- 특수문자나 불필요한 형식 제거
+
+원본 질문과 파인튜닝 모델의 답변을 바탕으로 간결한 답변을 작성해주세요."""),
+    ("human", "다음 질문과 파인튜닝 모델의 답변을 바탕으로 개선된 답변을 작성해주세요:\n\n[질문]\n{question}\n\n[파인튜닝 모델 답변]\n{raw_answer}\n\n[개선된 답변]")
+])
+
+quality_prompt = ChatPromptTemplate.from_messages([
+    ("system", """당신은 편입 상담 답변의 품질을 평가하는 전문가입니다.
+
+다음 기준으로 답변을 평가하세요:
+
+**좋은 답변 (good) 기준:**
+- 질문에 직접적이고 구체적으로 답변함
+- 실용적이고 실행 가능한 조언을 제공함
+- 편입 상담에 적합한 전문적인 내용임
+- 답변이 충분히 상세하고 도움이 됨
+- 오류나 부정확한 정보가 없음
+
+**부족한 답변 (poor) 기준:**
+- 질문에 대한 답변이 모호하거나 불완전함
+- "모르겠습니다", "확인해보세요" 등으로 끝남
+- 너무 짧거나 일반적인 내용만 포함
+- 질문과 관련 없는 내용임
+- 오류나 부정확한 정보가 포함됨
+
+점수 기준:
+- 8-10점: 매우 좋은 답변 (good)
+- 6-7점: 보통 답변 (good)
+- 4-5점: 부족한 답변 (poor)
+- 1-3점: 매우 부족한 답변 (poor)
+
+quality 필드에 "good" 또는 "poor"를, score 필드에 1-10 점수를, reason 필드에 평가 근거를 적어주세요."""),
+    ("human", "다음 질문과 답변을 평가하세요:\n\n[질문]\n{question}\n\n[답변]\n{answer}")
+])
+
+refine_and_grade_prompt = ChatPromptTemplate.from_messages([
+    ("system", """당신은 편입 상담 전문가입니다. 파인튜닝 모델이 생성한 답변을 재가공하고, 재가공한 답변의 품질을 평가하세요.
+
+**1. 재가공 (refined_answer):**
+- 핵심 내용만 1-3줄로 간단명료하게 정리
+- 모호한 표현을 구체적이고 실행 가능한 조언으로 변경
+- 부자연스러운 부분을 자연스럽고 읽기 쉽게 수정
+- 편입 상담에 적합한 전문적인 톤 유지, 특수문자나 불필요한 형식 제거
+- 원시 답변에 없는 사실(대학별 일정, 수치 등)을 지어내지 말 것
+
+**2. 품질 평가 (quality, score, reason) — 재가공된 답변 기준:**
+- good: 질문에 직접적이고 구체적으로 답하며 실용적인 조언을 제공하고 오류가 없음
+- poor: 모호하거나 불완전함, "모르겠습니다"/"확인해보세요"로 끝남, 질문과 관련 없음, 부정확한 정보 포함
+  (원시 답변이 질문과 무관하거나 내용이 부족하면 재가공으로 보완하지 말고 poor로 평가)
+
+점수 기준:
+- 8-10점: 매우 좋은 답변 (good)
+- 6-7점: 보통 답변 (good)
+- 4-5점: 부족한 답변 (poor)
+- 1-3점: 매우 부족한 답변 (poor)"""),
+    ("human", "[질문]\n{question}\n\n[파인튜닝 모델 답변]\n{raw_answer}")
+])
+
+
 # ======================================
 # 🤖 간단한 질문 판별 함수
 # ======================================
+def _rule_complexity(question: str) -> Optional[QuestionComplexity]:
+    """규칙으로 확실히 판단되면 결과 반환, 애매하면 None (LLM 판별로 넘김)"""
+    if not RULE_CLASSIFIER_ENABLED:
+        return None
+    complexity, reason = classify_by_rules(question)
+    if complexity is None:
+        return None
+    return QuestionComplexity(complexity=complexity, reason=f"[규칙] {reason}")
+
+
+def _complexity_result(question: str, result: QuestionComplexity, verbose: bool) -> bool:
+    if verbose:
+        print(f"\n질문 복잡도 판별:")
+        print(f"   - 질문: {question}")
+        print(f"   - 판단: {result.complexity}")
+        print(f"   - 이유: {result.reason}\n")
+
+    return result.complexity == "simple"
+
+
 def is_simple_question(question: str, verbose: bool = True) -> bool:
     """
     질문이 간단한 일반적인 학습 조언인지, 
@@ -77,58 +244,174 @@ def is_simple_question(question: str, verbose: bool = True) -> bool:
     복잡한 질문 예시:
     - "중앙대학교 이과 편입은 어떤 과목을 준비해야 하나요?" (특정 대학/계열)
     - "2025학년도 편입 시험 일정은 언제인가요?" (구체적인 날짜 정보)
+
+    대학명/연도/전형 키워드 등으로 확실히 판단되는 질문은 LLM 호출 없이 규칙으로 판별합니다.
+    (question_rules.py 참고)
     """
-    from langchain_core.prompts import ChatPromptTemplate
-    
+    rule_result = _rule_complexity(question)
+    if rule_result is not None:
+        return _complexity_result(question, rule_result, verbose)
+
     try:
-        # 구조화된 출력을 위한 LLM 설정
-        structured_llm = llm.with_structured_output(QuestionComplexity)
+        # 구조화된 출력을 위한 LLM 설정 후 판별 실행
+        chain = complexity_prompt | get_llm().with_structured_output(QuestionComplexity)
+        result = bounded(chain.invoke, {"question": question})
+        log_routing_decision(question, result.complexity, source="complexity_classifier")
+        return _complexity_result(question, result, verbose)
         
-        # 판별 프롬프트
-        system_prompt = """당신은 질문의 복잡도를 판별하는 분류기입니다.
-
-질문을 다음 두 가지 카테고리로 분류하세요:
-
-1. **simple (간단한 질문)**:
-   - 일반적인 학습 방법, 공부 조언, 학습 전략에 대한 질문
-   - 특정 대학명, 연도, 일정이 포함되지 않은 일반적인 질문
-   - 예: "수학 공부는 어떻게 해야 할까요?", "오답노트 정리법", "영어 단어 암기법"
+    except Exception as e:
+        if verbose:
+            print(f"질문 복잡도 판별 오류 (기본값: complex): {str(e)[:100]}")
+        # 오류 시 안전하게 복잡한 질문으로 처리 (기존 LangGraph 사용)
+        return False
 
-2. **complex (복잡한 질문)**:
-   - 특정 대학명이 포함된 질문 (예: 중앙대, 연세대, 고려대 등)
-   - 특정 연도나 일정을 물어보는 질문 (예: 2025학년도, 시험 일정)
-   - 구체적인 전형/모집요강/시험 과목 등을 물어보는 질문
-   - 검색이나 데이터베이스 조회가 필요한 질문
 
-판단 근거를 reason 필드에 간단히 적어주세요."""
+async def ais_simple_question(question: str, verbose: bool = True) -> bool:
+    """is_simple_question의 비동기 버전"""
+    rule_result = _rule_complexity(question)
+    if rule_result is not None:
+        return _complexity_result(question, rule_result, verbose)
 
-        prompt = ChatPromptTemplate.from_messages([
-            ("system", system_prompt),
-            ("human", "다음 질문을 분류하세요:\n\n{question}")
-        ])
-        
-        # 판별 실행
-        chain = prompt | structured_llm
-        result = chain.invoke({"question": question})
-        
-        if verbose:
-            print(f"\n질문 복잡도 판별:")
-            print(f"   - 질문: {question}")
-            print(f"   - 판단: {result.complexity}")
-            print(f"   - 이유: {result.reason}\n")
-        
-        return result.complexity == "simple"
+    try:
+        chain = complexity_prompt | get_llm().with_structured_output(QuestionComplexity)
+        result = await abounded(chain.ainvoke({"question": question}))
+        log_routing_decision(question, result.complexity, source="complexity_classifier")
+        return _complexity_result(question, result, verbose)
         
     except Exception as e:
         if verbose:
             print(f"질문 복잡도 판별 오류 (기본값: complex): {str(e)[:100]}")
-        # 오류 시 안전하게 복잡한 질문으로 처리 (기존 LangGraph 사용)
         return False
 
 
+# ======================================
+# 🧭 통합 라우팅 결정 (복잡도 + 데이터 소스)
+# ======================================
+# 자동 판별 시에는 is_simple_question + 그래프의 analyze_question(도구 선택)을 따로 호출하지 않고
+# 규칙 판별 → 로컬 모델 → (필요 시) 통합 라우터 1회 호출로 두 가지를 함께 결정합니다.
+# 결정된 datasources는 그래프 입력으로 넘겨 analyze_question 노드를 건너뜁니다.
+def _local_result(
+    question: str,
+    rule_result: Optional[QuestionComplexity],
+    verbose: bool
+) -> Optional[Tuple[bool, List[str]]]:
+    """로컬 모델이 충분히 확신하면 결과 반환, 아니면 None (통합 라우터 호출)"""
+    decision = local_route(question)
+    if decision is None:
+        return None
+    # 규칙(complex)과 로컬 모델(simple)이 엇갈리면 LLM에 맡김
+    if rule_result is not None and decision.complexity != rule_result.complexity:
+        return None
+
+    complexity = rule_result or QuestionComplexity(complexity=decision.complexity, reason=decision.reason)
+    if verbose:
+        print(f"로컬 라우팅 모델 결정 (신뢰도 {decision.confidence:.2f}): 도구 {decision.datasources or '그래프에서 선택'}")
+    return _complexity_result(question, complexity, verbose), decision.datasources
+
+
+def _decision_result(
+    question: str,
+    rule_result: Optional[QuestionComplexity],
+    decision: RouteDecision,
+    verbose: bool
+) -> Tuple[bool, List[str]]:
+    # 규칙이 complex로 판단한 질문은 규칙 결과를 우선 (라우터 호출은 도구 선택용)
+    complexity = rule_result or QuestionComplexity(
+        complexity=decision.complexity, reason=decision.reason or "통합 라우터 판단"
+    )
+    datasources = [tool.tool for tool in decision.tools]
+    log_routing_decision(question, complexity.complexity, datasources, source="route_decider")
+    if verbose:
+        print(f"통합 라우터 도구 선택: {datasources or '없음'}")
+    return _complexity_result(question, complexity, verbose), datasources
+
+
+def decide_answer_route(
+    question: str,
+    inputs: Dict,
+    verbose: bool = True
+) -> Tuple[bool, List[str]]:
+    """
+    (간단한 질문 여부, 미리 결정된 데이터 소스) 반환
+    - 규칙으로 simple이면 LLM 호출 없음 (데이터 소스 불필요)
+    - 로컬 모델 신뢰도가 임계값 이상이면 LLM 호출 없음
+    - 그 외에는 통합 라우터 1회 호출로 복잡도와 데이터 소스를 함께 결정
+    - 라우터 오류 시 complex + 빈 데이터 소스 (그래프의 analyze_question이 도구 선택)
+    """
+    rule_result = _rule_complexity(question)
+    if rule_result is not None and rule_result.complexity == "simple":
+        return _complexity_result(question, rule_result, verbose), []
+
+    local_result = _local_result(question, rule_result, verbose)
+    if local_result is not None:
+        return local_result
+
+    try:
+        context = build_context(question, inputs["student_profile"], inputs["recent_dialogues"])
+        decision = bounded(decide_route, question, context)
+        return _decision_result(question, rule_result, decision, verbose)
+
+    except Exception as e:
+        if verbose:
+            print(f"통합 라우팅 오류 (기본값: complex): {str(e)[:100]}")
+        return False, []
+
+
+async def adecide_answer_route(
+    question: str,
+    inputs: Dict,
+    verbose: bool = True
+) -> Tuple[bool, List[str]]:
+    """decide_answer_route의 비동기 버전"""
+    rule_result = _rule_complexity(question)
+    if rule_result is not None and rule_result.complexity == "simple":
+        return _complexity_result(question, rule_result, verbose), []
+
+    local_result = _local_result(question, rule_result, verbose)
+    if local_result is not None:
+        return local_result
+
+    try:
+        context = build_context(question, inputs["student_profile"], inputs["recent_dialogues"])
+        decision = await abounded(adecide_route(question, context))
+        return _decision_result(question, rule_result, decision, verbose)
+
+    except Exception as e:
+        if verbose:
+            print(f"통합 라우팅 오류 (기본값: complex): {str(e)[:100]}")
+        return False, []
+
+
+def _with_datasources(inputs: Dict, datasources: List[str]) -> Dict:
+    """미리 결정된 데이터 소스가 있으면 그래프 입력에 포함 (analyze_question 생략)"""
+    return {**inputs, "datasources": datasources} if datasources else inputs
+
+
 # ======================================
 # 🎯 파인튜닝 모델 답변 재가공 함수
 # ======================================
+def _refined_result(question: str, raw_answer: str, refined_answer, verbose: bool) -> str:
+    # 특수문자 및 불필요한 형식 제거
+    if hasattr(refined_answer, 'content'):
+        refined_answer = refined_answer.content
+    elif isinstance(refined_answer, str):
+        # content= 같은 특수문자 제거
+        refined_answer = refined_answer.replace('content=', '').strip()
+        # 따옴표 제거
+        if refined_answer.startswith("'") and refined_answer.endswith("'"):
+            refined_answer = refined_answer[1:-1]
+        elif refined_answer.startswith('"') and refined_answer.endswith('"'):
+            refined_answer = refined_answer[1:-1]
+
+    if verbose:
+        print(f"\n파인튜닝 답변 재가공:")
+        print(f"   - 원본 질문: {question}")
+        print(f"   - 원시 답변: {raw_answer[:100]}{'...' if len(raw_answer) > 100 else ''}")
+        print(f"   - 재가공 완료: {len(refined_answer)}자\n")
+
+    return refined_answer
+
+
 def refine_finetuned_answer(question: str, raw_answer: str, verbose: bool = True) -> str:
     """
     파인튜닝 모델의 원시 답변을 LLM으로 재가공하여 더 완성도 높은 답변으로 만듭니다.
@@ -147,68 +430,59 @@ def refine_finetuned_answer(question: str, raw_answer: str, verbose: bool = True
     str
         재가공된 답변
     """
-    from langchain_core.prompts import ChatPromptTemplate
-    
     try:
-        # 재가공 프롬프트
-        system_prompt = """당신은 편입 상담 전문가입니다. 파인튜닝 모델이 생성한 답변을 받아서 간결하고 도움이 되는 답변으로 재가공해주세요.
-
-다음 기준으로 답변을 개선하세요:
-
-**개선 방향:**
-1. **간결성**: 핵심 내용만 1-3줄로 간단명료하게 정리
-2. **구체성**: 모호한 표현을 구체적이고 실행 가능한 조언으로 변경
-3. **실용성**: 학생이 실제로 따라할 수 있는 구체적인 방법 제시
-4. **자연스러운 표현**: 부자연스러운 부분을 자연스럽고 읽기 쉽게 수정
-
-**주의사항:**
-- 답변은 반드시 1-3줄 이내로 작성
-- 핵심 내용만 간단명료하게 전달
-- 편입 상담에 적합한 전문적인 톤 유지
-- 구체적이고 실행 가능한 조언 제공
-- 특수문자나 불필요한 형식 제거
-
-원본 질문과 파인튜닝 모델의 답변을 바탕으로 간결한 답변을 작성해주세요."""
-
-        prompt = ChatPromptTemplate.from_messages([
-            ("system", system_prompt),
-            ("human", "다음 질문과 파인튜닝 모델의 답변을 바탕으로 개선된 답변을 작성해주세요:\n\n[질문]\n{question}\n\n[파인튜닝 모델 답변]\n{raw_answer}\n\n[개선된 답변]")
-        ])
-        
         # 재가공 실행
-        chain = prompt | llm
-        refined_answer = chain.invoke({"question": question, "raw_answer": raw_answer})
-        
-        # 특수문자 및 불필요한 형식 제거
-        if hasattr(refined_answer, 'content'):
-            refined_answer = refined_answer.content
-        elif isinstance(refined_answer, str):
-            # content= 같은 특수문자 제거
-            refined_answer = refined_answer.replace('content=', '').strip()
-            # 따옴표 제거
-            if refined_answer.startswith("'") and refined_answer.endswith("'"):
-                refined_answer = refined_answer[1:-1]
-            elif refined_answer.startswith('"') and refined_answer.endswith('"'):
-                refined_answer = refined_answer[1:-1]
+        chain = refine_prompt | get_llm()
+        refined_answer = bounded(chain.invoke, {"question": question, "raw_answer": raw_answer})
+        return _refined_result(question, raw_answer, refined_answer, verbose)
         
+    except Exception as e:
         if verbose:
-            print(f"\n파인튜닝 답변 재가공:")
-            print(f"   - 원본 질문: {question}")
-            print(f"   - 원시 답변: {raw_answer[:100]}{'...' if len(raw_answer) > 100 else ''}")
-            print(f"   - 재가공 완료: {len(refined_answer)}자\n")
-        
-        return refined_answer
+            print(f"답변 재가공 오류 (원본 답변 사용): {str(e)[:100]}")
+        # 오류 시 원본 답변 반환
+        return raw_answer
+
+
+async def arefine_finetuned_answer(question: str, raw_answer: str, verbose: bool = True) -> str:
+    """refine_finetuned_answer의 비동기 버전"""
+    try:
+        chain = refine_prompt | get_llm()
+        refined_answer = await abounded(chain.ainvoke({"question": question, "raw_answer": raw_answer}))
+        return _refined_result(question, raw_answer, refined_answer, verbose)
         
     except Exception as e:
         if verbose:
             print(f"답변 재가공 오류 (원본 답변 사용): {str(e)[:100]}")
-        # 오류 시 원본 답변 반환
         return raw_answer
 
 
+async def astream_refined_answer(question: str, raw_answer: str):
+    """
+    refine_finetuned_answer의 스트리밍 버전 (재가공 답변을 생성되는 대로 조각 단위로 반환)
+    오류/시간 초과는 그대로 전달 (호출하는 쪽에서 원본 답변으로 대체)
+    """
+    chain = refine_prompt | get_llm() | StrOutputParser()
+    async for text in abounded_iter(chain.astream({"question": question, "raw_answer": raw_answer})):
+        if text:
+            yield text
+
+
 # ======================================
 # 🎯 파인튜닝 모델 답변 품질 평가 함수
 # ======================================
+def _quality_result(question: str, answer: str, result: AnswerQuality, verbose: bool) -> bool:
+    if verbose:
+        print(f"\n답변 품질 평가:")
+        print(f"   - 질문: {question}")
+        print(f"   - 답변: {answer[:100]}{'...' if len(answer) > 100 else ''}")
+        print(f"   - 품질: {result.quality}")
+        print(f"   - 점수: {result.score}/10")
+        print(f"   - 이유: {result.reason}\n")
+
+    # 6점 이상이면 좋은 답변으로 판단
+    return result.score >= 6
+
+
 def evaluate_answer_quality(question: str, answer: str, verbose: bool = True) -> bool:
     """
     파인튜닝 모델의 답변이 질문에 적절히 답변했는지 평가합니다.
@@ -228,69 +502,120 @@ def evaluate_answer_quality(question: str, answer: str, verbose: bool = True) ->
         True: 답변이 충분히 좋음 (품질 기준 통과)
         False: 답변이 부족함 (LangGraph로 재시도 필요)
     """
-    from langchain_core.prompts import ChatPromptTemplate
-    
     try:
-        # 구조화된 출력을 위한 LLM 설정
-        structured_llm = llm.with_structured_output(AnswerQuality)
+        # 구조화된 출력을 위한 LLM 설정 후 평가 실행
+        chain = quality_prompt | get_llm().with_structured_output(AnswerQuality)
+        result = bounded(chain.invoke, {"question": question, "answer": answer})
+        return _quality_result(question, answer, result, verbose)
         
-        # 평가 프롬프트
-        system_prompt = """당신은 편입 상담 답변의 품질을 평가하는 전문가입니다.
+    except Exception as e:
+        if verbose:
+            print(f"답변 품질 평가 오류 (기본값: poor): {str(e)[:100]}")
+        # 오류 시 안전하게 부족한 답변으로 처리 (LangGraph 사용)
+        return False
 
-다음 기준으로 답변을 평가하세요:
 
-**좋은 답변 (good) 기준:**
-- 질문에 직접적이고 구체적으로 답변함
-- 실용적이고 실행 가능한 조언을 제공함
-- 편입 상담에 적합한 전문적인 내용임
-- 답변이 충분히 상세하고 도움이 됨
-- 오류나 부정확한 정보가 없음
+async def aevaluate_answer_quality(question: str, answer: str, verbose: bool = True) -> bool:
+    """evaluate_answer_quality의 비동기 버전"""
+    try:
+        chain = quality_prompt | get_llm().with_structured_output(AnswerQuality)
+        result = await abounded(chain.ainvoke({"question": question, "answer": answer}))
+        return _quality_result(question, answer, result, verbose)
+        
+    except Exception as e:
+        if verbose:
+            print(f"답변 품질 평가 오류 (기본값: poor): {str(e)[:100]}")
+        return False
 
-**부족한 답변 (poor) 기준:**
-- 질문에 대한 답변이 모호하거나 불완전함
-- "모르겠습니다", "확인해보세요" 등으로 끝남
-- 너무 짧거나 일반적인 내용만 포함
-- 질문과 관련 없는 내용임
-- 오류나 부정확한 정보가 포함됨
 
-점수 기준:
-- 8-10점: 매우 좋은 답변 (good)
-- 6-7점: 보통 답변 (good)
-- 4-5점: 부족한 답변 (poor)
-- 1-3점: 매우 부족한 답변 (poor)
+# ======================================
+# 🎯 파인튜닝 답변 후처리 (재가공 + 품질 평가)
+# ======================================
+def _combined_result(question: str, raw_answer: str, result: RefinedAnswerQuality, verbose: bool) -> Tuple[str, bool]:
+    refined_answer = _refined_result(question, raw_answer, result.refined_answer, verbose)
+    if not refined_answer.strip():
+        return raw_answer, False
+    quality = AnswerQuality(quality=result.quality, score=result.score, reason=result.reason)
+    return refined_answer, _quality_result(question, refined_answer, quality, verbose)
 
-quality 필드에 "good" 또는 "poor"를, score 필드에 1-10 점수를, reason 필드에 평가 근거를 적어주세요."""
 
-        prompt = ChatPromptTemplate.from_messages([
-            ("system", system_prompt),
-            ("human", "다음 질문과 답변을 평가하세요:\n\n[질문]\n{question}\n\n[답변]\n{answer}")
-        ])
-        
-        # 평가 실행
-        chain = prompt | structured_llm
-        result = chain.invoke({"question": question, "answer": answer})
-        
+def refine_and_grade_answer(question: str, raw_answer: str, verbose: bool = True) -> Tuple[str, bool]:
+    """
+    재가공과 품질 평가를 구조화된 출력 1회 호출로 처리
+    Returns: (재가공된 답변, 품질 기준 통과 여부)
+    오류 시 기존 2단계 방식으로 처리
+    """
+    try:
+        chain = refine_and_grade_prompt | get_llm().with_structured_output(RefinedAnswerQuality)
+        result = bounded(chain.invoke, {"question": question, "raw_answer": raw_answer})
+        return _combined_result(question, raw_answer, result, verbose)
+
+    except DeadlineExceeded as e:
+        mark_degraded(f"파인튜닝 답변 재가공/평가 생략: {e}")
+        return raw_answer, False
+
+    except Exception as e:
         if verbose:
-            print(f"\n답변 품질 평가:")
-            print(f"   - 질문: {question}")
-            print(f"   - 답변: {answer[:100]}{'...' if len(answer) > 100 else ''}")
-            print(f"   - 품질: {result.quality}")
-            print(f"   - 점수: {result.score}/10")
-            print(f"   - 이유: {result.reason}\n")
-        
-        # 6점 이상이면 좋은 답변으로 판단
-        return result.score >= 6
-        
+            print(f"재가공+평가 통합 호출 오류 (2단계 방식으로 재시도): {str(e)[:100]}")
+        refined_answer = refine_finetuned_answer(question, raw_answer, verbose=verbose)
+        return refined_answer, evaluate_answer_quality(question, refined_answer, verbose=verbose)
+
+
+async def arefine_and_grade_answer(question: str, raw_answer: str, verbose: bool = True) -> Tuple[str, bool]:
+    """refine_and_grade_answer의 비동기 버전"""
+    try:
+        chain = refine_and_grade_prompt | get_llm().with_structured_output(RefinedAnswerQuality)
+        result = await abounded(chain.ainvoke({"question": question, "raw_answer": raw_answer}))
+        return _combined_result(question, raw_answer, result, verbose)
+
+    except DeadlineExceeded as e:
+        mark_degraded(f"파인튜닝 답변 재가공/평가 생략: {e}")
+        return raw_answer, False
+
     except Exception as e:
         if verbose:
-            print(f"답변 품질 평가 오류 (기본값: poor): {str(e)[:100]}")
-        # 오류 시 안전하게 부족한 답변으로 처리 (LangGraph 사용)
-        return False
+            print(f"재가공+평가 통합 호출 오류 (2단계 방식으로 재시도): {str(e)[:100]}")
+        refined_answer = await arefine_finetuned_answer(question, raw_answer, verbose=verbose)
+        return refined_answer, await aevaluate_answer_quality(question, refined_answer, verbose=verbose)
+
+
+def postprocess_finetuned_answer(question: str, raw_answer: str, verbose: bool = True) -> Tuple[str, bool]:
+    """FINETUNED_POSTPROCESS_MODE에 따라 (재가공된 답변, 품질 통과 여부) 반환"""
+    if FINETUNED_POSTPROCESS_MODE == "two_step":
+        refined_answer = refine_finetuned_answer(question, raw_answer, verbose=verbose)
+        return refined_answer, evaluate_answer_quality(question, refined_answer, verbose=verbose)
+    return refine_and_grade_answer(question, raw_answer, verbose=verbose)
+
+
+async def apostprocess_finetuned_answer(question: str, raw_answer: str, verbose: bool = True) -> Tuple[str, bool]:
+    """postprocess_finetuned_answer의 비동기 버전"""
+    if FINETUNED_POSTPROCESS_MODE == "two_step":
+        refined_answer = await arefine_finetuned_answer(question, raw_answer, verbose=verbose)
+        return refined_answer, await aevaluate_answer_quality(question, refined_answer, verbose=verbose)
+    return await arefine_and_grade_answer(question, raw_answer, verbose=verbose)
 
 
 # ======================================
 # 🎓 파인튜닝 모델 API 호출 함수
 # ======================================
+def _finetuned_payload(
+    question: str,
+    max_tokens: int,
+    temperature: float,
+    top_k: int,
+    top_p: float,
+    repetition_penalty: float
+) -> Dict:
+    return {
+        "question": question,
+        "max_tokens": max_tokens,
+        "temperature": temperature,
+        "top_k": top_k,
+        "top_p": top_p,
+        "repetition_penalty": repetition_penalty
+    }
+
+
 def call_finetuned_model(
     question: str,
     max_tokens: int = 100,
@@ -298,11 +623,12 @@ def call_finetuned_model(
     top_k: int = 50,
     top_p: float = 0.95,
     repetition_penalty: float = 1.2,
-    timeout: int = 120,
-    max_retries: int = 3
+    timeout: Optional[float] = None,
+    max_retries: Optional[int] = None
 ) -> str:
     """
     CSmart-FAQ 파인튜닝 모델 API를 호출하여 답변을 생성합니다.
+    (연결 풀/백오프/헤지 요청은 finetuned_client.py 참고)
     
     Parameters:
     -----------
@@ -318,69 +644,252 @@ def call_finetuned_model(
         Top-P (nucleus) 샘플링 (기본값: 0.95)
     repetition_penalty : float
         반복 페널티 (기본값: 1.2)
-    timeout : int
-        타임아웃 (초, 기본값: 120)
-    max_retries : int
-        최대 재시도 횟수 (기본값: 3)
+    timeout : float, optional
+        시도별 응답 대기 타임아웃 (초, 기본값: FINETUNED_READ_TIMEOUT)
+        재시도를 포함한 전체 시간은 FINETUNED_TOTAL_TIMEOUT을 넘지 않음
+    max_retries : int, optional
+        최대 시도 횟수 (기본값: FINETUNED_MAX_RETRIES)
     
     Returns:
     --------
     str
         생성된 답변 또는 오류 메시지
     """
-    url = "https://csmart-ai-faq-finetuning.hf.space/predict"
-    
-    payload = {
+    payload = _finetuned_payload(question, max_tokens, temperature, top_k, top_p, repetition_penalty)
+    return get_finetuned_client().generate(payload, read_timeout=timeout, max_retries=max_retries)
+
+
+async def acall_finetuned_model(
+    question: str,
+    max_tokens: int = 100,
+    temperature: float = 0.3,
+    top_k: int = 50,
+    top_p: float = 0.95,
+    repetition_penalty: float = 1.2,
+    timeout: Optional[float] = None,
+    max_retries: Optional[int] = None
+) -> str:
+    """call_finetuned_model의 비동기 버전 (같은 연결 풀/재시도 정책 사용)"""
+    payload = _finetuned_payload(question, max_tokens, temperature, top_k, top_p, repetition_penalty)
+    return await get_finetuned_client().agenerate(payload, read_timeout=timeout, max_retries=max_retries)
+
+
+# ======================================
+# 🧩 LangGraph 실행 / 결과 구성 헬퍼
+# ======================================
+LANGGRAPH_CONFIG = {
+    "recursion_limit": 25,  # 재귀 제한
+    # 실행 시간 제한은 get_answer의 request_deadline이 모든 노드/LLM/검색 호출에 적용
+}
+
+
+def _default_inputs(
+    question: str,
+    student_profile: Optional[Dict[str, str]],
+    recent_dialogues: Optional[List[Dict[str, str]]]
+) -> Dict:
+    """기본값을 채운 통합 에이전트 입력 데이터 구성"""
+    if student_profile is None:
+        student_profile = {
+            "target_university": "미지정",
+            "track": "계열 미지정"
+        }
+
+    if recent_dialogues is None:
+        recent_dialogues = []
+
+    return {
         "question": question,
-        "max_tokens": max_tokens,
-        "temperature": temperature,
-        "top_k": top_k,
-        "top_p": top_p,
-        "repetition_penalty": repetition_penalty
+        "student_profile": student_profile,
+        "recent_dialogues": recent_dialogues
+    }
+
+
+def _print_route(message: str):
+    print("\n" + "="*60)
+    print(message)
+    print("="*60)
+
+
+def _finetuned_response(question: str, refined_answer: str, model_used: str = "finetuned_refined") -> Dict:
+    return {
+        "question": question,
+        "final_answer": refined_answer,
+        "model_used": model_used,
+        "context": "",
+        "datasources": ["finetuned_model", "llm_refinement"],
+        "success": True,
+        "error": None,
+        "cache_hit": False
     }
+
+
+def _langgraph_response(question: str, result: Dict, model_used: str) -> Dict:
+    return {
+        "question": question,
+        "final_answer": result.get("final_answer", "답변을 생성하지 못했습니다."),
+        "model_used": model_used,
+        "context": result.get("context", ""),
+        "datasources": result.get("datasources", []),
+        "success": True,
+        "error": None,
+        "cache_hit": False
+    }
+
+
+def _error_response(question: str, e: Exception) -> Dict:
+    error_msg = str(e)
+    print(f"오류 발생: {error_msg[:200]}")
+
+    return {
+        "question": question,
+        "final_answer": "오류로 인해 답변을 생성하지 못했습니다.",
+        "model_used": "error",
+        "context": "",
+        "datasources": [],
+        "success": False,
+        "error": error_msg,
+        "cache_hit": False
+    }
+
+
+def _cached_response(question: str, cached: Dict) -> Dict:
+    """시맨틱 캐시에서 찾은 이전 답변 (질문은 이번 요청의 질문으로 표시)"""
+    return {**cached, "question": question, "cache_hit": True}
+
+
+def _run_integrated(inputs: Dict, model_used: str) -> Dict:
+    """통합 에이전트 실행 후 API 응답 형태로 변환"""
+    result = get_integrated_agent().invoke(inputs, config=LANGGRAPH_CONFIG)
+    return _langgraph_response(inputs["question"], result, model_used)
+
+
+async def _arun_integrated(inputs: Dict, model_used: str) -> Dict:
+    """_run_integrated의 비동기 버전"""
+    result = await get_integrated_agent().ainvoke(inputs, config=LANGGRAPH_CONFIG)
+    return _langgraph_response(inputs["question"], result, model_used)
+
+
+def _use_simple_model(force_mode: Optional[str]) -> Optional[bool]:
+    """수동 선택 모드가 지정되었으면 그 결과, 아니면 None (자동 판별 필요)"""
+    if not force_mode:
+        return None
+    print(f"\n수동 선택 모드: {force_mode}")
+    return force_mode == "simple"
+
+
+def _finetuned_available() -> bool:
+    """파인튜닝 모델 서킷 브레이커가 열려 있으면 False (재시도를 기다리지 않고 바로 LangGraph 사용)"""
+    breaker = get_finetuned_client().breaker
+    if breaker.is_available():
+        return True
+    print(f"파인튜닝 모델 서킷 브레이커 {breaker.state} - 파인튜닝 경로 생략")
+    return False
+
+
+def _route_answer(question: str, inputs: Dict, verbose: bool, force_mode: Optional[str]) -> Dict:
+    """복잡도 판별 → 파인튜닝/LangGraph 실행 → 필요 시 LangGraph 재시도"""
+    # ==========================================
+    # 🔀 1단계: 질문 복잡도 판별 및 라우팅
+    # ==========================================
+    use_simple_model = _use_simple_model(force_mode)
+    if use_simple_model is None:
+        # 자동 판별 (복잡도 + 데이터 소스를 한 번에 결정)
+        use_simple_model, datasources = decide_answer_route(question, inputs, verbose=verbose)
+        inputs = _with_datasources(inputs, datasources)
     
-    for attempt in range(max_retries):
-        try:
-            print(f"파인튜닝 모델 호출 중... (시도 {attempt + 1}/{max_retries})")
-            
-            response = requests.post(url, json=payload, timeout=timeout)
-            
-            if response.status_code == 200:
-                result = response.json()
-                answer = result.get("answer", "답변을 생성할 수 없습니다.")
-                print("파인튜닝 모델 답변 생성 완료")
-                return answer
-                
-            elif response.status_code == 400:
-                error_msg = "잘못된 요청입니다. 파라미터를 확인해주세요."
-                print(f"{error_msg}")
-                return f"오류: {error_msg}"
-                
-            elif response.status_code == 500:
-                print(f"서버 오류 발생 (시도 {attempt + 1}/{max_retries})")
-                if attempt < max_retries - 1:
-                    continue  # 재시도
-                else:
-                    return "오류: 서버 오류가 발생했습니다. 잠시 후 다시 시도해주세요."
-            else:
-                print(f"예상치 못한 오류: {response.status_code}")
-                return f"오류: 예상치 못한 오류 (상태 코드: {response.status_code})"
-                
-        except requests.exceptions.Timeout:
-            print(f"요청 시간 초과 (시도 {attempt + 1}/{max_retries})")
-            if attempt < max_retries - 1:
-                continue  # 재시도
-            else:
-                return "오류: 요청 시간이 초과되었습니다."
-                
-        except requests.exceptions.RequestException as e:
-            print(f"네트워크 오류: {str(e)[:100]}")
-            if attempt < max_retries - 1:
-                continue  # 재시도
-            else:
-                return f"오류: 네트워크 오류 ({str(e)[:50]})"
+    if use_simple_model and not _finetuned_available():
+        _print_route("라우팅 결정: LangGraph 에이전트 사용 (파인튜닝 모델 차단 중)")
+        return _run_integrated(inputs, "langgraph_bypass")
+
+    # ==========================================
+    # 🎓 2단계: 간단한 질문 → 파인튜닝 모델 사용
+    # ==========================================
+    if use_simple_model:
+        _print_route("라우팅 결정: 파인튜닝 모델 사용 (간단한 질문)")
+        
+        # 파인튜닝 모델 호출
+        answer = call_finetuned_model(
+            question=question,
+            max_tokens=100,
+            temperature=0.3
+        )
+        
+        # 파인튜닝 모델 오류 시 LangGraph로 재시도
+        if answer.startswith("오류:"):
+            print("파인튜닝 모델 오류 - LangGraph로 재시도")
+            _print_route("재라우팅: LangGraph 에이전트 사용 (파인튜닝 모델 오류)")
+            return _run_integrated(inputs, "langgraph_fallback")
+
+        # 파인튜닝 답변을 LLM으로 재가공 + 품질 평가
+        # (기본: 구조화된 출력 1회 호출, FINETUNED_POSTPROCESS_MODE=two_step이면 2회 호출)
+        refined_answer, passed = postprocess_finetuned_answer(question, answer, verbose=verbose)
+        
+        if passed:
+            # 품질이 좋으면 재가공된 답변 사용
+            print("파인튜닝 모델 답변 재가공 및 품질 통과 - 최종 답변으로 사용")
+            return _finetuned_response(question, refined_answer)
+
+        # 남은 시간이 LangGraph 재시도에 부족하면 재가공된 답변을 그대로 사용 (best-effort)
+        if not has_budget(MIN_FALLBACK_BUDGET):
+            mark_degraded("남은 시간 부족 → LangGraph 재시도 없이 파인튜닝 답변 사용")
+            return _finetuned_response(question, refined_answer, "finetuned_best_effort")
+
+        # 품질이 부족하면 LangGraph로 재시도
+        print("파인튜닝 모델 답변 품질 미달 - LangGraph로 재시도")
+        _print_route("재라우팅: LangGraph 에이전트 사용 (답변 품질 미달)")
+        return _run_integrated(inputs, "langgraph_fallback")
     
-    return "오류: 최대 재시도 횟수를 초과했습니다."
+    # ==========================================
+    # 🤖 3단계: 복잡한 질문 → LangGraph 에이전트 사용
+    # ==========================================
+    _print_route("라우팅 결정: LangGraph 에이전트 사용 (복잡한 질문)")
+    return _run_integrated(inputs, "langgraph")
+
+
+async def _aroute_answer(question: str, inputs: Dict, verbose: bool, force_mode: Optional[str]) -> Dict:
+    """_route_answer의 비동기 버전"""
+    # 🔀 1단계: 질문 복잡도 판별 및 라우팅
+    use_simple_model = _use_simple_model(force_mode)
+    if use_simple_model is None:
+        use_simple_model, datasources = await adecide_answer_route(question, inputs, verbose=verbose)
+        inputs = _with_datasources(inputs, datasources)
+
+    # 🤖 복잡한 질문 → LangGraph 에이전트 사용
+    if not use_simple_model:
+        _print_route("라우팅 결정: LangGraph 에이전트 사용 (복잡한 질문)")
+        return await _arun_integrated(inputs, "langgraph")
+
+    if not _finetuned_available():
+        _print_route("라우팅 결정: LangGraph 에이전트 사용 (파인튜닝 모델 차단 중)")
+        return await _arun_integrated(inputs, "langgraph_bypass")
+
+    # 🎓 간단한 질문 → 파인튜닝 모델 사용
+    _print_route("라우팅 결정: 파인튜닝 모델 사용 (간단한 질문)")
+    answer = await acall_finetuned_model(
+        question=question,
+        max_tokens=100,
+        temperature=0.3
+    )
+
+    if answer.startswith("오류:"):
+        print("파인튜닝 모델 오류 - LangGraph로 재시도")
+        _print_route("재라우팅: LangGraph 에이전트 사용 (파인튜닝 모델 오류)")
+        return await _arun_integrated(inputs, "langgraph_fallback")
+
+    refined_answer, passed = await apostprocess_finetuned_answer(question, answer, verbose=verbose)
+
+    if passed:
+        print("파인튜닝 모델 답변 재가공 및 품질 통과 - 최종 답변으로 사용")
+        return _finetuned_response(question, refined_answer)
+
+    if not has_budget(MIN_FALLBACK_BUDGET):
+        mark_degraded("남은 시간 부족 → LangGraph 재시도 없이 파인튜닝 답변 사용")
+        return _finetuned_response(question, refined_answer, "finetuned_best_effort")
+
+    print("파인튜닝 모델 답변 품질 미달 - LangGraph로 재시도")
+    _print_route("재라우팅: LangGraph 에이전트 사용 (답변 품질 미달)")
+    return await _arun_integrated(inputs, "langgraph_fallback")
 
 
 # ======================================
@@ -391,13 +900,16 @@ def get_answer(
     student_profile: Optional[Dict[str, str]] = None,
     recent_dialogues: Optional[List[Dict[str, str]]] = None,
     verbose: bool = True,
-    force_mode: Optional[Literal["simple", "complex"]] = None
+    force_mode: Optional[Literal["simple", "complex"]] = None,
+    timeout: Optional[float] = None
 ) -> Dict:
     """
     편입 상담 질문에 대한 답변을 생성합니다.
     
-    질문의 복잡도에 따라 자동으로 라우팅됩니다:
+    비슷한 질문에 대한 이전 답변이 시맨틱 캐시에 있으면 바로 반환합니다 (answer_cache.py 참고).
+    캐시에 없으면 질문의 복잡도에 따라 자동으로 라우팅됩니다:
     - 간단한 질문 (일반적인 학습 조언) → 파인튜닝 모델 사용 → LLM 재가공 → 답변 품질 평가 → 기준 미달 시 LangGraph 재시도
+      (파인튜닝 모델 서킷 브레이커가 열려 있으면 바로 LangGraph 사용, model_used="langgraph_bypass")
     - 복잡한 질문 (특정 대학/일정/전형 정보) → LangGraph 에이전트 사용
     
     Parameters:
@@ -427,17 +939,23 @@ def get_answer(
         - "simple": 파인튜닝 모델 수동 선택
         - "complex": LangGraph 에이전트 수동 선택
     
+    timeout : float, optional
+        요청 전체 시간 예산 (초, 기본값: REQUEST_TIMEOUT 환경 변수, 60)
+        모든 노드/LLM/검색 호출이 남은 시간 안에서 실행되며, 시간이 부족하면
+        쿼리 재작성 등 선택적 단계를 생략하고 그때까지 모은 정보로 답변합니다 (이런 답변은 캐시하지 않음).
+    
     Returns:
     --------
     dict
         {
             "question": str,           # 원본 질문
             "final_answer": str,       # 최종 답변
-            "model_used": str,         # 사용된 모델 ("finetuned_refined", "langgraph", "langgraph_fallback")
+            "model_used": str,         # 사용된 모델 ("finetuned_refined", "finetuned_best_effort", "langgraph", "langgraph_fallback", "langgraph_bypass")
             "context": str,            # 생성된 컨텍스트 (LangGraph 사용 시)
             "datasources": list,       # 사용된 데이터 소스 (LangGraph 사용 시)
             "success": bool,           # 성공 여부
-            "error": str or None       # 오류 메시지 (있는 경우)
+            "error": str or None,      # 오류 메시지 (있는 경우)
+            "cache_hit": bool          # 시맨틱 캐시에서 반환된 답변인지 여부
         }
     
     Examples:
@@ -472,205 +990,285 @@ def get_answer(
     >>> # 수동으로 특정 모드 선택
     >>> result = get_answer("수학 공부법", force_mode="complex")  # 수동으로 LangGraph 선택
     """
-    
-    # 기본값 설정
-    if student_profile is None:
-        student_profile = {
-            "target_university": "미지정",
-            "track": "계열 미지정"
-        }
-    
-    if recent_dialogues is None:
-        recent_dialogues = []
-    
+    inputs = _default_inputs(question, student_profile, recent_dialogues)
+
+    # 로그 출력 제어 (동기 호출 전용: 프로세스 전역 stdout을 잠시 교체)
+    old_stdout = None
+    if not verbose:
+        import sys
+        from io import StringIO
+        old_stdout = sys.stdout
+        sys.stdout = StringIO()
+
     try:
-        # 로그 출력 제어
-        if not verbose:
-            import sys
-            from io import StringIO
-            old_stdout = sys.stdout
-            sys.stdout = StringIO()
-        
-        # ==========================================
-        # 🔀 1단계: 질문 복잡도 판별 및 라우팅
-        # ==========================================
-        if force_mode:
-            # 수동 선택 모드가 지정된 경우
-            use_simple_model = (force_mode == "simple")
-            if verbose or force_mode:
-                print(f"\n수동 선택 모드: {force_mode}")
-        else:
-            # 자동 판별
-            use_simple_model = is_simple_question(question, verbose=verbose)
-        
-        # ==========================================
-        # 🎓 2단계: 간단한 질문 → 파인튜닝 모델 사용
-        # ==========================================
-        if use_simple_model:
-            print("\n" + "="*60)
-            print("라우팅 결정: 파인튜닝 모델 사용 (간단한 질문)")
-            print("="*60)
-            
-            # 파인튜닝 모델 호출
-            answer = call_finetuned_model(
-                question=question,
-                max_tokens=100,
-                temperature=0.3,
-                timeout=120,
-                max_retries=3
-            )
-            
-            # 파인튜닝 모델 답변 재가공 및 품질 평가
-            if not answer.startswith("오류:"):
-                # 1단계: 파인튜닝 답변을 LLM으로 재가공
-                refined_answer = refine_finetuned_answer(question, answer, verbose=verbose)
-                
-                # 2단계: 재가공된 답변의 품질 평가
-                is_good_answer = evaluate_answer_quality(question, refined_answer, verbose=verbose)
-                
-                if is_good_answer:
-                    # 품질이 좋으면 재가공된 답변 사용
-                    print("파인튜닝 모델 답변 재가공 및 품질 통과 - 최종 답변으로 사용")
-                    
-                    if not verbose:
-                        sys.stdout = old_stdout
-                    
-                    return {
-                        "question": question,
-                        "final_answer": refined_answer,
-                        "model_used": "finetuned_refined",
-                        "context": "",
-                        "datasources": ["finetuned_model", "llm_refinement"],
-                        "success": True,
-                        "error": None
-                    }
-                else:
-                    # 품질이 부족하면 LangGraph로 재시도
-                    print("파인튜닝 모델 답변 품질 미달 - LangGraph로 재시도")
-                    print("\n" + "="*60)
-                    print("재라우팅: LangGraph 에이전트 사용 (답변 품질 미달)")
-                    print("="*60)
-                    
-                    # 입력 데이터 구성
-                    inputs = {
-                        "question": question,
-                        "student_profile": student_profile,
-                        "recent_dialogues": recent_dialogues
-                    }
-                    
-                    # 통합 에이전트 실행
-                    result = integrated_agent.invoke(
-                        inputs,
-                        config={
-                            "recursion_limit": 25,  # 재귀 제한
-                            "timeout": 120          # 2분 타임아웃
-                        }
-                    )
-                    
-                    if not verbose:
-                        sys.stdout = old_stdout
-                    
-                    # 결과 반환
-                    return {
-                        "question": question,
-                        "final_answer": result.get("final_answer", "답변을 생성하지 못했습니다."),
-                        "model_used": "langgraph_fallback",
-                        "context": result.get("context", ""),
-                        "datasources": result.get("datasources", []),
-                        "success": True,
-                        "error": None
-                    }
-            else:
-                # 파인튜닝 모델 오류 시 LangGraph로 재시도
-                print("파인튜닝 모델 오류 - LangGraph로 재시도")
-                print("\n" + "="*60)
-                print("재라우팅: LangGraph 에이전트 사용 (파인튜닝 모델 오류)")
-                print("="*60)
-                
-                # 입력 데이터 구성
-                inputs = {
-                    "question": question,
-                    "student_profile": student_profile,
-                    "recent_dialogues": recent_dialogues
-                }
-                
-                # 통합 에이전트 실행
-                result = integrated_agent.invoke(
-                    inputs,
-                    config={
-                        "recursion_limit": 25,  # 재귀 제한
-                        "timeout": 120          # 2분 타임아웃
-                    }
-                )
-                
-                if not verbose:
-                    sys.stdout = old_stdout
-                
-                # 결과 반환
-                return {
-                    "question": question,
-                    "final_answer": result.get("final_answer", "답변을 생성하지 못했습니다."),
-                    "model_used": "langgraph_fallback",
-                    "context": result.get("context", ""),
-                    "datasources": result.get("datasources", []),
-                    "success": True,
-                    "error": None
-                }
-        
-        # ==========================================
-        # 🤖 3단계: 복잡한 질문 → LangGraph 에이전트 사용
-        # ==========================================
-        else:
-            print("\n" + "="*60)
-            print("라우팅 결정: LangGraph 에이전트 사용 (복잡한 질문)")
-            print("="*60)
-            
-            # 입력 데이터 구성
-            inputs = {
-                "question": question,
-                "student_profile": student_profile,
-                "recent_dialogues": recent_dialogues
-            }
-            
-            # 통합 에이전트 실행
-            result = integrated_agent.invoke(
-                inputs,
-                config={
-                    "recursion_limit": 25,  # 재귀 제한
-                    "timeout": 120          # 2분 타임아웃
-                }
-            )
-            
-            if not verbose:
-                sys.stdout = old_stdout
-            
-            # 결과 반환
-            return {
-                "question": question,
-                "final_answer": result.get("final_answer", "답변을 생성하지 못했습니다."),
-                "model_used": "langgraph",
-                "context": result.get("context", ""),
-                "datasources": result.get("datasources", []),
-                "success": True,
-                "error": None
-            }
+        with request_deadline(REQUEST_TIMEOUT if timeout is None else timeout) as deadline_scope:
+            # ==========================================
+            # 🗂 0단계: 시맨틱 캐시 조회 (비슷한 질문의 이전 답변)
+            # ==========================================
+            cache = get_answer_cache()
+            scope = cache.scope_for(student_profile, recent_dialogues, force_mode, question=question)
+            cached, vector = cache.lookup(question, scope)
+            if cached is not None:
+                return _cached_response(question, cached)
+
+            result = _route_answer(question, inputs, verbose, force_mode)
+            # 시간 부족으로 축소된 답변은 캐시하지 않음
+            if deadline_scope is None or not deadline_scope.degraded:
+                cache.store(vector, scope, result)
+            return result
         
     except Exception as e:
-        if not verbose:
+        if old_stdout is not None:
+            sys.stdout, old_stdout = old_stdout, None
+        return _error_response(question, e)
+
+    finally:
+        if old_stdout is not None:
             sys.stdout = old_stdout
-        
-        error_msg = str(e)
-        print(f"오류 발생: {error_msg[:200]}")
-        
-        return {
-            "question": question,
-            "final_answer": "오류로 인해 답변을 생성하지 못했습니다.",
-            "model_used": "error",
-            "context": "",
-            "datasources": [],
-            "success": False,
-            "error": error_msg
-        }
+
+
+async def aget_answer(
+    question: str,
+    student_profile: Optional[Dict[str, str]] = None,
+    recent_dialogues: Optional[List[Dict[str, str]]] = None,
+    verbose: bool = True,
+    force_mode: Optional[Literal["simple", "complex"]] = None,
+    timeout: Optional[float] = None
+) -> Dict:
+    """
+    get_answer의 비동기 버전 (FastAPI 등 이벤트 루프 안에서 사용)
+
+    라우팅/폴백/반환 형식은 get_answer와 동일하며, LLM·그래프·파인튜닝 API 호출이
+    모두 await로 실행되어 이벤트 루프를 막지 않습니다.
+    verbose=False여도 stdout을 교체하지 않습니다 (동시 요청 간 출력이 섞이는 것을 방지).
+    판별/재가공/평가 함수의 상세 로그만 생략됩니다.
+
+    사용법:
+        result = await aget_answer("중앙대학교 이과 편입은 어떤 과목을 준비해야 하나요?")
+    """
+    inputs = _default_inputs(question, student_profile, recent_dialogues)
+
+    try:
+        with request_deadline(REQUEST_TIMEOUT if timeout is None else timeout) as deadline_scope:
+            # 🗂 시맨틱 캐시 조회
+            cache = get_answer_cache()
+            scope = cache.scope_for(student_profile, recent_dialogues, force_mode, question=question)
+            cached, vector = await cache.alookup(question, scope)
+            if cached is not None:
+                return _cached_response(question, cached)
+
+            result = await _aroute_answer(question, inputs, verbose, force_mode)
+            if deadline_scope is None or not deadline_scope.degraded:
+                cache.store(vector, scope, result)
+            return result
+
+    except Exception as e:
+        return _error_response(question, e)
+
+
+# ======================================
+# 📡 스트리밍 API (main.py /api/chat/stream)
+# ======================================
+# 이벤트 (이름, 데이터):
+# - ("token", {"text": ...}): 답변 조각 (이어 붙이면 답변)
+# - ("reset", {"reason": ...}): 지금까지 받은 조각 폐기 (품질 미달로 재라우팅, 시간 초과로 답변 교체 등)
+# - ("progress", {...}): 단계 시작/종료 (그래프 노드, 서브 에이전트 내부 단계, 소요 시간 포함, progress.py 참고)
+# - ("done", 응답 dict): get_answer와 같은 형식의 최종 결과 (final_answer가 최종 기준)
+def _token(text: str) -> Tuple[str, Dict]:
+    return "token", {"text": text}
+
+
+def _reset(reason: str) -> Tuple[str, Dict]:
+    return "reset", {"reason": reason}
+
+
+def _chunk_text(chunk) -> str:
+    content = getattr(chunk, "content", "")
+    if isinstance(content, str):
+        return content
+    # 여러 파트로 된 content (예: [{"type": "text", "text": "..."}])
+    return "".join(part.get("text", "") if isinstance(part, dict) else str(part) for part in content)
+
+
+async def _astream_integrated(inputs: Dict, model_used: str, tracker: ProgressTracker):
+    """통합 에이전트 실행 중 노드 진행 상황과 최종 답변 생성 토큰을 전달하고, 끝나면 done 이벤트"""
+    streamed = []
+    result = None
+    async for event in get_integrated_agent().astream_events(inputs, config=LANGGRAPH_CONFIG, version="v2"):
+        kind = event["event"]
+        progress = tracker.from_graph_event(event)
+        if progress:
+            yield "progress", progress
+        # 서브 에이전트의 답변 생성 토큰은 제외 (최종 답변 LLM 호출에만 FINAL_ANSWER_TAG가 붙어 있음)
+        elif kind == "on_chat_model_stream" and FINAL_ANSWER_TAG in event.get("tags", []):
+            text = _chunk_text(event["data"]["chunk"])
+            if text:
+                streamed.append(text)
+                yield _token(text)
+        elif kind == "on_chain_end" and not event.get("parent_ids"):
+            result = event["data"].get("output")
+
+    response = _langgraph_response(inputs["question"], result or {}, model_used)
+    # 스트리밍된 내용과 최종 답변이 다르면 (시간 초과로 서브 에이전트 답변을 사용한 경우 등) 최종 답변으로 교체
+    if "".join(streamed) != response["final_answer"]:
+        if streamed:
+            yield _reset("최종 답변 교체")
+        yield _token(response["final_answer"])
+    yield "done", response
+
+
+async def _astream_finetuned(question: str, inputs: Dict, verbose: bool, tracker: ProgressTracker):
+    """
+    파인튜닝 답변의 재가공을 스트리밍한 뒤 품질 평가
+    - 스트리밍 중에는 재가공과 품질 평가를 나눠 호출 (평가는 답변이 완성된 뒤에만 가능)
+    - 품질 미달이면 reset 후 LangGraph 답변을 스트리밍
+    """
+    yield "progress", tracker.start("finetuned_model")
+    answer = await acall_finetuned_model(
+        question=question,
+        max_tokens=100,
+        temperature=0.3
+    )
+    yield "progress", tracker.end("finetuned_model")
+
+    if answer.startswith("오류:"):
+        print("파인튜닝 모델 오류 - LangGraph로 재시도")
+        _print_route("재라우팅: LangGraph 에이전트 사용 (파인튜닝 모델 오류)")
+        async for event in _astream_integrated(inputs, "langgraph_fallback", tracker):
+            yield event
+        return
+
+    yield "progress", tracker.start("refine")
+    streamed = []
+    try:
+        async for text in astream_refined_answer(question, answer):
+            streamed.append(text)
+            yield _token(text)
+        refined_answer = _refined_result(question, answer, "".join(streamed), verbose)
+
+    except Exception as e:
+        if isinstance(e, DeadlineExceeded):
+            mark_degraded(f"파인튜닝 답변 재가공 중단: {e}")
+        elif verbose:
+            print(f"답변 재가공 오류 (원본 답변 사용): {str(e)[:100]}")
+        if streamed:
+            yield _reset("답변 재가공 중단 - 원본 답변 사용")
+        yield _token(answer)
+        refined_answer = answer
+    yield "progress", tracker.end("refine")
+
+    yield "progress", tracker.start("grade")
+    passed = await aevaluate_answer_quality(question, refined_answer, verbose=verbose)
+    yield "progress", tracker.end("grade")
+
+    if passed:
+        print("파인튜닝 모델 답변 재가공 및 품질 통과 - 최종 답변으로 사용")
+        yield "done", _finetuned_response(question, refined_answer)
+        return
+
+    if not has_budget(MIN_FALLBACK_BUDGET):
+        mark_degraded("남은 시간 부족 → LangGraph 재시도 없이 파인튜닝 답변 사용")
+        yield "done", _finetuned_response(question, refined_answer, "finetuned_best_effort")
+        return
+
+    print("파인튜닝 모델 답변 품질 미달 - LangGraph로 재시도")
+    _print_route("재라우팅: LangGraph 에이전트 사용 (답변 품질 미달)")
+    yield _reset("답변 품질 미달 - LangGraph로 재시도")
+    async for event in _astream_integrated(inputs, "langgraph_fallback", tracker):
+        yield event
+
+
+async def astream_answer(
+    question: str,
+    student_profile: Optional[Dict[str, str]] = None,
+    recent_dialogues: Optional[List[Dict[str, str]]] = None,
+    verbose: bool = True,
+    force_mode: Optional[Literal["simple", "complex"]] = None,
+    timeout: Optional[float] = None,
+    progress: bool = True
+):
+    """
+    aget_answer의 스트리밍 버전 (비동기 제너레이터)
+
+    라우팅/폴백/캐시/시간 예산은 aget_answer와 동일하며, 최종 답변(LangGraph 종합 답변 또는
+    파인튜닝 답변 재가공)을 생성되는 대로 ("token", {"text": ...}) 이벤트로 전달합니다.
+    이미 보낸 조각을 버려야 하면 ("reset", {...}), 마지막에는 항상 ("done", 응답 dict)을 보냅니다.
+    progress=True이면 단계별 진행 상황 ("progress", {...})도 보내고, done 응답에 단계별 소요 시간
+    ("timings": {"route": 0.8, "search_web/retrieve": 1.05, ...})을 포함합니다.
+
+    사용법:
+        async for event, data in astream_answer("수학 공부는 어떻게 해야 할까요?"):
+            if event == "token":
+                print(data["text"], end="")
+    """
+    inputs = _default_inputs(question, student_profile, recent_dialogues)
+    tracker = ProgressTracker()
+    streamed = False
+
+    try:
+        with request_deadline(REQUEST_TIMEOUT if timeout is None else timeout) as deadline_scope:
+            # 🗂 시맨틱 캐시 조회 (캐시된 답변은 한 번에 전달)
+            cache = get_answer_cache()
+            scope = cache.scope_for(student_profile, recent_dialogues, force_mode, question=question)
+            cached, vector = await cache.alookup(question, scope)
+            if cached is not None:
+                response = _cached_response(question, cached)
+                yield _token(response["final_answer"])
+                yield "done", response
+                return
+
+            # 🔀 질문 복잡도 판별 및 라우팅
+            use_simple_model = _use_simple_model(force_mode)
+            if use_simple_model is None:
+                if progress:
+                    yield "progress", tracker.start("route")
+                use_simple_model, datasources = await adecide_answer_route(question, inputs, verbose=verbose)
+                inputs = _with_datasources(inputs, datasources)
+                if progress:
+                    yield "progress", tracker.end("route")
+
+            if not use_simple_model:
+                _print_route("라우팅 결정: LangGraph 에이전트 사용 (복잡한 질문)")
+                events = _astream_integrated(inputs, "langgraph", tracker)
+            elif not _finetuned_available():
+                _print_route("라우팅 결정: LangGraph 에이전트 사용 (파인튜닝 모델 차단 중)")
+                events = _astream_integrated(inputs, "langgraph_bypass", tracker)
+            else:
+                _print_route("라우팅 결정: 파인튜닝 모델 사용 (간단한 질문)")
+                events = _astream_finetuned(question, inputs, verbose, tracker)
+
+            async for event, data in events:
+                if event == "token":
+                    streamed = True
+                elif event == "progress" and not progress:
+                    continue
+                elif event == "done":
+                    if deadline_scope is None or not deadline_scope.degraded:
+                        cache.store(vector, scope, data)
+                    if progress:
+                        data = {**data, "timings": tracker.timings()}
+                yield event, data
+
+    except Exception as e:
+        if streamed:
+            yield _reset("오류 발생")
+        yield "done", _error_response(question, e)
+
+
+# 이전 버전 호환: from api import llm, integrated_agent 등은 접근 시점에 초기화
+_LAZY_ATTRS = {
+    "llm": get_llm,
+    "llm_with_tools": get_llm_with_tools,
+    "guideline_agent": get_guideline_agent,
+    "search_web_agent": get_search_web_agent,
+    "integrated_agent": get_integrated_agent,
+}
+
+
+def __getattr__(name):
+    if name in _LAZY_ATTRS:
+        return _LAZY_ATTRS[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 # ======================================
@@ -0,0 +1,195 @@
+# 외부 엔드포인트용 서킷 브레이커 (closed → open → half_open → closed)
+"""
+엔드포인트가 내려가 있거나 잠들어 있을 때(HuggingFace Space 슬립 등) 요청마다 재시도/타임아웃을
+기다리지 않도록, 최근 호출 결과를 보고 일정 시간 동안 호출 자체를 막습니다.
+
+- closed: 정상. 최근 window초 동안의 호출 중 실패(+느린 호출) 비율이 failure_rate 이상이거나
+          연속 실패가 consecutive_failures 이상이면 open
+- open: cooldown초 동안 모든 호출 거부 (호출하는 쪽은 바로 대체 경로 사용)
+- half_open: cooldown이 지나면 probe 요청을 하나씩만 허용
+             성공하면 closed, 실패하면 다시 open
+
+사용법:
+    from circuit_breaker import CircuitBreaker
+
+    breaker = CircuitBreaker("finetuned_model")
+    if breaker.allow_request():
+        try:
+            ...
+            breaker.record_success(latency)
+        except Exception:
+            breaker.record_failure()
+    else:
+        ...  # 대체 경로
+
+    breaker.is_available()   # 상태만 확인 (probe 슬롯을 차지하지 않음)
+    breaker.stats()
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional
+
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """최근 호출의 실패율 / 지연 시간 기반 서킷 브레이커 (스레드 안전)"""
+
+    def __init__(
+        self,
+        name: str,
+        failure_rate: float = 0.5,
+        min_calls: int = 4,
+        window: float = 60.0,
+        consecutive_failures: int = 3,
+        cooldown: float = 30.0,
+        slow_call: Optional[float] = None,
+        enabled: bool = True,
+    ):
+        self.name = name
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.window = window
+        self.consecutive_failures = consecutive_failures
+        self.cooldown = cooldown
+        self.slow_call = slow_call
+        self.enabled = enabled
+
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._consecutive = 0
+        # (시각, 실패 또는 느린 호출 여부)
+        self._calls = deque()
+        self._lock = threading.Lock()
+        self._stats = {"opened": 0, "rejected": 0, "probes": 0}
+
+    # --------------------------------------
+    # 상태 전이
+    # --------------------------------------
+    def _prune(self, now: float):
+        while self._calls and now - self._calls[0][0] > self.window:
+            self._calls.popleft()
+
+    def _open(self, now: float, reason: str):
+        if self._state != OPEN:
+            print(f" [circuit-breaker] {self.name} 차단 (open): {reason}")
+            self._stats["opened"] += 1
+        self._state = OPEN
+        self._opened_at = now
+        self._probe_in_flight = False
+
+    def _refresh(self, now: float):
+        """cooldown이 지난 open 상태를 half_open으로 전환"""
+        if self._state == OPEN and now - self._opened_at >= self.cooldown:
+            self._state = HALF_OPEN
+            self._probe_in_flight = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._refresh(time.monotonic())
+            return self._state
+
+    def is_available(self) -> bool:
+        """호출이 허용될 상태인지 확인만 함 (half_open probe 슬롯을 차지하지 않음)"""
+        if not self.enabled:
+            return True
+        with self._lock:
+            self._refresh(time.monotonic())
+            if self._state == CLOSED:
+                return True
+            return self._state == HALF_OPEN and not self._probe_in_flight
+
+    def allow_request(self) -> bool:
+        """실제 호출 직전에 호출 (half_open이면 probe 하나만 통과)"""
+        if not self.enabled:
+            return True
+        with self._lock:
+            self._refresh(time.monotonic())
+            if self._state == CLOSED:
+                return True
+            if self._state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                self._stats["probes"] += 1
+                print(f" [circuit-breaker] {self.name} probe 요청 허용 (half_open)")
+                return True
+            self._stats["rejected"] += 1
+            return False
+
+    # --------------------------------------
+    # 결과 기록
+    # --------------------------------------
+    def record_success(self, latency: Optional[float] = None):
+        if not self.enabled:
+            return
+        slow = self.slow_call is not None and latency is not None and latency > self.slow_call
+        now = time.monotonic()
+        with self._lock:
+            if self._state == HALF_OPEN:
+                if slow:
+                    self._open(now, f"probe 응답 지연 ({latency:.1f}s)")
+                    return
+                print(f" [circuit-breaker] {self.name} 복구 (closed)")
+                self._state = CLOSED
+                self._calls.clear()
+                self._consecutive = 0
+                self._probe_in_flight = False
+                return
+            self._consecutive = 0
+            self._calls.append((now, slow))
+            self._check_rate(now)
+
+    def record_failure(self):
+        if not self.enabled:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._open(now, "probe 실패")
+                return
+            if self._state == OPEN:
+                return
+            self._consecutive += 1
+            self._calls.append((now, True))
+            if self._consecutive >= self.consecutive_failures:
+                self._open(now, f"연속 실패 {self._consecutive}회")
+                return
+            self._check_rate(now)
+
+    def release(self):
+        """결과 없이 끝난 호출 (취소 등) — half_open probe 슬롯만 반환"""
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._probe_in_flight = False
+
+    def _check_rate(self, now: float):
+        self._prune(now)
+        if len(self._calls) < self.min_calls:
+            return
+        bad = sum(1 for _, failed in self._calls if failed)
+        rate = bad / len(self._calls)
+        if rate >= self.failure_rate:
+            self._open(now, f"최근 {len(self._calls)}회 중 실패/지연 비율 {rate:.0%}")
+
+    def stats(self) -> Dict:
+        with self._lock:
+            now = time.monotonic()
+            self._refresh(now)
+            self._prune(now)
+            bad = sum(1 for _, failed in self._calls if failed)
+            return {
+                "name": self.name,
+                "enabled": self.enabled,
+                "state": self._state,
+                "recent_calls": len(self._calls),
+                "recent_failure_rate": round(bad / len(self._calls), 3) if self._calls else 0.0,
+                "consecutive_failures": self._consecutive,
+                "open_remaining": round(max(0.0, self.cooldown - (now - self._opened_at)), 1) if self._state == OPEN else 0.0,
+                **self._stats,
+            }
@@ -0,0 +1,93 @@
+"""
+지연 초기화(lazy) 컴포넌트 레지스트리
+
+Chroma DB, LLM, 컴파일된 그래프 등 초기화 비용이 큰 객체를 import 시점이 아니라
+처음 사용할 때 한 번만 생성하고, 서버 시작 시 warm_up()으로 미리 데워둘 수 있습니다.
+
+사용법:
+    from components import component
+
+    @component("llm")
+    def get_llm():
+        return ChatGoogleGenerativeAI(...)
+
+    get_llm()        # 최초 호출 시 생성, 이후 같은 객체 반환
+    warm_up()        # 등록된 모든 컴포넌트 초기화 (소요 시간 반환)
+    readiness()      # 컴포넌트별 준비 상태 / 초기화 시간
+"""
+
+import threading
+import time
+from functools import wraps
+from typing import Callable, Dict, Iterable, Optional
+
+_UNSET = object()
+
+# 등록 순서 = 의존 순서 (warm_up 시 앞에서부터 초기화)
+_components: Dict[str, Callable] = {}
+_timings: Dict[str, float] = {}
+_errors: Dict[str, str] = {}
+
+
+def component(name: str):
+    """팩토리 함수를 스레드 안전한 지연 싱글톤 getter로 등록하는 데코레이터"""
+    def decorator(factory: Callable):
+        lock = threading.Lock()
+        instance = _UNSET
+
+        @wraps(factory)
+        def getter():
+            nonlocal instance
+            if instance is _UNSET:
+                with lock:
+                    if instance is _UNSET:
+                        start = time.perf_counter()
+                        try:
+                            created = factory()
+                        except Exception as e:
+                            _errors[name] = str(e)[:200]
+                            raise
+                        _timings[name] = time.perf_counter() - start
+                        _errors.pop(name, None)
+                        instance = created
+            return instance
+
+        getter.is_ready = lambda: instance is not _UNSET
+        _components[name] = getter
+        return getter
+    return decorator
+
+
+def is_ready(name: str) -> bool:
+    """컴포넌트가 이미 초기화되었는지 확인 (초기화를 유발하지 않음)"""
+    getter = _components.get(name)
+    return getter is not None and getter.is_ready()
+
+
+def warm_up(names: Optional[Iterable[str]] = None) -> Dict[str, float]:
+    """
+    컴포넌트를 등록 순서대로 초기화하고 컴포넌트별 초기화 시간(초)을 반환합니다.
+    (의존 컴포넌트가 먼저 초기화되므로 각 시간은 해당 컴포넌트 자체의 비용)
+    """
+    targets = list(names) if names is not None else list(_components)
+    for name in targets:
+        if not is_ready(name):
+            print(f" [warm-up] {name} 초기화 중...")
+        _components[name]()
+    return {name: _timings[name] for name in targets if name in _timings}
+
+
+def readiness() -> Dict:
+    """전체 준비 여부와 컴포넌트별 상태"""
+    components = {
+        name: {
+            "ready": getter.is_ready(),
+            "init_seconds": round(_timings[name], 3) if name in _timings else None,
+            "error": _errors.get(name),
+        }
+        for name, getter in _components.items()
+    }
+    return {
+        "ready": bool(components) and all(c["ready"] for c in components.values()),
+        "components": components,
+    }
@@ -0,0 +1,229 @@
+# 답변 생성 프롬프트에 넣을 정보(근거)를 토큰 예산에 맞춰 정리
+"""
+검색/추출된 정보를 그대로 이어 붙이면 질문마다 프롬프트 길이(= 지연 시간, 비용)가 크게 달라지므로,
+답변 생성 노드(통합 에이전트 최종 답변 / GuidelineDB·웹 서브 에이전트 답변)마다 다음 순서로 정리합니다.
+
+1. 토큰 수 추정 (로컬 근사치, 토크나이저/API 호출 없음)
+2. 중복 제거: GuidelineDB와 웹 검색에서 겹치는 사실은 점수가 높은 쪽만 남기고 출처는 합침
+3. 정렬: 관련성 × 충실성 점수가 높은 순 (점수가 없으면 1.0, 같은 점수는 입력 순서 유지)
+4. 노드별 토큰 예산까지만 포함, 제외된 토큰 수를 로그와 통계로 남김
+
+사실(fact) 형식:
+    {"content": "...", "source": "GuidelineDB (cau2025-page7)", "relevance": 0.9, "faithfulness": 0.8}
+    - source / relevance / faithfulness는 생략 가능
+    - truncatable=True이면 예산이 모자랄 때 통째로 빼지 않고 잘라서 포함 (서브 에이전트 답변처럼 긴 문서)
+    - source가 없는 문서(서브 에이전트 답변, 검색 실패 안내)는 그대로 한 줄로 넣고 중복 제거 대상에서 제외
+
+사용법:
+    from context_packer import pack_facts
+
+    packed = pack_facts(facts, budget=CONTEXT_BUDGET_FINAL, name="answer_final")
+    packed.text            # 프롬프트에 넣을 문자열 ("- 내용 (출처: ...)" 줄 목록)
+    packed.dropped_tokens  # 예산 초과로 제외된 토큰 수
+"""
+
+import math
+import os
+import re
+import threading
+from typing import Dict, List, Optional, Tuple
+
+
+# 노드별 토큰 예산 (0 이하이면 예산 제한 없이 중복 제거/정렬만 수행)
+CONTEXT_BUDGET_FINAL = int(os.getenv("CONTEXT_BUDGET_FINAL", "3000"))
+CONTEXT_BUDGET_SUB_AGENT = int(os.getenv("CONTEXT_BUDGET_SUB_AGENT", "1500"))
+# 두 사실이 겹친다고 판단하는 기준 (짧은 쪽 문자 3-gram 중 겹치는 비율)
+DEDUPE_THRESHOLD = float(os.getenv("CONTEXT_DEDUPE_THRESHOLD", "0.8"))
+
+# 토큰 수 근사: 영문/숫자는 약 4자당 1토큰, 한글 등 비ASCII 문자는 문자당 약 0.7토큰
+ASCII_CHARS_PER_TOKEN = 4
+NON_ASCII_TOKENS_PER_CHAR = 0.7
+# 잘라서 넣을 때 최소한 남아 있어야 하는 예산 (이보다 적으면 자르지 않고 제외)
+MIN_TRUNCATE_TOKENS = 64
+
+
+def estimate_tokens(text: str) -> int:
+    """토큰 수 근사치 (LLM 토크나이저 없이 문자 종류별 비율로 계산)"""
+    if not text:
+        return 0
+    ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+    return math.ceil(ascii_chars / ASCII_CHARS_PER_TOKEN + (len(text) - ascii_chars) * NON_ASCII_TOKENS_PER_CHAR)
+
+
+class PackedContext:
+    """토큰 예산에 맞춰 정리된 정보와 정리 결과"""
+
+    def __init__(self, facts: List[Dict], input_tokens: int, duplicates: int, dropped: int, dropped_tokens: int, truncated: int):
+        self.facts = facts
+        self.input_tokens = input_tokens
+        self.duplicates = duplicates
+        self.dropped = dropped
+        self.dropped_tokens = dropped_tokens
+        self.truncated = truncated
+
+    @property
+    def lines(self) -> List[str]:
+        return [_render(fact) for fact in self.facts]
+
+    @property
+    def text(self) -> str:
+        return "\n".join(self.lines)
+
+    @property
+    def used_tokens(self) -> int:
+        return sum(fact["tokens"] for fact in self.facts)
+
+
+# --------------------------------------
+# 정리 단계
+# --------------------------------------
+def _render(fact: Dict) -> str:
+    sources = fact.get("sources") or []
+    if not sources:
+        return fact["content"]
+    content = fact["content"].strip().replace("\n", "\n  ")
+    return f"- {content} (출처: {', '.join(sources)})"
+
+
+def _score(fact: Dict) -> float:
+    relevance = fact.get("relevance")
+    faithfulness = fact.get("faithfulness")
+    return (1.0 if relevance is None else relevance) * (1.0 if faithfulness is None else faithfulness)
+
+
+def _shingles(text: str) -> set:
+    normalized = re.sub(r"[\W_]+", "", text.lower())
+    if len(normalized) < 3:
+        return {normalized} if normalized else set()
+    return {normalized[i:i + 3] for i in range(len(normalized) - 2)}
+
+
+def _overlaps(a: set, b: set) -> bool:
+    if not a or not b:
+        return False
+    return len(a & b) / min(len(a), len(b)) >= DEDUPE_THRESHOLD
+
+
+def _dedupe(facts: List[Dict]) -> Tuple[List[Dict], int]:
+    """겹치는 사실은 점수가 높은(같으면 먼저 나온) 쪽만 남기고 출처를 합침"""
+    kept: List[Dict] = []
+    duplicates = 0
+    for fact in sorted(facts, key=lambda f: -f["score"]):
+        if not fact["sources"]:
+            kept.append(fact)
+            continue
+        for other in kept:
+            if other["sources"] and _overlaps(fact["shingles"], other["shingles"]):
+                for source in fact["sources"]:
+                    if source not in other["sources"]:
+                        other["sources"].append(source)
+                duplicates += 1
+                break
+        else:
+            kept.append(fact)
+    return kept, duplicates
+
+
+def _truncate(fact: Dict, budget: int) -> Dict:
+    """예산에 맞게 내용 뒷부분을 잘라냄"""
+    content = fact["content"]
+    keep = int(len(content) * budget / max(fact["tokens"], 1))
+    while keep > 0:
+        truncated = {**fact, "content": content[:keep].rstrip() + " …"}
+        truncated["tokens"] = estimate_tokens(_render(truncated))
+        if truncated["tokens"] <= budget:
+            return truncated
+        keep = int(keep * 0.9)
+    return None
+
+
+def pack_facts(facts: List[Dict], budget: Optional[int] = None, name: str = "context") -> PackedContext:
+    """
+    사실 목록을 중복 제거 → 점수순 정렬 → 토큰 예산까지 포함
+    budget이 None이면 CONTEXT_BUDGET_FINAL, 0 이하이면 제한 없음
+    """
+    budget = CONTEXT_BUDGET_FINAL if budget is None else budget
+
+    prepared = []
+    for fact in facts:
+        content = (fact.get("content") or "").strip()
+        if not content:
+            continue
+        source = fact.get("source")
+        item = {
+            **fact,
+            "content": content,
+            "sources": [source] if source else [],
+            "score": _score(fact),
+            "shingles": _shingles(content),
+        }
+        item["tokens"] = estimate_tokens(_render(item))
+        prepared.append(item)
+
+    input_tokens = sum(item["tokens"] for item in prepared)
+    unique, duplicates = _dedupe(prepared)
+    # 출처가 합쳐지면 길이가 달라지므로 다시 계산
+    for item in unique:
+        item["tokens"] = estimate_tokens(_render(item))
+
+    packed: List[Dict] = []
+    used = dropped = dropped_tokens = truncated = 0
+    for item in unique:
+        if budget <= 0 or used + item["tokens"] <= budget:
+            packed.append(item)
+            used += item["tokens"]
+            continue
+        remaining = budget - used
+        if item.get("truncatable") and remaining >= MIN_TRUNCATE_TOKENS:
+            cut = _truncate(item, remaining)
+            if cut is not None:
+                packed.append(cut)
+                used += cut["tokens"]
+                dropped_tokens += item["tokens"] - cut["tokens"]
+                truncated += 1
+                continue
+        dropped += 1
+        dropped_tokens += item["tokens"]
+
+    for item in packed:
+        item.pop("shingles", None)
+
+    result = PackedContext(packed, input_tokens, duplicates, dropped, dropped_tokens, truncated)
+    _record(name, result)
+    if prepared:
+        print(
+            f" [context] {name}: 정보 {len(prepared)}개 ({input_tokens} 토큰) → {len(packed)}개 ({result.used_tokens} 토큰) 사용"
+            f" | 중복 {duplicates}개, 예산 초과 {dropped}개 제외 / {truncated}개 축약 ({dropped_tokens} 토큰)"
+        )
+    return result
+
+
+# ======================================
+# 노드별 통계 (/api/status)
+# ======================================
+_stats: Dict[str, Dict[str, int]] = {}
+_stats_lock = threading.Lock()
+
+
+def _record(name: str, result: PackedContext):
+    with _stats_lock:
+        stats = _stats.setdefault(name, {
+            "calls": 0, "input_tokens": 0, "used_tokens": 0, "dropped_tokens": 0, "duplicates": 0, "dropped_facts": 0,
+        })
+        stats["calls"] += 1
+        stats["input_tokens"] += result.input_tokens
+        stats["used_tokens"] += result.used_tokens
+        stats["dropped_tokens"] += result.dropped_tokens
+        stats["duplicates"] += result.duplicates
+        stats["dropped_facts"] += result.dropped
+
+
+def context_packer_stats() -> Dict[str, Dict]:
+    with _stats_lock:
+        return {
+            name: {
+                **stats,
+                "avg_used_tokens": round(stats["used_tokens"] / stats["calls"], 1) if stats["calls"] else 0.0,
+            }
+            for name, stats in _stats.items()
+        }
@@ -0,0 +1,173 @@
+# 요청 단위 시간 예산(deadline) 전파
+"""
+get_answer / aget_answer가 요청 시작 시 deadline을 설정하면, 그 안에서 실행되는
+모든 그래프 노드 / LLM 호출 / Tavily 검색이 남은 시간을 기준으로 동작합니다.
+
+- deadline은 contextvars로 전파됨 (LangGraph 병렬 노드, 스레드 풀, asyncio 태스크 모두 컨텍스트를 복사)
+- bounded / abounded: 남은 시간 안에 끝나지 않으면 DeadlineExceeded
+  (reserve초는 이후 단계를 위해 남겨둠, 예: 최종 답변 생성 시간)
+- has_budget: 쿼리 재작성 루프 같은 선택적 작업을 할 시간이 있는지 확인
+- mark_degraded: 시간 부족으로 일부 단계를 생략/축소했음을 기록 (이런 답변은 캐시하지 않음)
+- deadline이 설정되지 않은 곳(노트북에서 그래프 직접 실행 등)에서는 모든 함수가 기존처럼 동작
+
+사용법:
+    from deadline import request_deadline, has_budget, bounded, abounded, DeadlineExceeded
+
+    with request_deadline(60) as scope:
+        if has_budget(MIN_REWRITE_BUDGET):
+            ...                                               # 선택적 작업
+        answer = bounded(llm.invoke, prompt, reserve=8)       # 동기
+        answer = await abounded(llm.ainvoke(prompt))          # 비동기
+        async for chunk in abounded_iter(chain.astream(x)):   # 스트리밍
+            ...
+    scope.degraded  # 시간 부족으로 축소된 답변인지
+"""
+
+import asyncio
+import os
+import time
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, List, Optional
+
+from langchain_core.runnables.config import ContextThreadPoolExecutor
+
+
+# 요청 전체 시간 예산 (초, 0이면 제한 없음)
+REQUEST_TIMEOUT = float(os.getenv("REQUEST_TIMEOUT", "60"))
+# 답변 생성 한 단계(서브 에이전트 답변 / 최종 답변)를 위해 남겨두는 시간
+ANSWER_RESERVE = float(os.getenv("DEADLINE_ANSWER_RESERVE", "8"))
+# 쿼리 재작성 루프(재작성 → 재검색 → 재추출)를 시작하기 위한 최소 남은 시간
+MIN_REWRITE_BUDGET = float(os.getenv("DEADLINE_MIN_REWRITE_BUDGET", "25"))
+# 파인튜닝 경로 실패 시 LangGraph로 재시도하기 위한 최소 남은 시간
+MIN_FALLBACK_BUDGET = float(os.getenv("DEADLINE_MIN_FALLBACK_BUDGET", "15"))
+
+
+class DeadlineExceeded(TimeoutError):
+    """요청 시간 예산 초과"""
+
+
+class DeadlineScope:
+    """요청 하나의 deadline과 축소 여부 (컨텍스트가 복사되어도 같은 객체를 공유)"""
+
+    def __init__(self, deadline: float):
+        self.deadline = deadline
+        self.degraded = False
+        self.skipped: List[str] = []
+
+
+_scope: ContextVar[Optional[DeadlineScope]] = ContextVar("request_deadline", default=None)
+
+# 동기 호출을 제한 시간과 함께 실행하기 위한 스레드 풀 (콜백/트레이싱/deadline 컨텍스트 유지)
+# 시간 초과로 결과를 버린 호출도 클라이언트 제한 시간(LLM_TIMEOUT, WEB_SEARCH_TIMEOUT)까지는 작업자를 차지함
+# → 동시 요청 수 × 요청당 동시 호출 수(약 4)보다 넉넉하게 설정 (대기 시간도 예산에서 차감되므로 부족하면 거짓 시간 초과 발생)
+_executor = ContextThreadPoolExecutor(max_workers=int(os.getenv("DEADLINE_WORKERS", "64")))
+
+
+@contextmanager
+def request_deadline(timeout: Optional[float] = REQUEST_TIMEOUT):
+    """
+    timeout초 뒤를 deadline으로 설정 (None/0 이하이면 제한 없음)
+    바깥에 이미 deadline이 있으면 더 이른 쪽을 사용
+    """
+    if not timeout or timeout <= 0:
+        yield _scope.get()
+        return
+
+    deadline = time.monotonic() + timeout
+    outer = _scope.get()
+    if outer is not None:
+        deadline = min(deadline, outer.deadline)
+
+    scope = DeadlineScope(deadline)
+    token = _scope.set(scope)
+    try:
+        yield scope
+    finally:
+        _scope.reset(token)
+
+
+def remaining(reserve: float = 0.0) -> Optional[float]:
+    """남은 시간(초) - reserve, deadline이 없으면 None"""
+    scope = _scope.get()
+    if scope is None:
+        return None
+    return scope.deadline - time.monotonic() - reserve
+
+
+def has_budget(seconds: float) -> bool:
+    """seconds초 이상 남았는지 (deadline이 없으면 항상 True)"""
+    budget = remaining()
+    return budget is None or budget >= seconds
+
+
+def timeout_for(default: float, reserve: float = 0.0) -> float:
+    """기본 제한 시간과 남은 시간 중 작은 값 (0 이하 가능 → 호출하는 쪽에서 생략 처리)"""
+    budget = remaining(reserve)
+    return default if budget is None else min(default, budget)
+
+
+def mark_degraded(reason: str):
+    """시간 부족으로 단계를 생략/축소했음을 기록"""
+    scope = _scope.get()
+    print(f" [deadline] {reason}")
+    if scope is not None:
+        scope.degraded = True
+        scope.skipped.append(reason)
+
+
+def is_degraded() -> bool:
+    scope = _scope.get()
+    return scope is not None and scope.degraded
+
+
+def bounded(fn: Callable, *args, reserve: float = 0.0, **kwargs):
+    """
+    동기 호출을 남은 시간(- reserve) 안에서 실행
+    deadline이 없으면 그대로 호출, 시간 초과 시 DeadlineExceeded
+    (실행 중인 호출은 취소되지 않고 결과만 버림 → 호출 자체는 클라이언트 제한 시간으로 끝나야 함)
+    """
+    budget = remaining(reserve)
+    if budget is None:
+        return fn(*args, **kwargs)
+    if budget <= 0:
+        raise DeadlineExceeded(f"시간 예산 부족 ({getattr(fn, '__name__', 'call')})")
+
+    future = _executor.submit(fn, *args, **kwargs)
+    try:
+        return future.result(timeout=budget)
+    except FuturesTimeoutError:
+        future.cancel()
+        raise DeadlineExceeded(f"시간 예산 초과 ({budget:.1f}s, {getattr(fn, '__name__', 'call')})")
+
+
+async def abounded(awaitable, reserve: float = 0.0):
+    """bounded의 비동기 버전 (awaitable을 남은 시간 안에서 실행, 시간 초과 시 취소)"""
+    budget = remaining(reserve)
+    if budget is None:
+        return await awaitable
+    if budget <= 0:
+        if asyncio.iscoroutine(awaitable):
+            awaitable.close()
+        raise DeadlineExceeded("시간 예산 부족")
+
+    try:
+        return await asyncio.wait_for(awaitable, budget)
+    except asyncio.TimeoutError:
+        raise DeadlineExceeded(f"시간 예산 초과 ({budget:.1f}s)")
+
+
+async def abounded_iter(aiterable, reserve: float = 0.0):
+    """비동기 스트림의 각 항목을 남은 시간 안에서 받음 (시간 초과 시 DeadlineExceeded, 스트림은 닫음)"""
+    iterator = aiterable.__aiter__()
+    try:
+        while True:
+            try:
+                item = await abounded(iterator.__anext__(), reserve)
+            except StopAsyncIteration:
+                return
+            yield item
+    finally:
+        if hasattr(iterator, "aclose"):
+            await iterator.aclose()
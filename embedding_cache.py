@@ -0,0 +1,163 @@
+# 임베딩 캐시 (메모리 LRU + SQLite 영구 저장)
+import asyncio
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from array import array
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from langchain_core.embeddings import Embeddings
+
+
+def normalize_text(text: str) -> str:
+    """캐시 키용 텍스트 정규화 (유니코드 NFC + 공백 정리)"""
+    return " ".join(unicodedata.normalize("NFC", str(text)).split())
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    임베딩 모델 앞단의 캐시 래퍼
+
+    - 키: (모델명, query/document 구분, 정규화된 텍스트)의 SHA-256
+    - 1차: 프로세스 내 LRU (max_memory_items개)
+    - 2차: SQLite 파일 (재시작 후에도 유지)
+    - 둘 다 없을 때만 실제 임베딩 API 호출
+    """
+
+    def __init__(
+        self,
+        underlying: Embeddings,
+        model_name: str,
+        cache_path: Optional[str] = None,
+        max_memory_items: int = 10000,
+    ):
+        self.underlying = underlying
+        self.model_name = model_name
+        self.cache_path = cache_path or os.getenv("EMBEDDING_CACHE_PATH", "./embedding_cache.sqlite")
+        self.max_memory_items = max_memory_items
+
+        self._memory: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+
+        self._conn = sqlite3.connect(self.cache_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " key TEXT PRIMARY KEY, vector BLOB NOT NULL, created_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    # --------------------------------------
+    # 캐시 내부 동작
+    # --------------------------------------
+    def _key(self, kind: str, text: str) -> str:
+        raw = f"{self.model_name}\x00{kind}\x00{normalize_text(text)}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _remember(self, key: str, vector: List[float]) -> None:
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
+
+    def _lookup(self, keys: List[str]) -> Dict[str, List[float]]:
+        """메모리 → SQLite 순으로 조회하여 찾은 벡터만 반환"""
+        found = {}
+        with self._lock:
+            missing = []
+            for key in keys:
+                if key in self._memory:
+                    self._memory.move_to_end(key)
+                    found[key] = self._memory[key]
+                    self._stats["memory_hits"] += 1
+                else:
+                    missing.append(key)
+
+            if missing:
+                placeholders = ",".join("?" * len(missing))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", missing
+                ).fetchall()
+                for key, blob in rows:
+                    vector = array("f", blob).tolist()
+                    self._remember(key, vector)
+                    found[key] = vector
+                    self._stats["disk_hits"] += 1
+                self._stats["misses"] += len(missing) - len(rows)
+        return found
+
+    def _store(self, items: Dict[str, List[float]]) -> None:
+        now = time.time()
+        with self._lock:
+            for key, vector in items.items():
+                self._remember(key, vector)
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector, created_at) VALUES (?, ?, ?)",
+                [(key, array("f", vector).tobytes(), now) for key, vector in items.items()],
+            )
+            self._conn.commit()
+
+    def _split(self, kind: str, texts: List[str]):
+        keys = [self._key(kind, t) for t in texts]
+        found = self._lookup(list(dict.fromkeys(keys)))
+        # 같은 배치 안의 중복 텍스트는 한 번만 임베딩
+        pending = {}
+        for key, text in zip(keys, texts):
+            if key not in found and key not in pending:
+                pending[key] = text
+        return keys, found, pending
+
+    # --------------------------------------
+    # Embeddings 인터페이스
+    # --------------------------------------
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys, found, pending = self._split("document", texts)
+        if pending:
+            vectors = self.underlying.embed_documents(list(pending.values()))
+            new_items = dict(zip(pending.keys(), vectors))
+            self._store(new_items)
+            found.update(new_items)
+        return [found[key] for key in keys]
+
+    def embed_query(self, text: str) -> List[float]:
+        keys, found, pending = self._split("query", [text])
+        if pending:
+            vector = self.underlying.embed_query(text)
+            self._store({keys[0]: vector})
+            return vector
+        return found[keys[0]]
+
+    # 비동기 경로: 락 + SQLite 조회/저장은 이벤트 루프를 막지 않도록 스레드에서 실행
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys, found, pending = await asyncio.to_thread(self._split, "document", texts)
+        if pending:
+            vectors = await self.underlying.aembed_documents(list(pending.values()))
+            new_items = dict(zip(pending.keys(), vectors))
+            await asyncio.to_thread(self._store, new_items)
+            found.update(new_items)
+        return [found[key] for key in keys]
+
+    async def aembed_query(self, text: str) -> List[float]:
+        keys, found, pending = await asyncio.to_thread(self._split, "query", [text])
+        if pending:
+            vector = await self.underlying.aembed_query(text)
+            await asyncio.to_thread(self._store, {keys[0]: vector})
+            return vector
+        return found[keys[0]]
+
+    # --------------------------------------
+    # 통계
+    # --------------------------------------
+    def stats(self) -> Dict[str, float]:
+        """캐시 적중/미스 카운터"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["memory_items"] = len(self._memory)
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = (stats["memory_hits"] + stats["disk_hits"]) / lookups if lookups else 0.0
+        return stats
@@ -0,0 +1,81 @@
+"""
+🧪 시맨틱 답변 캐시 범위 평가 스크립트
+
+질문 쌍(answer_cache_eval.jsonl)으로 답변 캐시가 다른 학교/연도의 답변을 돌려주지 않는지 확인합니다.
+- miss 쌍: 학교나 연도만 다른 질문 → 캐시 범위가 달라 반드시 미스여야 함
+- hit 쌍: 같은 학교/연도를 다르게 표현한 질문 → 같은 범위 (실제 히트 여부는 임베딩 유사도에 따라 결정)
+
+실행:
+    python eval_answer_cache.py
+    python eval_answer_cache.py --with-embeddings   # 실제 임베딩으로 첫 질문을 저장하고 두 번째 질문을 조회
+
+miss 쌍이 하나라도 히트하면 종료 코드 1을 반환합니다.
+"""
+
+import argparse
+import json
+import sys
+
+from answer_cache import AnswerCache
+
+EVAL_SET_PATH = "answer_cache_eval.jsonl"
+PROFILE = {"target_university": "미지정", "track": "계열 미지정"}
+
+
+def load_eval_set(path: str = EVAL_SET_PATH):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def check_scopes(items):
+    """범위만 비교 (임베딩 호출 없음): miss 쌍은 범위가 달라야 하고 hit 쌍은 같아야 함"""
+    cache = AnswerCache()
+    wrong = []
+    for item in items:
+        same = cache.scope_for(PROFILE, question=item["first"]) == cache.scope_for(PROFILE, question=item["second"])
+        if same != (item["expect"] == "hit"):
+            wrong.append(item)
+    return wrong
+
+
+def check_lookups(items):
+    """실제 임베딩으로 저장 → 조회하여 히트 여부 비교"""
+    wrong = []
+    for item in items:
+        cache = AnswerCache()
+        first_scope = cache.scope_for(PROFILE, question=item["first"])
+        _, vector = cache.lookup(item["first"], first_scope)
+        cache.store(vector, first_scope, {"success": True, "answer": item["first"]})
+        hit, _ = cache.lookup(item["second"], cache.scope_for(PROFILE, question=item["second"]))
+        if (hit is not None) != (item["expect"] == "hit"):
+            wrong.append(item)
+    return wrong
+
+
+def main():
+    parser = argparse.ArgumentParser(description="시맨틱 답변 캐시 범위 평가")
+    parser.add_argument("--eval-set", default=EVAL_SET_PATH)
+    parser.add_argument("--with-embeddings", action="store_true", help="실제 임베딩으로 저장/조회하여 히트 여부 확인")
+    args = parser.parse_args()
+
+    items = load_eval_set(args.eval_set)
+    wrong = check_lookups(items) if args.with_embeddings else check_scopes(items)
+
+    print("=" * 80)
+    print("시맨틱 답변 캐시 범위 평가" + (" (임베딩 조회)" if args.with_embeddings else " (범위 비교)"))
+    print("=" * 80)
+    print(f"평가 쌍 수: {len(items)}")
+    print(f"기대와 일치: {len(items) - len(wrong)}/{len(items)}")
+
+    if wrong:
+        print("\n[불일치]")
+        for item in wrong:
+            print(f"- {item['first']} / {item['second']} (기대: {item['expect']})")
+
+    # 다른 학교/연도의 답변을 돌려주는 것은 실패, hit 쌍의 미스는 참고용
+    if any(item["expect"] == "miss" for item in wrong):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+🧪 규칙 기반 질문 복잡도 분류기 평가 스크립트
+
+라벨링된 평가 세트(question_complexity_eval.jsonl)로 question_rules의 fast path를 평가합니다.
+- fast path 비율: LLM 호출 없이 규칙으로 판단한 질문 비율
+- 정확도: 규칙으로 판단한 질문 중 라벨과 일치한 비율
+- 오분류 / 판단 보류 질문 목록
+
+실행:
+    python eval_question_rules.py
+    python eval_question_rules.py --with-llm   # 판단 보류 질문은 LLM(is_simple_question)으로 판별하여 전체 정확도 계산
+"""
+
+import argparse
+import json
+from collections import Counter
+
+from question_rules import classify_rules_only
+
+EVAL_SET_PATH = "question_complexity_eval.jsonl"
+
+
+def load_eval_set(path: str = EVAL_SET_PATH):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="규칙 기반 질문 복잡도 분류기 평가")
+    parser.add_argument("--eval-set", default=EVAL_SET_PATH)
+    parser.add_argument("--with-llm", action="store_true", help="판단 보류 질문을 LLM으로 판별하여 전체 정확도 계산")
+    args = parser.parse_args()
+
+    items = load_eval_set(args.eval_set)
+    counts = Counter()
+    wrong, deferred = [], []
+
+    for item in items:
+        decision, reason = classify_rules_only(item["question"])
+        if decision is None:
+            counts["deferred"] += 1
+            deferred.append(item)
+            continue
+        counts["decided"] += 1
+        if decision == item["label"]:
+            counts["correct"] += 1
+        else:
+            wrong.append((item, decision, reason))
+
+    total = len(items)
+    print("=" * 80)
+    print("규칙 기반 질문 복잡도 분류기 평가")
+    print("=" * 80)
+    print(f"평가 질문 수: {total}")
+    print(f"fast path 비율: {counts['decided']}/{total} ({counts['decided'] / total:.1%})")
+    if counts["decided"]:
+        print(f"fast path 정확도: {counts['correct']}/{counts['decided']} ({counts['correct'] / counts['decided']:.1%})")
+
+    if wrong:
+        print("\n[오분류]")
+        for item, decision, reason in wrong:
+            print(f"- {item['question']} → {decision} (정답: {item['label']}, 근거: {reason})")
+
+    if deferred:
+        print("\n[판단 보류 → LLM]")
+        for item in deferred:
+            print(f"- {item['question']} (정답: {item['label']})")
+
+    if args.with_llm and deferred:
+        from api import is_simple_question
+
+        llm_correct = sum(
+            ("simple" if is_simple_question(item["question"], verbose=False) else "complex") == item["label"]
+            for item in deferred
+        )
+        overall = counts["correct"] + llm_correct
+        print(f"\nLLM 판별 정확도 (보류 질문): {llm_correct}/{len(deferred)}")
+        print(f"전체 정확도 (규칙 + LLM): {overall}/{total} ({overall / total:.1%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,398 @@
+# 파인튜닝 모델(HuggingFace Space) HTTP 클라이언트
+"""
+call_finetuned_model / acall_finetuned_model이 사용하는 공유 클라이언트입니다.
+
+- 연결 풀: 프로세스 전체에서 keep-alive 연결을 재사용 (요청마다 TCP/TLS 연결을 새로 열지 않음)
+- 타임아웃: 연결(connect)과 응답 대기(read)를 분리 + 재시도를 포함한 전체 시간 예산(total)
+- 재시도: 5xx/429/타임아웃/네트워크 오류만 재시도, 지수 백오프 + full jitter
+  (HuggingFace Space 콜드 스타트 시 503이 연속으로 오므로 즉시 재시도하지 않음)
+- 헤지 요청 (선택): 첫 요청이 최근 지연 시간의 p{FINETUNED_HEDGE_PERCENTILE}를 넘기면
+  같은 요청을 하나 더 보내 먼저 끝난 응답을 사용
+- 서킷 브레이커: 실패/지연이 반복되면 일정 시간 호출하지 않고 바로 "오류: ..." 반환
+  (api.get_answer는 차단 중이면 파인튜닝 경로를 건너뛰고 LangGraph로 라우팅, circuit_breaker.py 참고)
+
+반환 형식은 기존 call_finetuned_model과 동일합니다 (성공 시 답변, 실패 시 "오류: ..." 문자열).
+
+사용법:
+    from finetuned_client import get_finetuned_client
+
+    client = get_finetuned_client()
+    answer = client.generate(payload)            # 동기
+    answer = await client.agenerate(payload)     # 비동기
+    client.stats()                               # 요청/재시도/헤지/지연 시간 통계
+"""
+
+import asyncio
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, Optional
+
+import httpx
+import numpy as np
+
+from circuit_breaker import CircuitBreaker
+from components import component
+from deadline import remaining, MIN_FALLBACK_BUDGET
+
+
+FINETUNED_API_URL = os.getenv("FINETUNED_API_URL", "https://csmart-ai-faq-finetuning.hf.space/predict")
+FINETUNED_CONNECT_TIMEOUT = float(os.getenv("FINETUNED_CONNECT_TIMEOUT", "5"))
+FINETUNED_READ_TIMEOUT = float(os.getenv("FINETUNED_READ_TIMEOUT", "30"))
+FINETUNED_TOTAL_TIMEOUT = float(os.getenv("FINETUNED_TOTAL_TIMEOUT", "60"))
+FINETUNED_MAX_RETRIES = int(os.getenv("FINETUNED_MAX_RETRIES", "3"))
+FINETUNED_BACKOFF_BASE = float(os.getenv("FINETUNED_BACKOFF_BASE", "0.5"))
+FINETUNED_BACKOFF_MAX = float(os.getenv("FINETUNED_BACKOFF_MAX", "8"))
+FINETUNED_POOL_SIZE = int(os.getenv("FINETUNED_POOL_SIZE", "20"))
+
+FINETUNED_HEDGE_ENABLED = os.getenv("FINETUNED_HEDGE_ENABLED", "0") == "1"
+FINETUNED_HEDGE_PERCENTILE = float(os.getenv("FINETUNED_HEDGE_PERCENTILE", "95"))
+FINETUNED_HEDGE_MIN_SAMPLES = int(os.getenv("FINETUNED_HEDGE_MIN_SAMPLES", "20"))
+
+# 서킷 브레이커 (실패율/연속 실패/느린 호출 기준으로 차단, cooldown 후 probe)
+FINETUNED_BREAKER_ENABLED = os.getenv("FINETUNED_BREAKER_ENABLED", "1") == "1"
+FINETUNED_BREAKER_FAILURE_RATE = float(os.getenv("FINETUNED_BREAKER_FAILURE_RATE", "0.5"))
+FINETUNED_BREAKER_CONSECUTIVE = int(os.getenv("FINETUNED_BREAKER_CONSECUTIVE", "3"))
+FINETUNED_BREAKER_WINDOW = float(os.getenv("FINETUNED_BREAKER_WINDOW", "60"))
+FINETUNED_BREAKER_COOLDOWN = float(os.getenv("FINETUNED_BREAKER_COOLDOWN", "30"))
+FINETUNED_BREAKER_SLOW_CALL = float(os.getenv("FINETUNED_BREAKER_SLOW_CALL", "15"))
+
+# 재시도할 상태 코드 (콜드 스타트 503, 과부하 429 포함)
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+class _RetryableError(Exception):
+    """재시도 가능한 실패 (마지막 시도였다면 message를 그대로 반환)"""
+
+    def __init__(self, message: str):
+        super().__init__(message)
+        self.message = message
+
+
+class _CircuitOpenError(Exception):
+    """서킷 브레이커가 호출을 막은 경우 (재시도하지 않음)"""
+    message = "오류: 파인튜닝 모델 일시 차단 중 (서킷 브레이커)"
+
+
+def _parse_response(response: httpx.Response) -> str:
+    """상태 코드별 처리 (재시도 가능한 실패는 _RetryableError)"""
+    if response.status_code == 200:
+        return response.json().get("answer", "답변을 생성할 수 없습니다.")
+    if response.status_code == 400:
+        return "오류: 잘못된 요청입니다. 파라미터를 확인해주세요."
+    if response.status_code in RETRYABLE_STATUS:
+        raise _RetryableError("오류: 서버 오류가 발생했습니다. 잠시 후 다시 시도해주세요.")
+    return f"오류: 예상치 못한 오류 (상태 코드: {response.status_code})"
+
+
+def _error_message(e: Exception) -> str:
+    if isinstance(e, _RetryableError):
+        return e.message
+    if isinstance(e, httpx.TimeoutException):
+        return "오류: 요청 시간이 초과되었습니다."
+    return f"오류: 네트워크 오류 ({str(e)[:50]})"
+
+
+class FinetunedClient:
+    """keep-alive 연결 풀을 공유하는 동기/비동기 클라이언트"""
+
+    def __init__(
+        self,
+        url: str = FINETUNED_API_URL,
+        connect_timeout: float = FINETUNED_CONNECT_TIMEOUT,
+        read_timeout: float = FINETUNED_READ_TIMEOUT,
+        total_timeout: float = FINETUNED_TOTAL_TIMEOUT,
+        max_retries: int = FINETUNED_MAX_RETRIES,
+        hedge_enabled: bool = FINETUNED_HEDGE_ENABLED,
+    ):
+        self.url = url
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.total_timeout = total_timeout
+        self.max_retries = max_retries
+        self.hedge_enabled = hedge_enabled
+
+        self._limits = httpx.Limits(
+            max_connections=FINETUNED_POOL_SIZE,
+            max_keepalive_connections=FINETUNED_POOL_SIZE,
+        )
+        self._client = httpx.Client(timeout=self._timeout(), limits=self._limits)
+        # AsyncClient는 생성된 이벤트 루프에 묶이므로 루프별로 하나씩 보관
+        self._async_clients: Dict[int, tuple] = {}
+        self._async_lock = threading.Lock()
+        # 동기 헤지 요청용 (primary + backup)
+        self._hedge_executor = ThreadPoolExecutor(max_workers=FINETUNED_POOL_SIZE)
+
+        self.breaker = CircuitBreaker(
+            "finetuned_model",
+            failure_rate=FINETUNED_BREAKER_FAILURE_RATE,
+            consecutive_failures=FINETUNED_BREAKER_CONSECUTIVE,
+            window=FINETUNED_BREAKER_WINDOW,
+            cooldown=FINETUNED_BREAKER_COOLDOWN,
+            slow_call=FINETUNED_BREAKER_SLOW_CALL,
+            enabled=FINETUNED_BREAKER_ENABLED,
+        )
+
+        self._latencies = deque(maxlen=200)
+        self._stats_lock = threading.Lock()
+        self._stats = {"requests": 0, "attempts": 0, "retries": 0, "failures": 0, "hedged": 0, "hedge_wins": 0}
+
+    # --------------------------------------
+    # 설정 / 통계
+    # --------------------------------------
+    def _timeout(self, read_timeout: Optional[float] = None) -> httpx.Timeout:
+        return httpx.Timeout(
+            connect=self.connect_timeout,
+            read=read_timeout or self.read_timeout,
+            write=self.connect_timeout,
+            pool=self.connect_timeout,
+        )
+
+    def _count(self, key: str, amount: int = 1):
+        with self._stats_lock:
+            self._stats[key] += amount
+
+    def _record_latency(self, seconds: float):
+        with self._stats_lock:
+            self._latencies.append(seconds)
+
+    def hedge_delay(self) -> Optional[float]:
+        """헤지 요청을 보낼 대기 시간 (최근 지연 시간의 백분위수, 샘플이 부족하면 None)"""
+        if not self.hedge_enabled:
+            return None
+        with self._stats_lock:
+            samples = list(self._latencies)
+        if len(samples) < FINETUNED_HEDGE_MIN_SAMPLES:
+            return None
+        return float(np.percentile(samples, FINETUNED_HEDGE_PERCENTILE))
+
+    def _total_budget(self) -> float:
+        """재시도를 포함한 전체 시간 예산 (요청 deadline이 있으면 LangGraph 재시도 시간을 남겨둠)"""
+        budget = remaining(MIN_FALLBACK_BUDGET)
+        return self.total_timeout if budget is None else min(self.total_timeout, budget)
+
+    def _backoff(self, attempt: int) -> float:
+        """지수 백오프 + full jitter"""
+        return random.uniform(0, min(FINETUNED_BACKOFF_MAX, FINETUNED_BACKOFF_BASE * (2 ** attempt)))
+
+    def stats(self) -> Dict:
+        with self._stats_lock:
+            stats = dict(self._stats)
+            samples = list(self._latencies)
+        if samples:
+            stats["latency_p50"] = round(float(np.percentile(samples, 50)), 3)
+            stats["latency_p95"] = round(float(np.percentile(samples, 95)), 3)
+        stats["hedge_enabled"] = self.hedge_enabled
+        stats["breaker_state"] = self.breaker.state
+        return stats
+
+    # --------------------------------------
+    # 동기 호출
+    # --------------------------------------
+    def _post(self, payload: Dict, timeout: httpx.Timeout) -> str:
+        if not self.breaker.allow_request():
+            raise _CircuitOpenError()
+        self._count("attempts")
+        start = time.perf_counter()
+        try:
+            response = self._client.post(self.url, json=payload, timeout=timeout)
+            answer = _parse_response(response)
+        except Exception:
+            self.breaker.record_failure()
+            raise
+        return self._finish(response, answer, time.perf_counter() - start)
+
+    def _finish(self, response: httpx.Response, answer: str, latency: float) -> str:
+        """응답을 받은 시도의 결과 기록 (400 등 요청 쪽 오류도 엔드포인트는 살아 있으므로 성공)"""
+        self.breaker.record_success(latency)
+        if response.status_code == 200:
+            self._record_latency(latency)
+        return answer
+
+    def _post_hedged(self, payload: Dict, timeout: httpx.Timeout) -> str:
+        delay = self.hedge_delay()
+        if delay is None:
+            return self._post(payload, timeout)
+
+        primary = self._hedge_executor.submit(self._post, payload, timeout)
+        done, _ = wait([primary], timeout=delay)
+        if done:
+            return primary.result()
+
+        print(f"파인튜닝 모델 응답 지연 ({delay:.1f}s 초과) - 헤지 요청 전송")
+        self._count("hedged")
+        backup = self._hedge_executor.submit(self._post, payload, timeout)
+        pending = {primary, backup}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    answer = future.result()
+                except Exception as e:
+                    error = e
+                    continue
+                if future is backup:
+                    self._count("hedge_wins")
+                # 남은 요청은 취소 불가(실행 중)이므로 결과만 버림
+                return answer
+        raise error
+
+    def generate(self, payload: Dict, read_timeout: Optional[float] = None, max_retries: Optional[int] = None) -> str:
+        """파인튜닝 모델 답변 생성 (실패 시 "오류: ..." 문자열)"""
+        max_retries = max_retries or self.max_retries
+        deadline = time.monotonic() + self._total_budget()
+        self._count("requests")
+
+        for attempt in range(max_retries):
+            # 응답 대기 시간은 전체 시간 예산의 남은 시간을 넘지 않음
+            left = deadline - time.monotonic()
+            if left <= 0:
+                self._count("failures")
+                return "오류: 요청 시간이 초과되었습니다."
+            timeout = self._timeout(min(read_timeout or self.read_timeout, left))
+            try:
+                print(f"파인튜닝 모델 호출 중... (시도 {attempt + 1}/{max_retries})")
+                answer = self._post_hedged(payload, timeout)
+                if not answer.startswith("오류:"):
+                    print("파인튜닝 모델 답변 생성 완료")
+                else:
+                    self._count("failures")
+                return answer
+
+            except _CircuitOpenError as e:
+                print(e.message)
+                self._count("failures")
+                return e.message
+
+            except (_RetryableError, httpx.TransportError) as e:
+                message = _error_message(e)
+                print(f"{message} (시도 {attempt + 1}/{max_retries})")
+                backoff = self._backoff(attempt)
+                if attempt == max_retries - 1 or time.monotonic() + backoff >= deadline:
+                    self._count("failures")
+                    return message
+                self._count("retries")
+                time.sleep(backoff)
+
+            except Exception as e:
+                self._count("failures")
+                return f"오류: 응답 처리 실패 ({str(e)[:50]})"
+
+        self._count("failures")
+        return "오류: 최대 재시도 횟수를 초과했습니다."
+
+    # --------------------------------------
+    # 비동기 호출
+    # --------------------------------------
+    def _async_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        with self._async_lock:
+            entry = self._async_clients.get(id(loop))
+            if entry is None or entry[0] is not loop:
+                # 닫힌 루프의 클라이언트는 정리 (asyncio.run을 여러 번 호출하는 스크립트 대비)
+                self._async_clients = {
+                    key: value for key, value in self._async_clients.items() if not value[0].is_closed()
+                }
+                entry = (loop, httpx.AsyncClient(timeout=self._timeout(), limits=self._limits))
+                self._async_clients[id(loop)] = entry
+            return entry[1]
+
+    async def _apost(self, payload: Dict, timeout: httpx.Timeout) -> str:
+        if not self.breaker.allow_request():
+            raise _CircuitOpenError()
+        self._count("attempts")
+        start = time.perf_counter()
+        try:
+            response = await self._async_client().post(self.url, json=payload, timeout=timeout)
+            answer = _parse_response(response)
+        except asyncio.CancelledError:
+            # 헤지 요청의 느린 쪽 / 요청 자체가 취소된 경우는 실패로 세지 않고 probe 슬롯만 반환
+            self.breaker.release()
+            raise
+        except Exception:
+            self.breaker.record_failure()
+            raise
+        return self._finish(response, answer, time.perf_counter() - start)
+
+    async def _apost_hedged(self, payload: Dict, timeout: httpx.Timeout) -> str:
+        delay = self.hedge_delay()
+        if delay is None:
+            return await self._apost(payload, timeout)
+
+        primary = asyncio.ensure_future(self._apost(payload, timeout))
+        done, _ = await asyncio.wait({primary}, timeout=delay)
+        if done:
+            return primary.result()
+
+        print(f"파인튜닝 모델 응답 지연 ({delay:.1f}s 초과) - 헤지 요청 전송")
+        self._count("hedged")
+        backup = asyncio.ensure_future(self._apost(payload, timeout))
+        pending = {primary, backup}
+        error = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is not None:
+                        error = task.exception()
+                        continue
+                    if task is backup:
+                        self._count("hedge_wins")
+                    return task.result()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def agenerate(self, payload: Dict, read_timeout: Optional[float] = None, max_retries: Optional[int] = None) -> str:
+        """generate의 비동기 버전"""
+        max_retries = max_retries or self.max_retries
+        deadline = time.monotonic() + self._total_budget()
+        self._count("requests")
+
+        for attempt in range(max_retries):
+            # 응답 대기 시간은 전체 시간 예산의 남은 시간을 넘지 않음
+            left = deadline - time.monotonic()
+            if left <= 0:
+                self._count("failures")
+                return "오류: 요청 시간이 초과되었습니다."
+            timeout = self._timeout(min(read_timeout or self.read_timeout, left))
+            try:
+                print(f"파인튜닝 모델 호출 중... (시도 {attempt + 1}/{max_retries})")
+                answer = await self._apost_hedged(payload, timeout)
+                if not answer.startswith("오류:"):
+                    print("파인튜닝 모델 답변 생성 완료")
+                else:
+                    self._count("failures")
+                return answer
+
+            except _CircuitOpenError as e:
+                print(e.message)
+                self._count("failures")
+                return e.message
+
+            except (_RetryableError, httpx.TransportError) as e:
+                message = _error_message(e)
+                print(f"{message} (시도 {attempt + 1}/{max_retries})")
+                backoff = self._backoff(attempt)
+                if attempt == max_retries - 1 or time.monotonic() + backoff >= deadline:
+                    self._count("failures")
+                    return message
+                self._count("retries")
+                await asyncio.sleep(backoff)
+
+            except Exception as e:
+                self._count("failures")
+                return f"오류: 응답 처리 실패 ({str(e)[:50]})"
+
+        self._count("failures")
+        return "오류: 최대 재시도 횟수를 초과했습니다."
+
+
+@component("finetuned_client")
+def get_finetuned_client() -> FinetunedClient:
+    return FinetunedClient()
@@ -0,0 +1,200 @@
+"""
+대용량 GuidelineDB CSV 스트리밍 적재
+
+CSV를 chunk 단위로 읽고, 배치별 임베딩을 병렬로 수행하면서 컬렉션에 바로 기록합니다.
+진행 상황은 체크포인트 파일에 저장되어 중단된 적재는 이어서 진행됩니다.
+
+사용법:
+    python guideline_ingest.py                                  # GuidelineDB.csv 적재 (이어하기)
+    python guideline_ingest.py --csv big.csv --batch-size 200 --parallelism 8
+    python guideline_ingest.py --no-resume                      # 처음부터 다시 적재
+
+    from guideline_ingest import ingest_guideline_csv
+    stats = ingest_guideline_csv("GuidelineDB.csv")
+"""
+
+import argparse
+import json
+import os
+from typing import Dict, Iterator, List, Tuple
+
+import pandas as pd
+from langchain_core.documents import Document
+
+from guideline_sync import GUIDELINE_CSV, _clean, embed_and_upsert, row_id, row_to_document
+
+CHECKPOINT_PATH = os.getenv("GUIDELINE_INGEST_CHECKPOINT", "./guideline_ingest_checkpoint.json")
+
+
+# ======================================================
+# 1⃣ 체크포인트
+# ======================================================
+def _fingerprint(csv_path: str) -> str:
+    """CSV 파일 식별값 (크기 + 수정 시각) - 파일이 바뀌면 처음부터 다시 적재"""
+    stat = os.stat(csv_path)
+    return f"{stat.st_size}:{int(stat.st_mtime)}"
+
+
+def load_checkpoint(csv_path: str, checkpoint_path: str = CHECKPOINT_PATH) -> Dict:
+    """현재 CSV에 해당하는 체크포인트 (없거나 다른 파일이면 빈 상태)"""
+    empty = {"csv_path": csv_path, "fingerprint": _fingerprint(csv_path), "rows_done": 0, "completed": False}
+    if not os.path.exists(checkpoint_path):
+        return empty
+    try:
+        with open(checkpoint_path, "r", encoding="utf-8") as f:
+            checkpoint = json.load(f)
+    except (OSError, ValueError):
+        return empty
+    if checkpoint.get("fingerprint") != empty["fingerprint"]:
+        return empty
+    return checkpoint
+
+
+def save_checkpoint(checkpoint: Dict, checkpoint_path: str = CHECKPOINT_PATH) -> None:
+    """임시 파일에 쓴 뒤 교체 (중간에 죽어도 체크포인트가 깨지지 않음)"""
+    tmp_path = f"{checkpoint_path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(checkpoint, f, ensure_ascii=False)
+    os.replace(tmp_path, checkpoint_path)
+
+
+def has_unfinished_ingest(csv_path: str = GUIDELINE_CSV, checkpoint_path: str = CHECKPOINT_PATH) -> bool:
+    """같은 CSV에 대해 중단된 적재가 남아 있는지 확인"""
+    checkpoint = load_checkpoint(csv_path, checkpoint_path)
+    return checkpoint["rows_done"] > 0 and not checkpoint["completed"]
+
+
+# ======================================================
+# 2⃣ CSV chunk 읽기 → 문서 배치
+# ======================================================
+def iter_document_batches(
+    csv_path: str,
+    batch_size: int = 100,
+    chunksize: int = 1000,
+    skip_rows: int = 0,
+) -> Iterator[Tuple[int, List[Tuple[str, Document]]]]:
+    """
+    CSV를 chunksize 행씩 읽어 (지금까지 읽은 행 수, [(문서 ID, Document)]) 배치를 생성
+    - 적재가 끝난 skip_rows 행은 파싱하지 않고 건너뜀
+    - question이 비어 있는 행은 제외
+    """
+    rows_seen = skip_rows
+    batch: List[Tuple[str, Document]] = []
+    reader = pd.read_csv(
+        csv_path,
+        encoding="utf-8-sig",
+        dtype=str,
+        chunksize=chunksize,
+        skiprows=range(1, skip_rows + 1) if skip_rows else None,
+    )
+    for chunk in reader:
+        for row in chunk.to_dict("records"):
+            rows_seen += 1
+            if _clean(row.get("question")):
+                batch.append((row_id(row), row_to_document(row)))
+            if len(batch) >= batch_size:
+                yield rows_seen, batch
+                batch = []
+    if batch:
+        yield rows_seen, batch
+
+
+# ======================================================
+# 3⃣ 스트리밍 적재
+# ======================================================
+def ingest_guideline_csv(
+    csv_path: str = GUIDELINE_CSV,
+    db=None,
+    index=None,
+    batch_size: int = 100,
+    parallelism: int = 4,
+    chunksize: int = 1000,
+    checkpoint_path: str = CHECKPOINT_PATH,
+    resume: bool = True,
+) -> Dict[str, int]:
+    """
+    CSV 전체를 스트리밍으로 컬렉션에 적재합니다.
+
+    Parameters:
+    -----------
+    csv_path : str
+        GuidelineDB CSV 경로
+    db : Chroma, optional
+        대상 벡터 DB (기본값: step3_db_and_search.guideline_db)
+    index : KeywordIndex, optional
+        함께 갱신할 키워드 역색인 (db를 생략하면 이 프로세스에 이미 구축된 step3의 guideline_index만 갱신)
+    batch_size : int
+        임베딩 API 1회 호출당 문서 수
+    parallelism : int
+        동시에 진행할 임베딩 배치 수
+    chunksize : int
+        CSV를 한 번에 읽을 행 수
+    checkpoint_path : str
+        진행 상황 저장 파일
+    resume : bool
+        True면 체크포인트 이후부터 이어서 적재
+
+    Returns:
+    --------
+    dict
+        {"rows_done": int, "written": int, "resumed_from": int}
+    """
+    if db is None:
+        from components import is_ready
+        from step3_db_and_search import get_guideline_db, get_guideline_index
+        db = get_guideline_db()
+        if index is None and is_ready("guideline_index"):
+            index = get_guideline_index()
+
+    checkpoint = load_checkpoint(csv_path, checkpoint_path) if resume else {
+        "csv_path": csv_path, "fingerprint": _fingerprint(csv_path), "rows_done": 0, "completed": False
+    }
+    if checkpoint["completed"]:
+        print(" 이미 적재가 완료된 CSV입니다. (변경분 반영: python guideline_sync.py)")
+        return {"rows_done": checkpoint["rows_done"], "written": 0, "resumed_from": checkpoint["rows_done"]}
+
+    resumed_from = checkpoint["rows_done"]
+    if resumed_from:
+        print(f" 체크포인트에서 이어서 적재: {resumed_from}행 이후부터")
+
+    def _on_batch_done(rows_done: int, count: int):
+        checkpoint["rows_done"] = rows_done
+        save_checkpoint(checkpoint, checkpoint_path)
+        print(f"   적재 진행: {rows_done}행 (+{count}개)")
+
+    written = embed_and_upsert(
+        db,
+        iter_document_batches(csv_path, batch_size=batch_size, chunksize=chunksize, skip_rows=resumed_from),
+        parallelism=parallelism,
+        index=index,
+        on_batch_done=_on_batch_done,
+    )
+
+    checkpoint["completed"] = True
+    save_checkpoint(checkpoint, checkpoint_path)
+    print(f" GuidelineDB 스트리밍 적재 완료 (문서 {written}개)")
+    return {"rows_done": checkpoint["rows_done"], "written": written, "resumed_from": resumed_from}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GuidelineDB CSV 스트리밍 적재")
+    parser.add_argument("--csv", default=GUIDELINE_CSV, help="GuidelineDB CSV 경로")
+    parser.add_argument("--batch-size", type=int, default=100, help="임베딩 배치 크기")
+    parser.add_argument("--parallelism", type=int, default=4, help="동시 임베딩 배치 수")
+    parser.add_argument("--chunksize", type=int, default=1000, help="CSV 읽기 단위 (행)")
+    parser.add_argument("--checkpoint", default=CHECKPOINT_PATH, help="체크포인트 파일 경로")
+    parser.add_argument("--no-resume", action="store_true", help="체크포인트를 무시하고 처음부터 적재")
+    args = parser.parse_args()
+
+    ingest_guideline_csv(
+        csv_path=args.csv,
+        batch_size=args.batch_size,
+        parallelism=args.parallelism,
+        chunksize=args.chunksize,
+        checkpoint_path=args.checkpoint,
+        resume=not args.no_resume,
+    )
+
+
+if __name__ == "__main__":
+    main()
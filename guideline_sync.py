@@ -0,0 +1,251 @@
+"""
+GuidelineDB.csv ↔ Chroma 컬렉션 증분 동기화
+
+각 행을 해시하여 컬렉션에 저장된 해시와 비교하고,
+새로 추가되거나 변경된 행만 임베딩/업서트, CSV에서 사라진 행은 삭제합니다.
+
+사용법:
+    python guideline_sync.py                 # GuidelineDB.csv 기준 동기화
+    python guideline_sync.py --dry-run       # 변경 내역만 확인
+    python guideline_sync.py --csv other.csv
+
+    from guideline_sync import sync_guideline_db
+    stats = sync_guideline_db()
+"""
+
+import argparse
+import hashlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+from langchain_core.documents import Document
+
+GUIDELINE_CSV = "GuidelineDB.csv"
+HASH_COLUMNS = ["question", "answer", "category", "적용대상", "출처"]
+
+
+# ======================================================
+# 1⃣ CSV 행 → Document 변환
+# ======================================================
+def _clean(value, default: str = "") -> str:
+    """NaN/None을 기본값으로 바꾸고 문자열로 정리"""
+    if value is None or (isinstance(value, float) and pd.isna(value)):
+        return default
+    text = str(value).strip()
+    return text if text else default
+
+
+def row_hash(row: Dict) -> str:
+    """행 내용 해시 (HASH_COLUMNS 기준)"""
+    raw = "\x1f".join(_clean(row.get(col)) for col in HASH_COLUMNS)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def row_id(row: Dict) -> str:
+    """
+    질문+답변 기반 안정적인 문서 ID
+    (같은 질문에 다른 답변이 있는 행도 구분되고, 행 순서와 무관하므로 스트리밍 적재에서도 상태 없이 계산 가능)
+    """
+    raw = f"{_clean(row.get('question'))}\x1f{_clean(row.get('answer'))}"
+    return "gl-" + hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def row_to_document(row: Dict) -> Document:
+    """CSV 한 행을 GuidelineDB Document로 변환"""
+    return Document(
+        page_content=_clean(row.get("question")),
+        metadata={
+            "answer": _clean(row.get("answer")),
+            "category": _clean(row.get("category")),
+            "applies_to": _clean(row.get("적용대상"), "공통"),
+            "source": "guidelineDB",
+            "source_name": "GuidelineDB",
+            "source_detail": _clean(row.get("출처"), "출처 미기재"),
+            "row_hash": row_hash(row),
+        }
+    )
+
+
+def load_guideline_rows(csv_path: str = GUIDELINE_CSV) -> Dict[str, Document]:
+    """CSV 전체를 {문서 ID: Document}로 읽기"""
+    df = pd.read_csv(csv_path, encoding="utf-8-sig", dtype=str)
+    return {
+        row_id(row): row_to_document(row)
+        for row in df.to_dict("records")
+        if _clean(row.get("question"))
+    }
+
+
+# ======================================================
+# 2⃣ 컬렉션에 저장된 해시 조회
+# ======================================================
+def read_persisted_hashes(collection, batch_size: int = 5000) -> Dict[str, str]:
+    """컬렉션의 {문서 ID: row_hash} (해시가 없는 기존 문서는 빈 문자열)"""
+    hashes = {}
+    offset = 0
+    while True:
+        page = collection.get(include=["metadatas"], limit=batch_size, offset=offset)
+        ids = page.get("ids", [])
+        if not ids:
+            break
+        for doc_id, metadata in zip(ids, page.get("metadatas", [])):
+            hashes[doc_id] = (metadata or {}).get("row_hash", "")
+        offset += len(ids)
+    return hashes
+
+
+# ======================================================
+# 3⃣ 배치 임베딩 + 업서트 (동기화/스트리밍 적재 공용)
+# ======================================================
+def embed_and_upsert(
+    db,
+    batches: Iterable[Tuple[object, List[Tuple[str, Document]]]],
+    parallelism: int = 4,
+    index=None,
+    on_batch_done: Optional[Callable[[object, int], None]] = None,
+) -> int:
+    """
+    (marker, [(문서 ID, Document)]) 배치를 받아 병렬로 임베딩하고 순서대로 컬렉션에 업서트합니다.
+
+    - 동시에 진행 중인 배치는 최대 parallelism * 2개 (메모리 사용량 일정)
+    - 업서트는 입력 순서대로 수행되므로 on_batch_done(marker, 개수)로 진행 상황을 기록할 수 있음
+    - 반환값: 업서트한 문서 수
+    """
+    embeddings = db.embeddings
+    collection = db._collection
+    pending = deque()
+    written = 0
+
+    def _write(marker, batch, future):
+        nonlocal written
+        vectors = future.result()
+        collection.upsert(
+            ids=[doc_id for doc_id, _ in batch],
+            embeddings=vectors,
+            documents=[doc.page_content for _, doc in batch],
+            metadatas=[doc.metadata for _, doc in batch],
+        )
+        if index is not None:
+            for doc_id, doc in batch:
+                index.add(doc_id, doc.page_content)
+        written += len(batch)
+        if on_batch_done is not None:
+            on_batch_done(marker, len(batch))
+
+    with ThreadPoolExecutor(max_workers=parallelism, thread_name_prefix="guideline-embed") as executor:
+        for marker, batch in batches:
+            texts = [doc.page_content for _, doc in batch]
+            pending.append((marker, batch, executor.submit(embeddings.embed_documents, texts)))
+            # 앞선 배치가 끝났거나 대기열이 가득 차면 순서대로 기록
+            while pending and (len(pending) >= parallelism * 2 or pending[0][2].done()):
+                _write(*pending.popleft())
+        while pending:
+            _write(*pending.popleft())
+
+    return written
+
+
+# ======================================================
+# 4⃣ 증분 동기화
+# ======================================================
+def sync_guideline_db(
+    csv_path: str = GUIDELINE_CSV,
+    db=None,
+    index=None,
+    dry_run: bool = False,
+    batch_size: int = 100,
+    parallelism: int = 4,
+) -> Dict[str, int]:
+    """
+    CSV와 Chroma 컬렉션을 비교하여 변경분만 반영합니다.
+
+    Parameters:
+    -----------
+    csv_path : str
+        GuidelineDB CSV 경로
+    db : Chroma, optional
+        대상 벡터 DB (기본값: step3_db_and_search.guideline_db)
+    index : KeywordIndex, optional
+        함께 갱신할 키워드 역색인
+        (db를 생략하면 이 프로세스에 이미 구축된 step3의 guideline_index만 갱신,
+         별도 프로세스에서 실행하면 서버가 Chroma 파일 버전으로 변경을 감지해 재구축)
+    dry_run : bool
+        True면 변경 내역만 계산하고 반영하지 않음
+    batch_size : int
+        업서트 배치 크기 (임베딩 API 호출 단위)
+    parallelism : int
+        동시에 진행할 임베딩 배치 수
+
+    Returns:
+    --------
+    dict
+        {"added": int, "changed": int, "removed": int, "unchanged": int}
+    """
+    if db is None:
+        from components import is_ready
+        from step3_db_and_search import get_guideline_db, get_guideline_index
+        db = get_guideline_db()
+        if index is None and is_ready("guideline_index"):
+            index = get_guideline_index()
+
+    documents = load_guideline_rows(csv_path)
+    persisted = read_persisted_hashes(db._collection)
+
+    added = [doc_id for doc_id in documents if doc_id not in persisted]
+    changed = [
+        doc_id for doc_id in documents
+        if doc_id in persisted and persisted[doc_id] != documents[doc_id].metadata["row_hash"]
+    ]
+    removed = [doc_id for doc_id in persisted if doc_id not in documents]
+    stats = {
+        "added": len(added),
+        "changed": len(changed),
+        "removed": len(removed),
+        "unchanged": len(documents) - len(added) - len(changed),
+    }
+    print(f" GuidelineDB 동기화 대상: 추가 {stats['added']}개, 변경 {stats['changed']}개, "
+          f"삭제 {stats['removed']}개, 유지 {stats['unchanged']}개")
+
+    if dry_run:
+        return stats
+
+    # 삭제된 행 제거
+    for start in range(0, len(removed), batch_size):
+        batch = removed[start:start + batch_size]
+        db.delete(ids=batch)
+        if index is not None:
+            for doc_id in batch:
+                index.remove(doc_id)
+
+    # 추가/변경된 행만 임베딩 후 업서트 (배치 단위 병렬 임베딩)
+    upserts: List[str] = added + changed
+    batches = (
+        (min(start + batch_size, len(upserts)),
+         [(doc_id, documents[doc_id]) for doc_id in upserts[start:start + batch_size]])
+        for start in range(0, len(upserts), batch_size)
+    )
+    embed_and_upsert(
+        db, batches, parallelism=parallelism, index=index,
+        on_batch_done=lambda done, _: print(f"   업서트 진행: {done}/{len(upserts)}")
+    )
+
+    print(" GuidelineDB 동기화 완료")
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GuidelineDB.csv 증분 동기화")
+    parser.add_argument("--csv", default=GUIDELINE_CSV, help="GuidelineDB CSV 경로")
+    parser.add_argument("--dry-run", action="store_true", help="변경 내역만 출력")
+    parser.add_argument("--batch-size", type=int, default=100, help="업서트 배치 크기")
+    parser.add_argument("--parallelism", type=int, default=4, help="동시 임베딩 배치 수")
+    args = parser.parse_args()
+
+    sync_guideline_db(csv_path=args.csv, dry_run=args.dry_run,
+                      batch_size=args.batch_size, parallelism=args.parallelism)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+# GuidelineDB 키워드 검색용 역색인 (BM25)
+import math
+import re
+import heapq
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+# ======================================================
+# 1⃣ 토큰화
+# ======================================================
+# - 한글이 포함된 단어는 2글자 n-gram(bigram)으로 분해
+#   (조사/어미가 붙어도 "중앙대학교는" ↔ "중앙대학교" 매칭 가능)
+# - 영문/숫자 단어는 단어 그대로 사용 (예: "mvp", "301")
+# - 1글자 단어는 제외 (기존 하이브리드 검색의 2글자 이상 키워드 기준 유지)
+_WORD_RE = re.compile(r"[0-9a-z가-힣]+")
+_HANGUL_RE = re.compile(r"[가-힣]")
+
+
+def tokenize(text: str) -> List[str]:
+    """질문 텍스트를 색인용 term 리스트로 변환"""
+    terms = []
+    for word in _WORD_RE.findall(str(text).lower()):
+        if len(word) < 2:
+            continue
+        if _HANGUL_RE.search(word):
+            terms.extend(word[i:i + 2] for i in range(len(word) - 1))
+        else:
+            terms.append(word)
+    return terms
+
+
+# ======================================================
+# 2⃣ BM25 역색인
+# ======================================================
+class KeywordIndex:
+    """
+    GuidelineDB [question] 컬럼에 대한 메모리 상주 역색인
+
+    - 로드 시 한 번만 구축하고, 컬렉션 변경 시 add/remove로 동기화
+    - 검색 비용은 전체 문서 수가 아니라 질의 term의 posting 수에 비례
+    - 점수는 BM25 (k1, b 기본값 사용)
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[str, int]] = {}   # term → {doc_id: tf}
+        self._doc_terms: Dict[str, Counter] = {}         # doc_id → term 빈도 (삭제용)
+        self._doc_len: Dict[str, int] = {}                # doc_id → 문서 길이
+        self._total_len = 0
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._doc_len)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._doc_len
+
+    # --------------------------------------
+    # 색인 갱신
+    # --------------------------------------
+    def add(self, doc_id: str, text: str) -> None:
+        """문서를 색인에 추가 (이미 있으면 교체)"""
+        counts = Counter(tokenize(text))
+        with self._lock:
+            if doc_id in self._doc_len:
+                self._remove_locked(doc_id)
+            for term, tf in counts.items():
+                self._postings.setdefault(term, {})[doc_id] = tf
+            length = sum(counts.values())
+            self._doc_terms[doc_id] = counts
+            self._doc_len[doc_id] = length
+            self._total_len += length
+
+    def add_many(self, items: Iterable[Tuple[str, str]]) -> None:
+        """(doc_id, text) 쌍을 일괄 추가"""
+        for doc_id, text in items:
+            self.add(doc_id, text)
+
+    def remove(self, doc_id: str) -> None:
+        """문서를 색인에서 제거 (없으면 무시)"""
+        with self._lock:
+            if doc_id in self._doc_len:
+                self._remove_locked(doc_id)
+
+    def _remove_locked(self, doc_id: str) -> None:
+        for term in self._doc_terms.pop(doc_id):
+            posting = self._postings.get(term)
+            if posting is None:
+                continue
+            posting.pop(doc_id, None)
+            if not posting:
+                del self._postings[term]
+        self._total_len -= self._doc_len.pop(doc_id)
+
+    def replace(self, other: "KeywordIndex") -> None:
+        """다른 색인의 내용으로 한 번에 교체 (재구축하는 동안에도 기존 색인으로 검색 가능)"""
+        with self._lock:
+            self._postings = other._postings
+            self._doc_terms = other._doc_terms
+            self._doc_len = other._doc_len
+            self._total_len = other._total_len
+
+    def clear(self) -> None:
+        with self._lock:
+            self._postings.clear()
+            self._doc_terms.clear()
+            self._doc_len.clear()
+            self._total_len = 0
+
+    # --------------------------------------
+    # 검색
+    # --------------------------------------
+    def search(self, query: str, k: int = 50) -> List[Tuple[str, float]]:
+        """BM25 점수 기준 상위 k개 (doc_id, score) 반환"""
+        query_terms = set(tokenize(query))
+        if not query_terms:
+            return []
+
+        with self._lock:
+            n_docs = len(self._doc_len)
+            if n_docs == 0:
+                return []
+            avgdl = self._total_len / n_docs
+
+            scores: Dict[str, float] = {}
+            for term in query_terms:
+                posting = self._postings.get(term)
+                if not posting:
+                    continue
+                df = len(posting)
+                idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+                for doc_id, tf in posting.items():
+                    norm = self.k1 * (1 - self.b + self.b * self._doc_len[doc_id] / avgdl)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+
+        return heapq.nlargest(k, scores.items(), key=lambda x: x[1])
+
+
+# ======================================================
+# 3⃣ Chroma 컬렉션으로부터 색인 구축
+# ======================================================
+def build_index_from_collection(collection, batch_size: int = 5000,
+                                index: Optional[KeywordIndex] = None) -> KeywordIndex:
+    """
+    Chroma 컬렉션의 documents(question)를 페이지 단위로 읽어 색인 구축
+    (전체 코퍼스를 한 번에 메모리로 복사하지 않음)
+    """
+    index = index or KeywordIndex()
+    offset = 0
+    while True:
+        page = collection.get(include=["documents"], limit=batch_size, offset=offset)
+        ids = page.get("ids", [])
+        if not ids:
+            break
+        index.add_many(zip(ids, page.get("documents", [])))
+        offset += len(ids)
+    return index
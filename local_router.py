@@ -0,0 +1,453 @@
+# 로컬 라우팅 모델 (로그된 LLM 라우팅 결정으로 학습한 문자 n-gram 선형 분류기)
+"""
+규칙(question_rules.py)으로 판단되지 않는 질문도 대부분은 LLM 라우터 호출 없이
+CPU에서 바로 복잡도와 데이터 소스를 결정하기 위한 작은 로컬 분류기입니다.
+
+- 입력 특징: 질문의 문자 1~3-gram을 해싱 (한국어는 음절 단위라 형태소 분석 없이도 잘 동작)
+- 모델: 로지스틱 회귀 헤드 3개 (complex 여부, search_guideline 선택, search_web 선택)
+- 학습 데이터: is_simple_question / 통합 라우터 / question_tool_router가 남긴 라우팅 로그
+  (ROUTING_LOG_PATH, JSONL) + 라벨링된 평가 세트(question_complexity_eval.jsonl 등)
+- 신뢰도가 LOCAL_ROUTER_THRESHOLD 미만이면 None → 기존 LLM 라우터로 폴백
+- 모델 파일(npz)에 포맷 버전 / 모델 버전 / 학습 메타데이터가 함께 저장됨
+  (포맷 버전이 다르면 로드하지 않고 LLM 라우터 사용)
+
+사용법:
+    # 1) 운영 중 라우팅 결정이 ROUTING_LOG_PATH에 자동 기록됨
+    # 2) 학습 (홀드아웃 정확도 / 임계값별 커버리지 출력)
+    python local_router.py train --log routing_log.jsonl --extra question_complexity_eval.jsonl
+    # 3) 단건 예측 + 추론 시간 확인
+    python local_router.py predict "수학 공부 어떻게 하나요?"
+
+    from local_router import local_route
+    decision = local_route("오답노트 정리법 알려주세요")   # None이면 LLM 라우터 사용
+"""
+
+import argparse
+import json
+import os
+import random
+import threading
+import time
+import zlib
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from pydantic import BaseModel
+
+from components import component
+
+
+LOCAL_ROUTER_ENABLED = os.getenv("LOCAL_ROUTER_ENABLED", "1") == "1"
+LOCAL_ROUTER_MODEL_PATH = os.getenv("LOCAL_ROUTER_MODEL_PATH", "local_router_model.npz")
+LOCAL_ROUTER_THRESHOLD = float(os.getenv("LOCAL_ROUTER_THRESHOLD", "0.9"))
+
+ROUTING_LOG_ENABLED = os.getenv("ROUTING_LOG_ENABLED", "1") == "1"
+ROUTING_LOG_PATH = os.getenv("ROUTING_LOG_PATH", "routing_log.jsonl")
+
+# 모델 파일 포맷 버전 (특징 추출/헤드 구성이 바뀌면 올림 → 이전 모델 파일은 로드하지 않음)
+FORMAT_VERSION = 1
+
+DATASOURCES = ("search_guideline", "search_web")
+HEADS = ("complex",) + DATASOURCES
+NUM_FEATURES = 2 ** 16
+NGRAM_RANGE = (1, 3)
+
+
+# ======================================
+# 1⃣ 라우팅 결정 로그 (학습 데이터 수집)
+# ======================================
+_log_lock = threading.Lock()
+
+
+def log_routing_decision(
+    question: str,
+    complexity: Optional[str],
+    datasources: Optional[List[str]] = None,
+    source: str = "llm"
+):
+    """
+    LLM 라우팅 결과를 JSONL로 기록 (실패해도 요청에는 영향 없음)
+    - complexity: "simple" | "complex" | None (도구 선택만 한 경우)
+    - datasources: 선택된 도구 목록 | None (복잡도만 판별한 경우)
+    """
+    if not ROUTING_LOG_ENABLED:
+        return
+    record = {
+        "question": question,
+        "complexity": complexity,
+        "datasources": datasources,
+        "source": source,
+        "ts": round(time.time(), 3),
+    }
+    try:
+        with _log_lock, open(ROUTING_LOG_PATH, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    except OSError as e:
+        print(f" [routing-log] 기록 실패: {str(e)[:100]}")
+
+
+# ======================================
+# 2⃣ 특징 추출 (문자 n-gram 해싱)
+# ======================================
+def featurize(
+    question: str,
+    num_features: int = NUM_FEATURES,
+    ngram_range: Tuple[int, int] = NGRAM_RANGE
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (특징 인덱스, L2 정규화된 값) 반환
+    해시는 프로세스마다 값이 바뀌는 hash() 대신 crc32를 사용 (학습/서빙 간 동일해야 함)
+    """
+    text = " " + " ".join(str(question).lower().split()) + " "
+    counts: Dict[int, float] = {}
+    low, high = ngram_range
+    for n in range(low, high + 1):
+        for i in range(len(text) - n + 1):
+            gram = text[i:i + n]
+            if gram.isspace():
+                continue
+            index = zlib.crc32(f"{n}:{gram}".encode("utf-8")) % num_features
+            counts[index] = counts.get(index, 0.0) + 1.0
+
+    if not counts:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+    indices = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+    values = np.sqrt(np.fromiter(counts.values(), dtype=np.float32, count=len(counts)))
+    return indices, values / np.linalg.norm(values)
+
+
+def _sigmoid(x: np.ndarray) -> np.ndarray:
+    return 1.0 / (1.0 + np.exp(-np.clip(x, -30, 30)))
+
+
+# ======================================
+# 3⃣ 모델 (추론 / 저장 / 로드)
+# ======================================
+class LocalRouteDecision(BaseModel):
+    complexity: str
+    datasources: List[str]
+    confidence: float
+    reason: str
+
+
+class LocalRouter:
+    """헤드별 가중치 (len(HEADS), num_features) + 편향으로 구성된 선형 분류기"""
+
+    def __init__(self, weights: np.ndarray, bias: np.ndarray, meta: Dict):
+        self.weights = weights.astype(np.float32)
+        self.bias = bias.astype(np.float32)
+        self.meta = meta
+        self.num_features = int(meta["num_features"])
+        self.ngram_range = tuple(meta["ngram_range"])
+        self.trained_heads = set(meta.get("trained_heads", HEADS))
+
+    @property
+    def version(self) -> str:
+        return self.meta.get("model_version", "unknown")
+
+    def predict_proba(self, question: str) -> Dict[str, float]:
+        """헤드별 확률 {"complex": p, "search_guideline": p, "search_web": p}"""
+        indices, values = featurize(question, self.num_features, self.ngram_range)
+        logits = self.weights[:, indices] @ values + self.bias
+        return dict(zip(HEADS, _sigmoid(logits).tolist()))
+
+    def decide(self, question: str, threshold: float = LOCAL_ROUTER_THRESHOLD) -> Optional[LocalRouteDecision]:
+        """
+        신뢰도가 threshold 이상이면 결정 반환, 아니면 None (LLM 라우터로 폴백)
+        - complex인데 데이터 소스 헤드의 신뢰도가 낮으면 datasources=[] (그래프의 analyze_question이 선택)
+        """
+        proba = self.predict_proba(question)
+        p_complex = proba["complex"]
+        confidence = max(p_complex, 1.0 - p_complex)
+        if confidence < threshold:
+            return None
+
+        complexity = "complex" if p_complex >= 0.5 else "simple"
+        datasources: List[str] = []
+        if complexity == "complex" and self.trained_heads.issuperset(DATASOURCES):
+            source_confidence = min(max(proba[ds], 1.0 - proba[ds]) for ds in DATASOURCES)
+            selected = [ds for ds in DATASOURCES if proba[ds] >= 0.5]
+            if source_confidence >= threshold and selected:
+                datasources = selected
+
+        return LocalRouteDecision(
+            complexity=complexity,
+            datasources=datasources,
+            confidence=round(confidence, 4),
+            reason=f"[로컬 모델 {self.version}] p(complex)={p_complex:.3f}",
+        )
+
+    def save(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        np.savez_compressed(
+            path,
+            weights=self.weights,
+            bias=self.bias,
+            meta=np.array(json.dumps(self.meta, ensure_ascii=False)),
+        )
+
+    @classmethod
+    def load(cls, path: str) -> Optional["LocalRouter"]:
+        """모델 파일이 없거나 포맷 버전이 다르면 None"""
+        if not os.path.exists(path):
+            return None
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data["meta"]))
+            if meta.get("format_version") != FORMAT_VERSION:
+                print(f" [local-router] 모델 포맷 버전 불일치 ({meta.get('format_version')} != {FORMAT_VERSION}) → LLM 라우터 사용")
+                return None
+            return cls(data["weights"], data["bias"], meta)
+
+
+@component("local_router")
+def get_local_router() -> Optional[LocalRouter]:
+    router = LocalRouter.load(LOCAL_ROUTER_MODEL_PATH)
+    if router is None:
+        print(f" [local-router] 모델 없음 ({LOCAL_ROUTER_MODEL_PATH}) → LLM 라우터 사용")
+    else:
+        print(f" [local-router] 모델 로드: {router.version} ({router.meta.get('num_examples')}개 예시로 학습)")
+    return router
+
+
+_stats = {"total": 0, "decided": 0, "deferred": 0}
+_stats_lock = threading.Lock()
+
+
+def local_route(question: str) -> Optional[LocalRouteDecision]:
+    """로컬 모델로 라우팅 결정 (비활성/모델 없음/신뢰도 미달이면 None)"""
+    if not LOCAL_ROUTER_ENABLED:
+        return None
+    router = get_local_router()
+    if router is None:
+        return None
+
+    decision = router.decide(question)
+    with _stats_lock:
+        _stats["total"] += 1
+        _stats["decided" if decision is not None else "deferred"] += 1
+    return decision
+
+
+def local_router_stats() -> Dict:
+    """로컬 모델로 LLM 라우터 호출을 생략한 비율"""
+    with _stats_lock:
+        stats = dict(_stats)
+    stats["decided_rate"] = round(stats["decided"] / stats["total"], 3) if stats["total"] else 0.0
+    router = get_local_router() if get_local_router.is_ready() else None
+    stats["model_version"] = router.version if router is not None else None
+    stats["threshold"] = LOCAL_ROUTER_THRESHOLD
+    return stats
+
+
+# ======================================
+# 4⃣ 학습
+# ======================================
+def load_examples(log_paths: Iterable[str] = (), extra_paths: Iterable[str] = ()) -> List[Dict]:
+    """
+    라우팅 로그 + 라벨링된 세트를 질문별로 병합
+    - 로그: {"question", "complexity", "datasources"} (나중 기록이 우선)
+    - 라벨링된 세트: {"question", "label"} (라벨이 로그보다 우선)
+    """
+    merged: Dict[str, Dict] = {}
+
+    def merge(question: str, complexity: Optional[str], datasources: Optional[List[str]]):
+        key = " ".join(str(question).split())
+        if not key:
+            return
+        item = merged.setdefault(key, {"question": key, "complexity": None, "datasources": None})
+        if complexity in ("simple", "complex"):
+            item["complexity"] = complexity
+        if datasources:
+            item["datasources"] = [ds for ds in datasources if ds in DATASOURCES]
+
+    for path in log_paths:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    merge(record["question"], record.get("complexity"), record.get("datasources"))
+
+    for path in extra_paths:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    merge(record["question"], record.get("label"), record.get("datasources"))
+
+    return list(merged.values())
+
+
+def _label_matrix(examples: List[Dict]) -> Tuple[np.ndarray, np.ndarray]:
+    """(라벨, 마스크) — 라벨이 없는 헤드는 마스크 0으로 학습에서 제외"""
+    labels = np.zeros((len(examples), len(HEADS)), dtype=np.float32)
+    mask = np.zeros_like(labels)
+    for row, item in enumerate(examples):
+        if item["complexity"] is not None:
+            labels[row, 0] = item["complexity"] == "complex"
+            mask[row, 0] = 1.0
+        if item["datasources"]:
+            for col, ds in enumerate(DATASOURCES, start=1):
+                labels[row, col] = ds in item["datasources"]
+                mask[row, col] = 1.0
+    return labels, mask
+
+
+def train(
+    examples: List[Dict],
+    epochs: int = 300,
+    learning_rate: float = 0.5,
+    l2: float = 1e-4,
+    num_features: int = NUM_FEATURES,
+    ngram_range: Tuple[int, int] = NGRAM_RANGE,
+) -> LocalRouter:
+    """
+    희소 특징에 대한 전체 배치 경사하강법(Adam)으로 헤드별 로지스틱 회귀 학습
+    (행렬을 밀집 형태로 만들지 않고 CSR 형태의 인덱스/값 배열로 계산)
+    """
+    features = [featurize(item["question"], num_features, ngram_range) for item in examples]
+    lengths = np.array([len(idx) for idx, _ in features])
+    if not len(examples) or not lengths.all():
+        raise ValueError("학습할 예시가 없습니다.")
+    indices = np.concatenate([idx for idx, _ in features])
+    values = np.concatenate([val for _, val in features]).astype(np.float32)
+    offsets = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+    rows = np.repeat(np.arange(len(examples)), lengths)
+
+    labels, mask = _label_matrix(examples)
+    # 헤드별 클래스 불균형 보정 (양/음성 가중치 합을 같게)
+    sample_weight = np.zeros_like(labels)
+    for col in range(len(HEADS)):
+        labeled = mask[:, col] > 0
+        positives = labels[labeled, col].sum()
+        negatives = labeled.sum() - positives
+        if positives and negatives:
+            sample_weight[labeled, col] = np.where(
+                labels[labeled, col] > 0, 0.5 / positives, 0.5 / negatives
+            )
+        elif labeled.any():
+            sample_weight[labeled, col] = 1.0 / labeled.sum()
+
+    weights = np.zeros((len(HEADS), num_features), dtype=np.float32)
+    bias = np.zeros(len(HEADS), dtype=np.float32)
+    params = [weights, bias]
+    moments = [np.zeros_like(p) for p in params]
+    velocities = [np.zeros_like(p) for p in params]
+    beta1, beta2, eps = 0.9, 0.999, 1e-8
+
+    for step in range(1, epochs + 1):
+        # logits[n, h] = sum_j weights[h, indices_j] * values_j (행 단위 합)
+        contributions = weights[:, indices] * values
+        logits = np.add.reduceat(contributions, offsets, axis=1).T + bias
+        error = (_sigmoid(logits) - labels) * sample_weight
+
+        grad_w = np.stack([
+            np.bincount(indices, weights=values * error[rows, h], minlength=num_features)
+            for h in range(len(HEADS))
+        ]).astype(np.float32) + l2 * weights
+        grad_b = error.sum(axis=0)
+
+        for param, grad, m, v in zip(params, (grad_w, grad_b), moments, velocities):
+            m *= beta1
+            m += (1 - beta1) * grad
+            v *= beta2
+            v += (1 - beta2) * grad * grad
+            param -= learning_rate * (m / (1 - beta1 ** step)) / (np.sqrt(v / (1 - beta2 ** step)) + eps)
+
+    trained_heads = [head for col, head in enumerate(HEADS) if mask[:, col].any()]
+    meta = {
+        "format_version": FORMAT_VERSION,
+        "model_version": time.strftime("%Y%m%d-%H%M%S"),
+        "num_features": num_features,
+        "ngram_range": list(ngram_range),
+        "num_examples": len(examples),
+        "trained_heads": trained_heads,
+        "epochs": epochs,
+        "l2": l2,
+    }
+    return LocalRouter(weights, bias, meta)
+
+
+def evaluate(router: LocalRouter, examples: List[Dict], threshold: float) -> Dict:
+    """임계값에서의 커버리지(로컬 결정 비율)와 결정한 질문의 복잡도 정확도"""
+    labeled = [item for item in examples if item["complexity"] is not None]
+    decided = correct = 0
+    for item in labeled:
+        decision = router.decide(item["question"], threshold)
+        if decision is None:
+            continue
+        decided += 1
+        correct += decision.complexity == item["complexity"]
+    return {
+        "examples": len(labeled),
+        "coverage": round(decided / len(labeled), 3) if labeled else 0.0,
+        "accuracy": round(correct / decided, 3) if decided else None,
+    }
+
+
+# ======================================
+# 5⃣ CLI (train / predict)
+# ======================================
+def _train_command(args):
+    log_paths = [path for path in args.log if os.path.exists(path)]
+    examples = load_examples(log_paths, args.extra)
+    print(f"학습 데이터: {len(examples)}개 (로그 {log_paths}, 라벨 {args.extra})")
+
+    random.Random(args.seed).shuffle(examples)
+    holdout = int(len(examples) * args.holdout)
+    if holdout:
+        router = train(examples[holdout:], epochs=args.epochs)
+        print(f"\n[홀드아웃 평가] {holdout}개")
+        for threshold in sorted({0.7, 0.8, 0.9, 0.95, args.threshold}):
+            print(f"  threshold={threshold:.2f}: {evaluate(router, examples[:holdout], threshold)}")
+
+    # 최종 모델은 전체 데이터로 학습
+    router = train(examples, epochs=args.epochs)
+    router.meta["holdout"] = args.holdout
+    router.save(args.out)
+    print(f"\n모델 저장: {args.out} (버전 {router.version}, 헤드 {router.meta['trained_heads']})")
+
+
+def _predict_command(args):
+    router = LocalRouter.load(args.model)
+    if router is None:
+        raise SystemExit(f"모델을 로드할 수 없습니다: {args.model}")
+
+    for question in args.questions:
+        router.decide(question, args.threshold)  # 첫 호출 비용 제외
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            decision = router.decide(question, args.threshold)
+        elapsed_us = (time.perf_counter() - start) / args.repeat * 1e6
+        proba = {k: round(v, 3) for k, v in router.predict_proba(question).items()}
+        print(f"{question}\n  → {decision.model_dump() if decision else 'LLM 폴백'}\n  확률: {proba}, 추론 {elapsed_us:.0f}µs")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="로컬 라우팅 모델 학습/예측")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    train_parser = subparsers.add_parser("train", help="라우팅 로그로 모델 학습")
+    train_parser.add_argument("--log", nargs="*", default=[ROUTING_LOG_PATH], help="라우팅 로그 JSONL (없는 파일은 무시)")
+    train_parser.add_argument("--extra", nargs="*", default=[], help="라벨링된 JSONL ({question, label})")
+    train_parser.add_argument("--out", default=LOCAL_ROUTER_MODEL_PATH)
+    train_parser.add_argument("--epochs", type=int, default=300)
+    train_parser.add_argument("--holdout", type=float, default=0.2, help="평가용 홀드아웃 비율 (0이면 평가 생략)")
+    train_parser.add_argument("--threshold", type=float, default=LOCAL_ROUTER_THRESHOLD)
+    train_parser.add_argument("--seed", type=int, default=42)
+    train_parser.set_defaults(func=_train_command)
+
+    predict_parser = subparsers.add_parser("predict", help="질문 라우팅 예측 + 추론 시간")
+    predict_parser.add_argument("questions", nargs="+")
+    predict_parser.add_argument("--model", default=LOCAL_ROUTER_MODEL_PATH)
+    predict_parser.add_argument("--threshold", type=float, default=LOCAL_ROUTER_THRESHOLD)
+    predict_parser.add_argument("--repeat", type=int, default=1000)
+    predict_parser.set_defaults(func=_predict_command)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,21 +3,58 @@ CSmart 편입 상담 FastAPI 서버
 LangGraph AI 에이전트를 FastAPI로 래핑하여 REST API 제공
 """
 
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel, Field
 from typing import Dict, List, Optional
+import asyncio
+import json
 import uvicorn
 import os
 
-# 기존 API 모듈 import
-from api import get_answer
+# 기존 API 모듈 import (import 시점에는 초기화하지 않음)
+from api import aget_answer, astream_answer, warm_up, readiness
+from components import is_ready
+from step3_db_and_search import get_embeddings_model, web_search_cache_stats
+from answer_cache import get_answer_cache
+from question_rules import fast_path_stats
+from local_router import local_router_stats
+from finetuned_client import get_finetuned_client
+from progress import stage_latency_stats
+from context_packer import context_packer_stats
+from deadline import REQUEST_TIMEOUT
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    서버 시작 시 컴포넌트 warm-up을 백그라운드로 실행
+    - /health는 즉시 응답 (프로세스 생존 확인)
+    - /ready는 warm-up이 끝나야 200 응답
+    - WARMUP_ON_STARTUP=0 이면 warm-up 생략 (최초 요청 시 초기화)
+    """
+    task = None
+    if os.getenv("WARMUP_ON_STARTUP", "1") == "1":
+        async def _warm():
+            try:
+                timings = await asyncio.to_thread(warm_up)
+                print(f"warm-up 완료: { {name: round(t, 2) for name, t in timings.items()} }")
+            except Exception as e:
+                print(f"warm-up 실패 (최초 요청 시 재시도): {str(e)[:200]}")
+        task = asyncio.create_task(_warm())
+    yield
+    if task is not None and not task.done():
+        task.cancel()
+
 
 # FastAPI 애플리케이션 초기화
 app = FastAPI(
     title="CSmart 편입 상담 AI API",
     description="편입 상담을 위한 AI 에이전트 API",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS 설정
@@ -42,6 +79,7 @@ class ChatRequest(BaseModel):
     question: str = Field(..., description="학생의 질문")
     student_profile: Optional[StudentProfile] = Field(default=None, description="학생 프로필")
     recent_dialogues: Optional[List[Dialogue]] = Field(default=[], description="최근 대화 내역")
+    timeout: Optional[float] = Field(default=None, gt=0, description="응답 시간 예산 (초, 서버 설정 REQUEST_TIMEOUT 이하로 제한)")
 
 class ChatResponse(BaseModel):
     question: str
@@ -50,6 +88,7 @@ class ChatResponse(BaseModel):
     datasources: List[str]
     success: bool
     error: Optional[str] = None
+    cache_hit: bool = False
 
 @app.get("/")
 async def root():
@@ -69,6 +108,46 @@ async def health_check():
         "version": "1.0.0"
     }
 
+@app.get("/ready")
+async def ready_check():
+    """준비 상태 엔드포인트 (모든 컴포넌트 warm-up 완료 시 200, 아니면 503)"""
+    state = readiness()
+    return JSONResponse(status_code=200 if state["ready"] else 503, content=state)
+
+def _agent_kwargs(request: ChatRequest) -> Dict:
+    """채팅 요청을 aget_answer / astream_answer 인자로 변환"""
+    # 학생 프로필 변환
+    student_profile = None
+    if request.student_profile:
+        student_profile = {
+            "target_university": request.student_profile.target_university,
+            "track": request.student_profile.track
+        }
+    
+    # 대화 내역 변환
+    recent_dialogues = []
+    if request.recent_dialogues:
+        recent_dialogues = [
+            {
+                "role": dialogue.role,
+                "message": dialogue.message
+            }
+            for dialogue in request.recent_dialogues
+        ]
+    
+    # 요청 시간 예산 (모든 노드/LLM/검색 호출에 전파)
+    timeout = REQUEST_TIMEOUT
+    if request.timeout and (REQUEST_TIMEOUT <= 0 or request.timeout < REQUEST_TIMEOUT):
+        timeout = request.timeout
+    
+    return {
+        "question": request.question,
+        "student_profile": student_profile,
+        "recent_dialogues": recent_dialogues,
+        "verbose": False,  # API에서는 로그 최소화
+        "timeout": timeout
+    }
+
 @app.post("/api/chat", response_model=ChatResponse)
 async def chat(request: ChatRequest):
     """
@@ -81,32 +160,8 @@ async def chat(request: ChatRequest):
         ChatResponse: AI 답변 결과
     """
     try:
-        # 학생 프로필 변환
-        student_profile = None
-        if request.student_profile:
-            student_profile = {
-                "target_university": request.student_profile.target_university,
-                "track": request.student_profile.track
-            }
-        
-        # 대화 내역 변환
-        recent_dialogues = []
-        if request.recent_dialogues:
-            recent_dialogues = [
-                {
-                    "role": dialogue.role,
-                    "message": dialogue.message
-                }
-                for dialogue in request.recent_dialogues
-            ]
-        
-        # AI 에이전트 실행
-        result = get_answer(
-            question=request.question,
-            student_profile=student_profile,
-            recent_dialogues=recent_dialogues,
-            verbose=False  # API에서는 로그 최소화
-        )
+        # AI 에이전트 실행 (비동기: 이벤트 루프를 막지 않음)
+        result = await aget_answer(**_agent_kwargs(request))
         
         return ChatResponse(**result)
         
@@ -116,6 +171,29 @@ async def chat(request: ChatRequest):
             detail=f"AI 에이전트 실행 중 오류가 발생했습니다: {str(e)}"
         )
 
+@app.post("/api/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """
+    편입 상담 질문 처리 (Server-Sent Events 스트리밍)
+    
+    최종 답변을 생성되는 대로 전송합니다.
+    - event: token  data: {"text": "..."}  답변 조각 (이어 붙이면 답변)
+    - event: reset  data: {"reason": "..."}  지금까지 받은 조각 폐기 (품질 미달 재라우팅 등)
+    - event: progress  data: {"stage", "step", "status", "label", "elapsed", "duration"}  단계 시작/종료
+    - event: done   data: ChatResponse 필드 + model_used + timings  최종 결과 (final_answer가 최종 기준)
+    """
+    kwargs = _agent_kwargs(request)
+    
+    async def events():
+        async for event, data in astream_answer(**kwargs):
+            yield f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}  # 프록시 버퍼링 방지
+    )
+
 @app.get("/api/status")
 async def get_status():
     """서비스 상태 및 정보 조회"""
@@ -125,9 +203,21 @@ async def get_status():
         "status": "running",
         "endpoints": {
             "chat": "/api/chat",
+            "chat_stream": "/api/chat/stream",
             "health": "/health",
+            "ready": "/ready",
             "status": "/api/status"
-        }
+        },
+        "ready": readiness()["ready"],
+        "embedding_cache": get_embeddings_model().stats() if is_ready("embeddings") else None,
+        "answer_cache": get_answer_cache().stats() if is_ready("answer_cache") else None,
+        "web_search_cache": web_search_cache_stats(),
+        "question_rules": fast_path_stats(),
+        "local_router": local_router_stats(),
+        "finetuned_client": get_finetuned_client().stats() if is_ready("finetuned_client") else None,
+        "finetuned_breaker": get_finetuned_client().breaker.stats() if is_ready("finetuned_client") else None,
+        "stage_latency": stage_latency_stats(),
+        "context_packer": context_packer_stats()
     }
 
 if __name__ == "__main__":
@@ -0,0 +1,173 @@
+# 스트리밍 API 진행 상황 이벤트 + 단계별 지연 시간 통계
+"""
+astream_answer가 보내는 ("progress", {...}) 이벤트를 만들고, 단계별 소요 시간을 모아
+/api/status에서 확인할 수 있게 합니다 (로그를 뒤지지 않고 운영 중 단계별 지연 시간 측정).
+
+- 통합 그래프 노드: prepare_context, analyze_question, search_guideline, search_web, generate_answer
+- 서브 에이전트 내부 단계: search_guideline / search_web 안의 retrieve, extract_and_evaluate, rewrite_query, generate_answer
+- 그래프 밖 단계 (api.py에서 직접 기록): route, finetuned_model, refine, grade
+
+이벤트 데이터:
+    {
+        "stage": "search_web",          # 통합 그래프 노드 (또는 그래프 밖 단계)
+        "step": "retrieve",             # 서브 에이전트 내부 단계 (없으면 None)
+        "status": "start" | "end",
+        "label": "웹 검색 중",           # 화면 표시용 설명
+        "elapsed": 3.21,                # 요청 시작부터 경과 시간 (초)
+        "duration": 1.05                # 단계 소요 시간 (end만)
+    }
+
+사용법:
+    tracker = ProgressTracker()
+    yield "progress", tracker.start("route")
+    ...
+    yield "progress", tracker.end("route")
+
+    async for event in graph.astream_events(inputs, version="v2"):
+        progress = tracker.from_graph_event(event)
+        if progress:
+            yield "progress", progress
+
+    tracker.timings()         # {"route": 0.8, "search_web/retrieve": 1.05, ...}
+    stage_latency_stats()     # 최근 요청들의 단계별 count / mean / p50 / p95
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+
+# 단계별로 보관할 최근 소요 시간 개수
+STAGE_LATENCY_WINDOW = int(os.getenv("STAGE_LATENCY_WINDOW", "500"))
+
+# 화면 표시용 단계 설명
+STAGE_LABELS = {
+    "route": "질문 유형 판단 중",
+    "finetuned_model": "답변 초안 생성 중",
+    "refine": "답변 다듬는 중",
+    "grade": "답변 품질 확인 중",
+    "prepare_context": "학생 정보와 대화 내역 정리 중",
+    "analyze_question": "필요한 자료 판단 중",
+    "search_guideline": "모집요강 자료 검색 중",
+    "search_web": "웹 검색 중",
+    "generate_answer": "최종 답변 작성 중",
+}
+STEP_LABELS = {
+    "retrieve": "문서 검색",
+    "retrieve_documents": "문서 검색",
+    "extract_and_evaluate": "핵심 정보 추출",
+    "rewrite_query": "검색어 다시 만들기",
+    "generate_answer": "자료별 답변 정리",
+}
+
+
+class ProgressTracker:
+    """요청 하나의 진행 상황 이벤트 생성 + 단계별 소요 시간 집계"""
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self._starts: Dict = {}
+        self._timings: Dict[str, float] = {}
+
+    def _event(self, stage: str, step: Optional[str], status: str, duration: Optional[float] = None) -> Dict:
+        label = STAGE_LABELS.get(stage, stage)
+        if step:
+            label = f"{label} - {STEP_LABELS.get(step, step)}"
+        event = {
+            "stage": stage,
+            "step": step,
+            "status": status,
+            "label": label,
+            "elapsed": round(time.monotonic() - self.started, 3),
+        }
+        if duration is not None:
+            event["duration"] = round(duration, 3)
+        return event
+
+    def _finish(self, stage: str, step: Optional[str], started: Optional[float]) -> Dict:
+        duration = time.monotonic() - started if started is not None else None
+        if duration is not None:
+            key = f"{stage}/{step}" if step else stage
+            # 쿼리 재작성 루프처럼 같은 단계가 여러 번 실행되면 합산
+            self._timings[key] = self._timings.get(key, 0.0) + duration
+            record_stage_latency(key, duration)
+        return self._event(stage, step, "end", duration)
+
+    # --------------------------------------
+    # 그래프 밖 단계 (api.py에서 직접 기록)
+    # --------------------------------------
+    def start(self, stage: str, step: Optional[str] = None) -> Dict:
+        self._starts[(stage, step)] = time.monotonic()
+        return self._event(stage, step, "start")
+
+    def end(self, stage: str, step: Optional[str] = None) -> Dict:
+        return self._finish(stage, step, self._starts.pop((stage, step), None))
+
+    # --------------------------------------
+    # LangGraph astream_events(version="v2") 이벤트 변환
+    # --------------------------------------
+    def from_graph_event(self, event: Dict) -> Optional[Dict]:
+        """그래프 노드 시작/종료 이벤트면 진행 상황 이벤트로 변환, 아니면 None"""
+        kind = event["event"]
+        if kind not in ("on_chain_start", "on_chain_end"):
+            return None
+        metadata = event.get("metadata") or {}
+        # 노드 실행 자체만 사용 (노드 안의 체인/라우팅 함수 실행은 제외)
+        if event.get("name") != metadata.get("langgraph_node"):
+            return None
+        if not any(tag.startswith("graph:step:") for tag in event.get("tags") or []):
+            return None
+
+        path = _node_path(metadata.get("langgraph_checkpoint_ns", ""))
+        if not path:
+            return None
+        stage = path[0]
+        step = path[1] if len(path) > 1 else None
+
+        if kind == "on_chain_start":
+            self._starts[event["run_id"]] = time.monotonic()
+            return self._event(stage, step, "start")
+        return self._finish(stage, step, self._starts.pop(event["run_id"], None))
+
+    def timings(self) -> Dict[str, float]:
+        return {key: round(seconds, 3) for key, seconds in self._timings.items()}
+
+
+def _node_path(checkpoint_ns: str) -> List[str]:
+    """"search_web:<id>|retrieve:<id>" → ["search_web", "retrieve"]"""
+    return [part.split(":", 1)[0] for part in checkpoint_ns.split("|") if part]
+
+
+# ======================================
+# 단계별 지연 시간 통계 (/api/status)
+# ======================================
+_latency: Dict[str, deque] = {}
+_latency_lock = threading.Lock()
+
+
+def record_stage_latency(key: str, seconds: float):
+    with _latency_lock:
+        _latency.setdefault(key, deque(maxlen=STAGE_LATENCY_WINDOW)).append(seconds)
+
+
+def _percentile(values: List[float], q: float) -> float:
+    index = min(len(values) - 1, int(round(q / 100 * (len(values) - 1))))
+    return values[index]
+
+
+def stage_latency_stats() -> Dict[str, Dict]:
+    """단계별 최근 소요 시간 요약 (count / mean / p50 / p95, 초)"""
+    with _latency_lock:
+        snapshot: List[Tuple[str, List[float]]] = [(key, sorted(values)) for key, values in _latency.items()]
+    return {
+        key: {
+            "count": len(values),
+            "mean": round(sum(values) / len(values), 3),
+            "p50": round(_percentile(values, 50), 3),
+            "p95": round(_percentile(values, 95), 3),
+        }
+        for key, values in sorted(snapshot)
+        if values
+    }
@@ -0,0 +1,252 @@
+# 규칙 기반 질문 복잡도 분류기 (LLM 호출 전 fast path)
+"""
+is_simple_question의 판별 기준(대학명, 연도/일정, 모집요강/시험 과목 등)은 대부분 어휘적이므로
+사전/정규식으로 확실하게 판단되는 질문은 LLM을 호출하지 않고 바로 분류합니다.
+애매한 질문만 None을 반환하여 LLM 판별로 넘깁니다.
+
+사용법:
+    from question_rules import classify_by_rules, fast_path_stats
+
+    complexity, reason = classify_by_rules("중앙대 편입 일정이 언제인가요?")
+    # ("complex", "대학명: 중앙대")
+    complexity, reason = classify_by_rules("오답노트는 어떻게 정리할까요?")
+    # ("simple", "학습법 키워드: 오답노트")
+    complexity, reason = classify_by_rules("이거 괜찮을까요?")
+    # (None, "판단 보류") → LLM 판별
+"""
+
+import re
+import threading
+from typing import Dict, List, Optional, Tuple
+
+
+# ======================================
+# 1⃣ 대학명 / 약칭 사전
+# ======================================
+# 정식 명칭 → 약칭 목록 (정식 명칭의 "~대학교", "~대" 형태는 자동 포함)
+UNIVERSITY_ALIASES: Dict[str, List[str]] = {
+    "서울대학교": ["서울대"],
+    "연세대학교": ["연세대", "연대"],
+    "고려대학교": ["고려대", "고대"],
+    "서강대학교": ["서강대"],
+    "성균관대학교": ["성균관대", "성대"],
+    "한양대학교": ["한양대"],
+    "중앙대학교": ["중앙대", "중대"],
+    "경희대학교": ["경희대"],
+    "한국외국어대학교": ["한국외대", "외대"],
+    "서울시립대학교": ["서울시립대", "시립대"],
+    "건국대학교": ["건국대", "건대"],
+    "동국대학교": ["동국대"],
+    "홍익대학교": ["홍익대", "홍대"],
+    "국민대학교": ["국민대"],
+    "숭실대학교": ["숭실대"],
+    "세종대학교": ["세종대"],
+    "단국대학교": ["단국대"],
+    "광운대학교": ["광운대"],
+    "명지대학교": ["명지대"],
+    "상명대학교": ["상명대"],
+    "가톨릭대학교": ["가톨릭대"],
+    "아주대학교": ["아주대"],
+    "인하대학교": ["인하대"],
+    "가천대학교": ["가천대"],
+    "이화여자대학교": ["이화여대", "이대"],
+    "숙명여자대학교": ["숙명여대", "숙대"],
+    "성신여자대학교": ["성신여대"],
+    "동덕여자대학교": ["동덕여대"],
+    "서울여자대학교": ["서울여대"],
+    "덕성여자대학교": ["덕성여대"],
+    "서울과학기술대학교": ["서울과기대", "과기대"],
+    "한국항공대학교": ["항공대"],
+    "한성대학교": ["한성대"],
+    "서경대학교": ["서경대"],
+    "삼육대학교": ["삼육대"],
+    "경기대학교": ["경기대"],
+    "한국공학대학교": ["한국공대"],
+    "부산대학교": ["부산대"],
+    "경북대학교": ["경북대"],
+    "전남대학교": ["전남대"],
+    "충남대학교": ["충남대"],
+    "KAIST": ["카이스트"],
+    "POSTECH": ["포스텍"],
+}
+
+# 두 글자 약칭은 일반 단어("중대한", "연대기")와 겹치므로 뒤에 조사/공백/편입 등이 올 때만 인정
+_SHORT_ALIAS_SUFFIX = r"(?=$|[^가-힣]|편입|학교|생|[은는이가을를의에도랑와과])"
+
+# 두 글자 약칭은 띄어 쓴 일반 단어("고대 그리스", "성대 결절")와도 겹치므로
+# 질문에 입시 맥락 단어가 함께 있을 때만 대학명으로 인정
+ADMISSIONS_CONTEXT = ["편입", "모집", "전형", "학교", "입시", "기출", "원서", "합격", "지원"]
+
+
+def _build_university_patterns() -> List[Tuple[str, "re.Pattern", bool]]:
+    """(정식 명칭, 패턴, 입시 맥락 필요 여부) 목록"""
+    patterns = []
+    for official, aliases in UNIVERSITY_ALIASES.items():
+        names = {official, *aliases}
+        if official.endswith("대학교"):
+            names.add(official[:-2])  # ~대학교 → ~대학
+        for name in sorted(names, key=len, reverse=True):
+            short = len(name) <= 2
+            suffix = _SHORT_ALIAS_SUFFIX if short else ""
+            patterns.append((official, re.compile(r"(?<![가-힣])" + re.escape(name) + suffix, re.IGNORECASE), short))
+    return patterns
+
+
+_UNIVERSITY_PATTERNS = _build_university_patterns()
+
+
+# ======================================
+# 2⃣ 연도 / 일정 패턴, 키워드 목록
+# ======================================
+DATE_PATTERNS = [
+    re.compile(r"(?<!\d)20[1-3]\d\s*(학년도|년도|년|학번)"),  # 2025학년도, 2024년
+    re.compile(r"(?<!\d)20[1-3]\d(?=\s*편입)"),                # 2024 편입
+    re.compile(r"\d{1,2}\s*월\s*\d{1,2}\s*일"),          # 1월 18일 ("4월 학습 목표" 같은 계획 질문은 제외)
+]
+
+# 특정 대학/전형/일정 정보가 필요한 질문 (검색 필요)
+COMPLEX_KEYWORDS = [
+    "모집요강", "모집 요강", "모집인원", "모집 인원", "전형", "지원 자격", "지원자격",
+    "원서", "접수", "마감", "합격자", "발표", "경쟁률", "커트라인", "컷", "충원",
+    "시험 과목", "시험과목", "출제 범위", "출제범위", "반영 비율", "반영비율",
+    "서류", "학사편입", "일반편입", "복수지원", "중복지원", "등록금",
+    "시험 일정", "시험일", "입시 일정", "편입 일정", "전형 일정", "날짜", "기한",
+    "몇 군데", "대학별", "학교별",
+]
+
+# 일반적인 학습 방법/조언 질문
+SIMPLE_KEYWORDS = [
+    "공부법", "공부 방법", "공부방법", "학습법", "학습 방법", "공부는 어떻게", "공부 어떻게",
+    "암기", "외우", "오답노트", "오답 노트", "오답정리", "오답 정리", "복습", "예습", "회독",
+    "슬럼프", "멘탈", "집중", "동기부여", "의욕", "스트레스", "불안", "휴식", "수면",
+    "계획", "목표", "시간 관리", "시간관리", "시간 배분", "공부시간", "공부 시간", "루틴", "컨디션",
+    "어떻게 공부", "공부하는 게", "공부하면",
+    "문법", "단어", "어휘", "독해", "논리", "구문",
+    "미적분", "선형대수", "공식", "개념", "문제집", "교재", "인강", "모의고사",
+    "어떻게 해야", "어떻게 하면", "방법이 궁금", "팁",
+]
+
+# 입시 맥락 단어가 함께 있을 때만 검색 필요 신호로 보는 키워드 ("성대 결절 때문에 면접이 걱정돼요" 같은 고민 상담 제외)
+CONTEXT_COMPLEX_KEYWORDS = ["면접"]
+
+# 학습법 질문이라도 너무 짧으면 판단 보류
+MIN_SIMPLE_LENGTH = 6
+
+
+def _has_admissions_context(question: str) -> bool:
+    return any(word in question for word in ADMISSIONS_CONTEXT)
+
+
+def _university_matches(question: str):
+    """질문에 나온 대학명 (정식 명칭, 매칭된 텍스트), 두 글자 약칭은 입시 맥락이 있을 때만"""
+    context = None
+    for official, pattern, needs_context in _UNIVERSITY_PATTERNS:
+        match = pattern.search(question)
+        if not match:
+            continue
+        if needs_context:
+            if context is None:
+                context = _has_admissions_context(question)
+            if not context:
+                continue
+        yield official, match.group(0)
+
+
+def _find_university(question: str) -> Optional[str]:
+    for _, name in _university_matches(question):
+        return name
+    return None
+
+
+def _find_universities(question: str) -> List[str]:
+    """질문에 나온 대학의 정식 명칭 목록 (약칭도 정식 명칭으로 통일)"""
+    return sorted({official for official, _ in _university_matches(question)})
+
+
+_YEAR_RE = re.compile(r"20[1-3]\d")
+
+
+def _find_dates(question: str) -> List[str]:
+    """질문에 나온 연도/날짜 목록 (연도는 "2025학년도" / "2025년" 모두 "2025"로 통일)"""
+    dates = set()
+    for pattern in DATE_PATTERNS:
+        for match in pattern.finditer(question):
+            year = _YEAR_RE.search(match.group(0))
+            dates.add(year.group(0) if year else "".join(match.group(0).split()))
+    return sorted(dates)
+
+
+def question_entities(question: str) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+    """
+    질문에 나온 (대학, 연도/날짜) 개체
+    답변 캐시 범위 구분용: 임베딩이 비슷해도 학교/연도가 다르면 다른 답변이 필요함
+    """
+    text = " ".join(str(question).split())
+    return tuple(_find_universities(text)), tuple(_find_dates(text))
+
+
+def _find_keyword(question: str, keywords: List[str]) -> Optional[str]:
+    for keyword in keywords:
+        if keyword in question:
+            return keyword
+    return None
+
+
+# ======================================
+# 3⃣ 분류 + fast path 통계
+# ======================================
+_stats = {"total": 0, "simple": 0, "complex": 0, "deferred": 0}
+_stats_lock = threading.Lock()
+
+
+def _record(decision: Optional[str]):
+    with _stats_lock:
+        _stats["total"] += 1
+        _stats[decision or "deferred"] += 1
+
+
+def classify_rules_only(question: str) -> Tuple[Optional[str], str]:
+    """통계를 남기지 않는 순수 규칙 판별 (평가 스크립트용)"""
+    text = " ".join(str(question).split())
+
+    # 복잡한 질문 신호가 하나라도 있으면 complex (검색이 필요한 질문을 간단하게 처리하는 쪽이 더 위험)
+    university = _find_university(text)
+    if university:
+        return "complex", f"대학명: {university}"
+
+    for pattern in DATE_PATTERNS:
+        match = pattern.search(text)
+        if match:
+            return "complex", f"연도/일정: {match.group(0).strip()}"
+
+    keyword = _find_keyword(text, COMPLEX_KEYWORDS)
+    if not keyword and _has_admissions_context(text):
+        keyword = _find_keyword(text, CONTEXT_COMPLEX_KEYWORDS)
+    if keyword:
+        return "complex", f"전형/일정 키워드: {keyword}"
+
+    # 학습법 키워드만 있으면 simple
+    keyword = _find_keyword(text, SIMPLE_KEYWORDS)
+    if keyword and len(text) >= MIN_SIMPLE_LENGTH:
+        return "simple", f"학습법 키워드: {keyword}"
+
+    return None, "판단 보류"
+
+
+def classify_by_rules(question: str) -> Tuple[Optional[str], str]:
+    """
+    규칙으로 질문 복잡도 판별
+    Returns: ("simple" | "complex" | None, 판단 근거)  None이면 LLM 판별 필요
+    """
+    decision, reason = classify_rules_only(question)
+    _record(decision)
+    return decision, reason
+
+
+def fast_path_stats() -> Dict:
+    """규칙 판별로 LLM 호출을 생략한 비율"""
+    with _stats_lock:
+        stats = dict(_stats)
+    decided = stats["simple"] + stats["complex"]
+    stats["fast_path_rate"] = round(decided / stats["total"], 3) if stats["total"] else 0.0
+    return stats
@@ -3,10 +3,19 @@ from langchain_chroma import Chroma
 from langchain_google_genai import GoogleGenerativeAIEmbeddings
 from langchain_core.documents import Document
 from langchain_community.retrievers import TavilySearchAPIRetriever
-from langchain_core.tools import tool
-from typing import List
-import pandas as pd
+from langchain_core.retrievers import BaseRetriever
+from langchain_core.tools import StructuredTool, tool
+from langchain_core.runnables.config import ContextThreadPoolExecutor
+from typing import List, Tuple
+import asyncio
 import os
+import threading
+from keyword_index import KeywordIndex, build_index_from_collection
+from components import component, is_ready
+from embedding_cache import CachedEmbeddings
+from web_cache import CachedWebRetriever, WebSearchCache, WEB_CACHE_ENABLED
+from guideline_sync import GUIDELINE_CSV, sync_guideline_db
+from guideline_ingest import has_unfinished_ingest, ingest_guideline_csv
 
 
 # ======================================================
@@ -15,11 +24,21 @@ import os
 # - Ollama 대신 Google Gemini API 사용
 # - 필요: GOOGLE_API_KEY 환경 변수 설정
 # - 모델: text-embedding-004 (최신 임베딩 모델)
-print("Google Gemini Embeddings 모델 초기화 중...")
-embeddings_model = GoogleGenerativeAIEmbeddings(
-    model="models/text-embedding-004",  # Gemini 임베딩 모델
-    task_type="retrieval_document"      # 문서 검색 최적화
-)
+# - CachedEmbeddings: 같은 질문은 메모리 LRU / SQLite 캐시에서 바로 반환 (API 호출 생략)
+# - 모든 컴포넌트는 import 시점이 아니라 최초 사용 시(또는 warm_up 시) 한 번만 초기화
+embedding_model_name = "models/text-embedding-004"
+
+
+@component("embeddings")
+def get_embeddings_model() -> CachedEmbeddings:
+    print("Google Gemini Embeddings 모델 초기화 중...")
+    return CachedEmbeddings(
+        GoogleGenerativeAIEmbeddings(
+            model=embedding_model_name,      # Gemini 임베딩 모델
+            task_type="retrieval_document"   # 문서 검색 최적화
+        ),
+        model_name=embedding_model_name,
+    )
 
 
 # ======================================================
@@ -28,124 +47,230 @@ embeddings_model = GoogleGenerativeAIEmbeddings(
 persist_dir = "./chroma_guideline"
 collection_name = "guideline_db"
 
-if not os.path.exists(persist_dir):
-    print(" 최초 실행: CSV에서 GuidelineDB 생성 중...")
-    df = pd.read_csv("GuidelineDB.csv", encoding="utf-8")
 
-    # CSV를 Document 리스트로 변환
-    documents = []
-    for _, row in df.iterrows():
-        documents.append(
-            Document(
-                page_content=row["question"],
-                metadata={
-                    "answer": row["answer"],
-                    "category": row.get("category", ""),
-                    "source": "guidelineDB",
-                    "source_name": "GuidelineDB",
-                    "source_detail": row.get("출처", "출처 미기재"),
-                }
-            )
-        )
+def guideline_db_version() -> str:
+    """
+    GuidelineDB 버전 (Chroma SQLite 파일의 수정 시각)
+    - sync/ingest로 DB가 바뀌면 값이 달라짐 (별도 프로세스에서 실행해도 감지)
+    - 조회만으로는 바뀌지 않으므로 요청마다 호출해도 os.stat 비용뿐
+    """
+    base = os.path.join(persist_dir, "chroma.sqlite3")
+    mtimes = []
+    for path in (base, base + "-wal"):
+        try:
+            mtimes.append(os.stat(path).st_mtime_ns)
+        except OSError:
+            continue
+    return str(max(mtimes)) if mtimes else "none"
 
-    # 한 번에 DB 생성 및 저장
-    guideline_db = Chroma.from_documents(
-        documents=documents,
-        embedding=embeddings_model,
-        collection_name=collection_name,
-        persist_directory=persist_dir
-    )
-    print(" GuidelineDB 생성 완료 (Chroma persisted).")
-else:
-    print(" 기존 GuidelineDB 불러오는 중...")
+
+@component("guideline_db")
+def get_guideline_db() -> Chroma:
     guideline_db = Chroma(
         collection_name=collection_name,
         persist_directory=persist_dir,
-        embedding_function=embeddings_model
+        embedding_function=get_embeddings_model()
     )
-    print(" GuidelineDB 로드 완료.")
+
+    # 컬렉션이 비어 있으면 최초 실행으로 판단 (빈 persist 디렉토리만 있는 경우 포함)
+    is_first_run = guideline_db._collection.count() == 0
+
+    # - 최초 실행 또는 중단된 적재: CSV를 스트리밍으로 적재 (체크포인트에서 이어하기)
+    # - GUIDELINE_AUTO_SYNC=1: 시작 시 CSV 변경분(추가/변경/삭제)만 반영
+    # - 그 외에는 기존 컬렉션을 그대로 사용 (수동 동기화: python guideline_sync.py)
+    # (키워드 역색인은 이후 get_guideline_index()에서 컬렉션 기준으로 생성)
+    if is_first_run or has_unfinished_ingest(GUIDELINE_CSV):
+        print(" 최초 실행: CSV에서 GuidelineDB 생성 중...")
+        ingest_guideline_csv(GUIDELINE_CSV, db=guideline_db, resume=not is_first_run)
+        print(" GuidelineDB 생성 완료 (Chroma persisted).")
+    elif os.getenv("GUIDELINE_AUTO_SYNC", "0") == "1":
+        print(" 기존 GuidelineDB 불러오는 중 (CSV 증분 동기화)...")
+        sync_guideline_db(GUIDELINE_CSV, db=guideline_db)
+        print(" GuidelineDB 로드 완료.")
+    else:
+        print(" 기존 GuidelineDB 로드 완료.")
+    return guideline_db
 
 
 # ======================================================
 # 3⃣ Reranker 모델 설정 (생략 - LangChain 1.0 호환성 문제로 제거)
 # ======================================================
 # Reranker 기능은 검색 결과의 상위 N개를 자동으로 선택하는 것으로 대체
-print(" Reranker 기능 생략 (LangChain 1.0 호환성)")
 
 
 # ======================================================
-# 4⃣ 하이브리드 검색 함수 (키워드 + 벡터)
+# 4⃣ 키워드 역색인 구축 (BM25)
 # ======================================================
-def hybrid_search(query: str, k: int = 2) -> List[Document]:  #  기본값 2개로 변경
+# - 로드 시 한 번만 컬렉션의 question 텍스트로 역색인 생성
+# - 같은 프로세스에서 컬렉션에 문서를 추가/삭제할 때는 guideline_index도 함께 갱신
+# - 다른 프로세스(python guideline_sync.py 등)에서 컬렉션이 바뀌면 Chroma 파일 버전으로 감지해 재구축
+_index_version = None
+_index_rebuild_lock = threading.Lock()
+
+
+@component("guideline_index")
+def get_guideline_index() -> KeywordIndex:
+    global _index_version
+    version = guideline_db_version()
+    guideline_index = build_index_from_collection(get_guideline_db()._collection)
+    _index_version = version
+    print(f" 키워드 역색인 구축 완료 (문서 {len(guideline_index)}개)")
+    return guideline_index
+
+
+def _current_guideline_index() -> KeywordIndex:
     """
-    🎯 하이브리드 검색: 키워드 매칭 + 벡터 유사도 + Reranker
-    
-    단계:
-    1. 키워드 추출 (2글자 이상)
-    2. 키워드가 포함된 문서 필터링
-    3. 필터링된 문서에 대해 벡터 유사도 계산
-    4. Reranker로 최종 순위 결정
-    5. 키워드 매칭 실패 시 순수 벡터 검색으로 폴백
-    """
-    print(f"    하이브리드 검색 시작...")
+    GuidelineDB가 바뀌었으면 역색인을 다시 구축한 뒤 반환
+    (재구축은 한 요청만 수행하고, 그동안 다른 요청은 기존 색인으로 검색)
+    """
+    global _index_version
+    guideline_index = get_guideline_index()
+    version = guideline_db_version()
+    if version == _index_version or not _index_rebuild_lock.acquire(blocking=False):
+        return guideline_index
+    try:
+        if version != _index_version:
+            print(" GuidelineDB 변경 감지 → 키워드 역색인 재구축")
+            guideline_index.replace(build_index_from_collection(get_guideline_db()._collection))
+            _index_version = version
+            print(f" 키워드 역색인 재구축 완료 (문서 {len(guideline_index)}개)")
+    finally:
+        _index_rebuild_lock.release()
+    return guideline_index
+
+
+# ======================================================
+# 5⃣ 하이브리드 검색 함수 (키워드 + 벡터)
+# ======================================================
+# 검색 모드 (환경 변수 GUIDELINE_SEARCH_MODE)
+# - "fusion": 키워드(BM25)와 벡터 검색을 동시에 실행하고 RRF로 순위 결합 (기본값)
+# - "keyword_first": 키워드 매칭이 있으면 키워드 결과만, 없으면 벡터 검색 (기존 방식)
+SEARCH_MODE = os.getenv("GUIDELINE_SEARCH_MODE", "fusion")
+RRF_K = 60                 # Reciprocal Rank Fusion 상수
+FUSION_CANDIDATES = 20     # 각 검색 경로에서 가져올 후보 수
+KEYWORD_WEIGHT = 1.0       # 키워드 순위 가중치
+VECTOR_WEIGHT = 1.0        # 벡터 순위 가중치
+
+# 키워드/벡터 검색 병렬 실행용 스레드 풀 (콜백/트레이싱/deadline 컨텍스트 유지)
+_search_executor = ContextThreadPoolExecutor(max_workers=4, thread_name_prefix="guideline-search")
+
+
+def _keyword_search(query: str, k: int) -> List[Document]:
+    """역색인 BM25 검색 후 매칭된 문서만 컬렉션에서 조회 (점수는 metadata에 기록)"""
+    hits = _current_guideline_index().search(query, k=k)
+    if len(hits) == 0:
+        return []
+
+    ids = [doc_id for doc_id, _ in hits]
+    result = get_guideline_db()._collection.get(ids=ids, include=['documents', 'metadatas'])
+    rows = {
+        doc_id: (content, metadata or {})
+        for doc_id, content, metadata in zip(
+            result.get('ids', []), result.get('documents', []), result.get('metadatas', [])
+        )
+    }
+
+    # BM25 점수 순서 유지
+    return [
+        Document(
+            id=doc_id,
+            page_content=rows[doc_id][0],
+            metadata={**rows[doc_id][1], "keyword_score": score}
+        )
+        for doc_id, score in hits
+        if doc_id in rows
+    ]
+
+
+def _vector_search(query: str, k: int) -> List[Document]:
+    """벡터 유사도 검색 (관련도 점수는 metadata에 기록)"""
+    results = get_guideline_db().similarity_search_with_relevance_scores(query, k=k)
+    return [
+        Document(
+            id=doc.id,
+            page_content=doc.page_content,
+            metadata={**doc.metadata, "vector_score": score}
+        )
+        for doc, score in results
+    ]
+
+
+def _fuse_results(keyword_docs: List[Document], vector_docs: List[Document], k: int) -> List[Document]:
+    """두 검색 결과를 Reciprocal Rank Fusion으로 결합"""
+    fused = {}
+    for weight, rank_key, docs in (
+        (KEYWORD_WEIGHT, "keyword_rank", keyword_docs),
+        (VECTOR_WEIGHT, "vector_rank", vector_docs),
+    ):
+        for rank, doc in enumerate(docs, 1):
+            key = doc.id or doc.page_content
+            entry = fused.setdefault(key, {"doc": doc, "metadata": {}, "score": 0.0})
+            entry["metadata"].update(doc.metadata)
+            entry["metadata"][rank_key] = rank
+            entry["score"] += weight / (RRF_K + rank)
+
+    ranked = sorted(fused.values(), key=lambda x: x["score"], reverse=True)[:k]
+    return [
+        Document(
+            id=entry["doc"].id,
+            page_content=entry["doc"].page_content,
+            metadata={
+                "keyword_score": 0.0,
+                "vector_score": 0.0,
+                **entry["metadata"],
+                "fusion_score": entry["score"],
+            }
+        )
+        for entry in ranked
+    ]
+
+
+def hybrid_search(query: str, k: int = 2, mode: str = None) -> List[Document]:  #  기본값 2개로 변경
+    """
+    🎯 하이브리드 검색: BM25 키워드 검색 + 벡터 유사도
     
-    # 1⃣ 키워드 추출
-    keywords = [word for word in query.split() if len(word) >= 2]
-    print(f"    추출된 키워드: {keywords}")
+    fusion 모드 단계:
+    1. 키워드(BM25)와 벡터 검색을 동시에 실행 (각각 상위 FUSION_CANDIDATES개)
+    2. Reciprocal Rank Fusion으로 순위 결합 후 상위 k개 반환
+    3. 각 문서 metadata에 keyword_score / vector_score / fusion_score 기록
     
-    # 2⃣ DB에서 모든 문서 가져오기
-    collection = guideline_db._collection
-    all_result = collection.get(include=['documents', 'metadatas'])
-    all_contents = all_result.get('documents', [])
-    all_metadatas = all_result.get('metadatas', [])
+    keyword_first 모드: 키워드 매칭 실패 시에만 순수 벡터 검색으로 폴백
+    """
+    mode = mode or SEARCH_MODE
+    print(f"    하이브리드 검색 시작 (모드: {mode})...")
     
-    # 3⃣ 키워드 매칭 점수 계산
-    keyword_matches = []
-    for i, content in enumerate(all_contents):
-        score = sum(1 for kw in keywords if kw.lower() in content.lower())
+    if mode == "fusion":
+        keyword_future = _search_executor.submit(_keyword_search, query, FUSION_CANDIDATES)
+        vector_future = _search_executor.submit(_vector_search, query, FUSION_CANDIDATES)
+        keyword_docs = keyword_future.result()
+        vector_docs = vector_future.result()
+        print(f"    키워드 매칭 문서: {len(keyword_docs)}개, 벡터 검색 문서: {len(vector_docs)}개")
         
-        if score > 0:
-            keyword_matches.append({
-                'content': content,
-                'metadata': all_metadatas[i] if i < len(all_metadatas) else {},
-                'score': score
-            })
-    
-    print(f"    키워드 매칭 문서: {len(keyword_matches)}개")
+        print(f"    RRF 결합 후 상위 {k}개 선정...")
+        return _fuse_results(keyword_docs, vector_docs, k)
     
-    # 4⃣ 키워드 매칭된 문서 처리
-    if len(keyword_matches) > 0:
-        # 점수순 정렬 후 상위 50개
-        keyword_matches.sort(key=lambda x: x['score'], reverse=True)
-        top_matches = keyword_matches[:min(50, len(keyword_matches))]
-        
-        # Document 객체로 변환
-        candidate_docs = [
-            Document(
-                page_content=match['content'],
-                metadata=match['metadata']
-            )
-            for match in top_matches
-        ]
-        
-        # 상위 k개 선정 (Reranker 없이)
+    # 1⃣ 역색인 BM25 검색 (posting 수에 비례하는 비용)
+    keyword_docs = _keyword_search(query, k)
+    print(f"    키워드 매칭 문서: {len(keyword_docs)}개")
+    if len(keyword_docs) > 0:
         print(f"    상위 {k}개 선정...")
-        return candidate_docs[:k]
+        return keyword_docs
     
-    # 5⃣ 키워드 매칭 실패 → 순수 벡터 검색
+    # 2⃣ 키워드 매칭 실패 → 순수 벡터 검색
     print(f"    키워드 매칭 0개, 벡터 검색으로 폴백")
-    vector_results = guideline_db.similarity_search(query, k=k)
-    return vector_results
+    return _vector_search(query, k)
 
 
 # ======================================================
-# 5⃣ GuidelineDB 검색 도구 (하이브리드 방식)
+# 6⃣ GuidelineDB 검색 도구 (하이브리드 방식)
 # ======================================================
+SCORE_METADATA_KEYS = ("keyword_score", "keyword_rank", "vector_score", "vector_rank", "fusion_score")
+
 @tool
 def guideline_search(query: str) -> List[Document]:
     """
     GuidelineDB에서 하이브리드 검색합니다.
-    키워드 매칭 + 벡터 유사도 + Reranker 조합
+    키워드(BM25) + 벡터 유사도 순위 결합(RRF)
     """
     print(f"\n [GuidelineDB Hybrid Search] 쿼리: {query}")
     
@@ -173,7 +298,13 @@ def guideline_search(query: str) -> List[Document]:
                 metadata={
                     "source": "guidelineDB",
                     "source_name": "GuidelineDB",
-                    "source_detail": src_detail
+                    "source_detail": src_detail,
+                    # 검색 경로별 점수 (fusion 모드가 아니면 없는 값은 생략)
+                    **{
+                        key: d.metadata[key]
+                        for key in SCORE_METADATA_KEYS
+                        if key in d.metadata
+                    }
                 }
             )
         )
@@ -183,26 +314,55 @@ def guideline_search(query: str) -> List[Document]:
 
 
 # ======================================================
-# 6⃣ 웹 검색 도구
+# 7⃣ 웹 검색 도구
 # ======================================================
-print(" Tavily Web Search Retriever 초기화 중...")
-web_retriever = TavilySearchAPIRetriever(k=10)
-print(" Web Retriever 준비 완료.")
+# 웹 검색 retriever 종류: tavily (기본) | fixture (로컬 fixture 문서, 오프라인 테스트 / 부하 벤치마크용)
+WEB_RETRIEVER = os.getenv("WEB_RETRIEVER", "tavily")
+WEB_SEARCH_K = 10
+# Tavily 호출 하나의 제한 시간 (초, deadline 초과로 결과를 버린 호출도 이 시간 안에 끝남)
+WEB_SEARCH_TIMEOUT = float(os.getenv("WEB_SEARCH_TIMEOUT", "20"))
 
+# 다중 쿼리 검색: 후보 쿼리를 동시에 검색한 뒤 URL 기준으로 합쳐 상위 몇 개만 사용
+MULTI_QUERY_MAX_DOCS = int(os.getenv("WEB_MULTI_QUERY_MAX_DOCS", "3"))
+# 쿼리별 검색 스레드 풀 (콜백/트레이싱/deadline 컨텍스트 유지)
+_web_executor = ContextThreadPoolExecutor(max_workers=4, thread_name_prefix="web-search")
 
-@tool
-def web_search(query: str) -> List[Document]:
+
+def _build_web_retriever(kind: str) -> BaseRetriever:
+    if kind == "tavily":
+        return TavilySearchAPIRetriever(k=WEB_SEARCH_K, kwargs={"timeout": WEB_SEARCH_TIMEOUT})
+    if kind == "fixture":
+        from web_fixture import FixtureWebRetriever, load_fixture
+        return FixtureWebRetriever(entries=load_fixture(), k=WEB_SEARCH_K)
+    raise ValueError(f"지원하지 않는 WEB_RETRIEVER: {kind} (tavily / fixture)")
+
+
+@component("web_retriever")
+def get_web_retriever() -> BaseRetriever:
     """
-    데이터베이스에 없는 정보 또는 최신 정보를 웹에서 검색합니다.
-    (검색된 문서의 제목, URL, 내용 요약, 출처를 포함하여 반환)
+    WEB_RETRIEVER 종류의 retriever (invoke / ainvoke)
+    WEB_CACHE_ENABLED=1이면 (종류, k, 정규화된 쿼리) 기준 TTL 캐시를 앞단에 둠
     """
-    print(f"\n [Web Search] 쿼리 실행: {query}")
-    # 검색 실행
-    docs = web_retriever.invoke(query)
-    
-    # 상위 2개 문서만 선별 (Reranker 대신)
-    if len(docs) > 2:
-        docs = docs[:2]
+    print(f"웹 검색 retriever 초기화 중... ({WEB_RETRIEVER})")
+    retriever = _build_web_retriever(WEB_RETRIEVER)
+    if not WEB_CACHE_ENABLED:
+        return retriever
+    return CachedWebRetriever(underlying=retriever, cache=WebSearchCache(), name=WEB_RETRIEVER)
+
+
+def web_search_cache_stats():
+    """웹 검색 캐시 통계 (retriever가 아직 초기화되지 않았거나 캐시를 끈 경우 None)"""
+    if not is_ready("web_retriever"):
+        return None
+    retriever = get_web_retriever()
+    return retriever.stats() if isinstance(retriever, CachedWebRetriever) else None
+
+
+def _format_web_docs(docs: List[Document], limit: int = 2) -> List[Document]:
+    """검색 결과를 제목/URL/요약 형식의 Document로 변환 (상위 limit개)"""
+    # 상위 limit개 문서만 선별 (Reranker 대신)
+    if len(docs) > limit:
+        docs = docs[:limit]
     formatted_docs = []
 
     if len(docs) == 0:
@@ -240,6 +400,105 @@ def web_search(query: str) -> List[Document]:
     return formatted_docs
 
 
+def _web_search(query: str) -> List[Document]:
+    """
+    데이터베이스에 없는 정보 또는 최신 정보를 웹에서 검색합니다.
+    (검색된 문서의 제목, URL, 내용 요약, 출처를 포함하여 반환)
+    """
+    print(f"\n [Web Search] 쿼리 실행: {query}")
+    return _format_web_docs(get_web_retriever().invoke(query))
+
+
+async def _aweb_search(query: str) -> List[Document]:
+    """_web_search의 비동기 버전 (Tavily 비동기 API 사용)"""
+    print(f"\n [Web Search] 쿼리 실행 (async): {query}")
+    return _format_web_docs(await get_web_retriever().ainvoke(query))
+
+
+# web_search.invoke() / await web_search.ainvoke() 모두 지원
+web_search = StructuredTool.from_function(
+    func=_web_search,
+    coroutine=_aweb_search,
+    name="web_search",
+    description=_web_search.__doc__,
+)
+
+
+def _merge_web_results(queries: List[str], results: List) -> List[Document]:
+    """
+    쿼리별 검색 결과를 URL 기준으로 중복 제거하여 합침
+    Tavily 점수(score)가 높은 순, 점수가 같으면 쿼리 내 순위 → 쿼리 순서대로 정렬
+    """
+    ranked: List[Tuple[float, int, int, Document]] = []
+    for query_index, (query, docs) in enumerate(zip(queries, results)):
+        if isinstance(docs, Exception):
+            print(f"    ⚠️ 쿼리 검색 실패 ({query}): {str(docs)[:100]}")
+            continue
+        for rank, doc in enumerate(docs):
+            ranked.append((-float(doc.metadata.get("score") or 0.0), rank, query_index, doc))
+    ranked.sort(key=lambda entry: entry[:3])
+
+    merged, seen = [], set()
+    for _, _, _, doc in ranked:
+        url = doc.metadata.get("source") or doc.page_content[:100]
+        if url in seen:
+            continue
+        seen.add(url)
+        merged.append(doc)
+    print(f"    쿼리 {len(queries)}개 결과 {len(ranked)}개 → URL 중복 제거 후 {len(merged)}개")
+    return merged
+
+
+def _retrieve_or_error(query: str):
+    try:
+        return get_web_retriever().invoke(query)
+    except Exception as e:
+        return e
+
+
+def _multi_web_search(queries: List[str]) -> List[Document]:
+    """
+    여러 검색 쿼리를 동시에 웹 검색하고, 결과를 URL 기준으로 합쳐 상위 문서를 반환합니다.
+    (일부 쿼리가 실패해도 나머지 결과 사용)
+    """
+    print(f"\n [Web Search] 다중 쿼리 동시 실행: {queries}")
+    futures = [_web_executor.submit(_retrieve_or_error, query) for query in queries]
+    results = [future.result() for future in futures]
+    return _format_web_docs(_merge_web_results(queries, results), limit=MULTI_QUERY_MAX_DOCS)
+
+
+async def _amulti_web_search(queries: List[str]) -> List[Document]:
+    """_multi_web_search의 비동기 버전"""
+    print(f"\n [Web Search] 다중 쿼리 동시 실행 (async): {queries}")
+    retriever = get_web_retriever()
+    results = await asyncio.gather(*(retriever.ainvoke(query) for query in queries), return_exceptions=True)
+    return _format_web_docs(_merge_web_results(queries, results), limit=MULTI_QUERY_MAX_DOCS)
+
+
+# multi_web_search.invoke({"queries": [...]}) / await multi_web_search.ainvoke(...) 모두 지원
+multi_web_search = StructuredTool.from_function(
+    func=_multi_web_search,
+    coroutine=_amulti_web_search,
+    name="multi_web_search",
+    description=_multi_web_search.__doc__,
+)
+
+
 # Cell 12
 # 도구 목록을 정의 
 tools = [guideline_search, web_search]
+
+
+# 이전 버전 호환: from step3_db_and_search import guideline_db 등은 접근 시점에 초기화
+_LAZY_ATTRS = {
+    "embeddings_model": get_embeddings_model,
+    "guideline_db": get_guideline_db,
+    "guideline_index": get_guideline_index,
+    "web_retriever": get_web_retriever,
+}
+
+
+def __getattr__(name):
+    if name in _LAZY_ATTRS:
+        return _LAZY_ATTRS[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
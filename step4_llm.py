@@ -3,19 +3,51 @@ from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.tools import Tool
 from dotenv import load_dotenv
 import os
+from components import component
 
 # .env 파일에서 GOOGLE_API_KEY 불러오기
 load_dotenv()
 google_api_key = os.getenv("GOOGLE_API_KEY")
 
-# 기본 LLM - Gemini 사용
-llm = ChatGoogleGenerativeAI(
-    model="gemini-2.5-flash",
-    google_api_key=google_api_key,
-    temperature=0,
-    streaming=True
-)
+# 호출 하나의 제한 시간(초) / 재시도 횟수
+# deadline 초과로 결과를 버린 호출도 클라이언트에서 이 시간 안에 끝나 스레드 풀 작업자를 돌려줌
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "45"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "1"))
+
+
+def build_llm(timeout: float = LLM_TIMEOUT, max_retries: int = LLM_MAX_RETRIES) -> ChatGoogleGenerativeAI:
+    """Gemini 클라이언트 생성 (단계별로 더 짧은 제한 시간이 필요할 때 사용)"""
+    return ChatGoogleGenerativeAI(
+        model="gemini-2.5-flash",
+        google_api_key=google_api_key,
+        temperature=0,
+        streaming=True,
+        timeout=timeout,
+        max_retries=max_retries,
+    )
+
+
+# 기본 LLM - Gemini 사용 (최초 사용 시 생성)
+@component("llm")
+def get_llm() -> ChatGoogleGenerativeAI:
+    return build_llm()
+
 
 # 도구 바인딩
-from step3_db_and_search import tools
-llm_with_tools = llm.bind_tools(tools)
+@component("llm_with_tools")
+def get_llm_with_tools():
+    from step3_db_and_search import tools
+    return get_llm().bind_tools(tools)
+
+
+# 이전 버전 호환: from step4_llm import llm 은 접근 시점에 초기화
+_LAZY_ATTRS = {
+    "llm": get_llm,
+    "llm_with_tools": get_llm_with_tools,
+}
+
+
+def __getattr__(name):
+    if name in _LAZY_ATTRS:
+        return _LAZY_ATTRS[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
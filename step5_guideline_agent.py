@@ -1,7 +1,9 @@
 # Cell 19
 from langgraph.graph import StateGraph, START, END
 from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.runnables import RunnableLambda
 from typing import Literal, List, Dict
+from pydantic import BaseModel, Field
 from pprint import pprint
 try:
     from IPython.display import Image, display
@@ -10,10 +12,20 @@ except ImportError:
     Image = None
     display = None
 import datetime
-import re
+import os
 from step2_states import QAState
 from step3_db_and_search import guideline_search
-from step4_llm import llm
+from step4_llm import get_llm
+from components import component
+from answer_style import FINAL_ANSWER_GUIDELINES, FINAL_ANSWER_TAG
+from context_packer import pack_facts, CONTEXT_BUDGET_SUB_AGENT
+from deadline import (
+    bounded, abounded, has_budget, mark_degraded, DeadlineExceeded,
+    ANSWER_RESERVE, MIN_REWRITE_BUDGET,
+)
+
+# 검색/추출/재작성 단계는 서브 에이전트 답변 + 최종 답변 생성 시간을 남겨둠
+GATHER_RESERVE = ANSWER_RESERVE * 2
 
 
 # ======================================
@@ -29,6 +41,7 @@ class GuidelineRagState(QAState):
     node_answer: str                  # 최종 노드 답변
     num_generations: int              # 루프 반복 횟수
     sources: List[str]                # 최종 출처 리스트
+    final_style: bool                 # 학생에게 바로 보여줄 최종 답변 형식으로 작성 (통합 에이전트 단일 출처 모드)
 
 
 # ======================================
@@ -45,17 +58,16 @@ def log(message: str, state: Dict = None):
 # ======================================
 # 3⃣ Guideline 문서 검색 단계
 # ======================================
-def retrieve_guideline_docs(state: GuidelineRagState) -> GuidelineRagState:
-    """
-    GuidelineDB의 [question] 컬럼을 기준으로 Embedding 검색 수행
-    """
+def _retrieve_query(state: GuidelineRagState) -> str:
     log("==== [1단계] retrieve_guideline_docs (question을 기준으로 GuidelineDB에서 검색 수행) 시작 ====", state)
 
     query = state.get("rewritten_query", state["question"])
     print(f"📢 검색 쿼리 입력값: {query}")
     print(" 검색 기준 필드: GuidelineDB의 [question] 컬럼 (임베딩 매칭)")
+    return query
 
-    docs = guideline_search.invoke(query)
+
+def _retrieve_result(docs: List) -> GuidelineRagState:
     print(f"📄 검색 결과 문서 수: {len(docs)}")
 
     if len(docs) > 0:
@@ -76,140 +88,326 @@ def retrieve_guideline_docs(state: GuidelineRagState) -> GuidelineRagState:
     return {"search_results": docs, "sources": sources}
 
 
+def retrieve_guideline_docs(state: GuidelineRagState) -> GuidelineRagState:
+    """
+    GuidelineDB의 [question] 컬럼을 기준으로 Embedding 검색 수행
+    """
+    try:
+        docs = bounded(guideline_search.invoke, _retrieve_query(state), reserve=GATHER_RESERVE)
+    except DeadlineExceeded as e:
+        mark_degraded(f"GuidelineDB 검색 생략: {e}")
+        docs = []
+    return _retrieve_result(docs)
+
+
+async def aretrieve_guideline_docs(state: GuidelineRagState) -> GuidelineRagState:
+    """retrieve_guideline_docs의 비동기 버전"""
+    try:
+        docs = await abounded(guideline_search.ainvoke(_retrieve_query(state)), reserve=GATHER_RESERVE)
+    except DeadlineExceeded as e:
+        mark_degraded(f"GuidelineDB 검색 생략: {e}")
+        docs = []
+    return _retrieve_result(docs)
+
+
 # ======================================
 # 4⃣ 문서 정보 추출 및 평가 단계
 # ======================================
+# 문서별 추출 LLM 호출 동시 실행 수
+EXTRACT_CONCURRENCY = int(os.getenv("GUIDELINE_EXTRACT_CONCURRENCY", "4"))
+
+class GuidelineFact(BaseModel):
+    """문서에서 추출된 사실 하나"""
+    content: str = Field(description="추출된 정보 요약")
+    relevance_score: float = Field(description="질문과의 관련성 점수 (0-1)")
+    faithfulness_score: float = Field(description="문서 내용에 대한 충실성 점수 (0-1)")
+
+
+class GuidelineExtraction(BaseModel):
+    """Q/A 문서 하나에서 추출된 사실 목록"""
+    facts: List[GuidelineFact] = Field(default_factory=list, description="추출된 사실 리스트 (3~5개)")
+
+
+extract_prompt = ChatPromptTemplate.from_messages([
+    ("system", """당신은 대학 편입 모집요강 전문가입니다.
+    아래 Q/A 문서에서 학생 질문과 관련된 주요 사실을 3~5개 정도 추출하세요. 
+    각 사실마다 다음 두 가지를 0에서 1 사이의 점수로 평가하세요:
+    1. 질문과의 관련성 (relevance_score)
+    2. 문서 내용에 대한 충실성 (faithfulness_score)
+    """),
+    ("human", "질문: {question}\n\n[문서]\nQ: {q}\nA: {a}")
+])
+
+
+# 추출 체인은 한 번만 구성해 모든 문서/요청에서 재사용
+@component("guideline_extract_chain")
+def get_guideline_extract_chain():
+    return extract_prompt | get_llm().with_structured_output(GuidelineExtraction)
+
+
+def _extraction_input(state: GuidelineRagState, i: int, doc):
+    """i번째 문서의 추출 체인 입력 생성"""
+    print(f"\n🧾 {i+1}번째 문서 분석 중...")
+    src_detail = doc.metadata.get("source_detail", "출처 미기재")
+    print(f"   ▶ 출처: {src_detail}")
+
+    doc_q = doc.page_content
+    doc_a = doc.metadata.get("answer", "")
+    print(f"   Q: {doc_q[:100]}")
+    print(f"   A: {doc_a[:100]}")
+
+    return {"question": state["question"], "q": doc_q, "a": doc_a}
+
+
+def _parse_extraction(doc, result: GuidelineExtraction) -> Dict:
+    """구조화된 추출 결과에서 평균 점수를 계산하고 기준 미달이면 None 반환"""
+    if not result or not result.facts:
+        print(" LLM 결과 없음 → 문서 스킵")
+        return None
+
+    # --- 점수 집계 ---
+    facts = result.facts
+    text = "\n".join(
+        f"{n}. {fact.content} (관련성: {fact.relevance_score:.2f}, 충실성: {fact.faithfulness_score:.2f})"
+        for n, fact in enumerate(facts, 1)
+    )
+    avg_rel = sum(fact.relevance_score for fact in facts) / len(facts)
+    avg_fai = sum(fact.faithfulness_score for fact in facts) / len(facts)
+
+    print(f"   질문과 관련성: {avg_rel:.2f}, 충실성 점수: {avg_fai:.2f}")
+
+    # --- 점수 기준 필터링 ---
+    if avg_rel < 0.7 or avg_fai < 0.7:
+        print("점수가 낮아 제외됨 (기준: 0.7 이상)")
+        return None
+
+    return {
+        "content": text,
+        "source": doc.metadata.get("source_detail", "출처 미기재"),
+        "avg_relevance": avg_rel,
+        "avg_faithfulness": avg_fai,
+        # 사실별 점수 (답변 생성 시 문서 간 중복 제거 / 점수순 정렬에 사용)
+        "facts": [
+            {"content": fact.content, "relevance": fact.relevance_score, "faithfulness": fact.faithfulness_score}
+            for fact in facts
+        ]
+    }
+
+
+def _extraction_result(state: GuidelineRagState, extracted_list: List[Dict]) -> GuidelineRagState:
+    if len(extracted_list) == 0:
+        print("❗ 관련 정보가 추출되지 않았거나 점수 기준 미달입니다.")
+
+    log(" 정보 추출 및 필터링 완료", {"추출된 정보 개수": len(extracted_list)})
+    return {
+        "related_info": extracted_list,
+        "num_generations": state.get("num_generations", 0) + 1
+    }
+
+
+def _collect_extractions(state: GuidelineRagState, results: List) -> GuidelineRagState:
+    """문서 순서대로 결과를 모으고, 실패한 문서만 건너뜀"""
+    extracted_list = []
+    for i, (doc, result) in enumerate(zip(state["search_results"], results)):
+        if isinstance(result, Exception):
+            print(f" {i+1}번째 문서 추출 실패 → 문서 스킵: {str(result)[:100]}")
+            continue
+        extracted = _parse_extraction(doc, result)
+        if extracted is not None:
+            extracted_list.append(extracted)
+    return _extraction_result(state, extracted_list)
+
+
 def extract_guideline_info(state: GuidelineRagState) -> GuidelineRagState:
     log("==== [2단계] extract_guideline_info (문서에서 관련 핵심정보 추출 및 평가) 시작 ====", state)
-    extracted_list = []
 
     try:
-        for i, doc in enumerate(state["search_results"]):
-            print(f"\n🧾 {i+1}번째 문서 분석 중...")
-            src_detail = doc.metadata.get("source_detail", "출처 미기재")
-            print(f"   ▶ 출처: {src_detail}")
-
-            doc_q = doc.page_content
-            doc_a = doc.metadata.get("answer", "")
-            print(f"   Q: {doc_q[:100]}")
-            print(f"   A: {doc_a[:100]}")
-
-            prompt = ChatPromptTemplate.from_messages([
-                ("system", """당신은 대학 편입 모집요강 전문가입니다.
-                아래 Q/A 문서에서 학생 질문과 관련된 주요 사실을 3~5개 정도 추출하세요. 
-                각 항목은 다음과 같은 형식을 따릅니다:
-
-                1. [추출된 정보 요약]
-                - 질문과 답변의 관련성: 0~1 사이 숫자
-                - 충실성 점수: 0~1 사이 숫자
-                """),
-                ("human", "질문: {question}\n\n[문서]\nQ: {q}\nA: {a}")
-            ])
-            formatted = prompt.format(question=state["question"], q=doc_q, a=doc_a)
-            result = llm.invoke(formatted)
-
-            if not result or not result.content.strip():
-                print(" LLM 결과 없음 → 문서 스킵")
-                continue
-
-            # --- 점수 추출 ---
-            text = result.content.strip()
-            relevance_scores = [float(x) for x in re.findall(r"관련성\s*점수\s*[:：]?\s*([0-9]*\.?[0-9]+)", text)]
-            faithfulness_scores = [float(x) for x in re.findall(r"충실성\s*점수\s*[:：]?\s*([0-9]*\.?[0-9]+)", text)]
-
-            avg_rel = sum(relevance_scores)/len(relevance_scores) if relevance_scores else 0
-            avg_fai = sum(faithfulness_scores)/len(faithfulness_scores) if faithfulness_scores else 0
-
-            print(f"   질문과 관련성: {avg_rel:.2f}, 충실성 점수: {avg_fai:.2f}")
-
-            # --- 점수 기준 필터링 ---
-            if avg_rel < 0.7 or avg_fai < 0.7:
-                print("점수가 낮아 제외됨 (기준: 0.7 이상)")
-                continue
-
-            extracted_list.append({
-                "content": text,
-                "source": src_detail,
-                "avg_relevance": avg_rel,
-                "avg_faithfulness": avg_fai
-            })
-
-        if len(extracted_list) == 0:
-            print("❗ 관련 정보가 추출되지 않았거나 점수 기준 미달입니다.")
-
-        log(" 정보 추출 및 필터링 완료", {"추출된 정보 개수": len(extracted_list)})
-        return {
-            "related_info": extracted_list,
-            "num_generations": state.get("num_generations", 0) + 1
-        }
+        # 문서별 LLM 호출을 동시에 실행 (결과 순서 유지, 실패는 해당 문서만 제외)
+        prompts = [_extraction_input(state, i, doc) for i, doc in enumerate(state["search_results"])]
+        results = bounded(
+            get_guideline_extract_chain().batch,
+            prompts,
+            config={"max_concurrency": EXTRACT_CONCURRENCY},
+            return_exceptions=True,
+            reserve=GATHER_RESERVE
+        )
+        return _collect_extractions(state, results)
+
+    except DeadlineExceeded as e:
+        mark_degraded(f"GuidelineDB 정보 추출 생략: {e}")
+        return {"related_info": [], "num_generations": state.get("num_generations", 0) + 1}
+
+    except Exception as e:
+        print(f" [오류] extract_guideline_info 실패: {e}")
+        # 반복 횟수는 증가시켜 재작성 루프가 무한히 돌지 않도록 함
+        return {"related_info": [], "num_generations": state.get("num_generations", 0) + 1}
+
+
+async def aextract_guideline_info(state: GuidelineRagState) -> GuidelineRagState:
+    """extract_guideline_info의 비동기 버전"""
+    log("==== [2단계] extract_guideline_info (문서에서 관련 핵심정보 추출 및 평가) 시작 ====", state)
+
+    try:
+        prompts = [_extraction_input(state, i, doc) for i, doc in enumerate(state["search_results"])]
+        results = await abounded(
+            get_guideline_extract_chain().abatch(
+                prompts,
+                config={"max_concurrency": EXTRACT_CONCURRENCY},
+                return_exceptions=True
+            ),
+            reserve=GATHER_RESERVE
+        )
+        return _collect_extractions(state, results)
+
+    except DeadlineExceeded as e:
+        mark_degraded(f"GuidelineDB 정보 추출 생략: {e}")
+        return {"related_info": [], "num_generations": state.get("num_generations", 0) + 1}
 
     except Exception as e:
         print(f" [오류] extract_guideline_info 실패: {e}")
-        return {"related_info": [], "num_generations": 0}
+        # 반복 횟수는 증가시켜 재작성 루프가 무한히 돌지 않도록 함
+        return {"related_info": [], "num_generations": state.get("num_generations", 0) + 1}
 
 
 # ======================================
 # 5⃣ 검색 쿼리 재작성 단계
 # ======================================
-def rewrite_guideline_query(state: GuidelineRagState) -> GuidelineRagState:
-    """
-    정보 부족 시, LLM을 통해 검색 쿼리 재작성 수행
-    """
+rewrite_prompt = ChatPromptTemplate.from_messages([
+    ("system", """당신은 대학 편입 전문 상담가입니다.
+    아래 질문과 추출된 정보를 참고하여 더 구체적이고 정확한 검색 쿼리를 다시 작성하세요.
+    - 핵심 키워드: 학교명, 학과명, 지원유형(일반/학사), 과목, 일정
+    - 한 줄로 간결하게 작성
+    """),
+    ("human", "질문: {question}\n\n추출된 정보:\n{info}")
+])
+
+
+def _rewrite_input(state: GuidelineRagState):
     log("==== [3단계] rewrite_guideline_query (검색 쿼리 재작성) 시작 ====", state)
     info_text = "\n".join([i["content"] for i in state["related_info"]])
+    return rewrite_prompt.format(question=state["question"], info=info_text)
 
-    rewrite_prompt = ChatPromptTemplate.from_messages([
-        ("system", """당신은 대학 편입 전문 상담가입니다.
-        아래 질문과 추출된 정보를 참고하여 더 구체적이고 정확한 검색 쿼리를 다시 작성하세요.
-        - 핵심 키워드: 학교명, 학과명, 지원유형(일반/학사), 과목, 일정
-        - 한 줄로 간결하게 작성
-        """),
-        ("human", "질문: {question}\n\n추출된 정보:\n{info}")
-    ])
 
-    rewritten = llm.invoke(rewrite_prompt.format(question=state["question"], info=info_text))
+def _rewrite_result(rewritten) -> GuidelineRagState:
     new_query = rewritten.content.strip()
-
     print(f"💡 재작성된 쿼리: {new_query}")
     return {"rewritten_query": new_query}
 
 
+def _rewrite_skipped(state: GuidelineRagState, e: DeadlineExceeded) -> GuidelineRagState:
+    """시간 초과 시 기존 쿼리로 재검색 (판단 단계에서 곧 종료됨)"""
+    mark_degraded(f"GuidelineDB 쿼리 재작성 생략: {e}")
+    return {"rewritten_query": state.get("rewritten_query", state["question"])}
+
+
+def rewrite_guideline_query(state: GuidelineRagState) -> GuidelineRagState:
+    """
+    정보 부족 시, LLM을 통해 검색 쿼리 재작성 수행
+    """
+    try:
+        return _rewrite_result(bounded(get_llm().invoke, _rewrite_input(state), reserve=GATHER_RESERVE))
+    except DeadlineExceeded as e:
+        return _rewrite_skipped(state, e)
+
+
+async def arewrite_guideline_query(state: GuidelineRagState) -> GuidelineRagState:
+    """rewrite_guideline_query의 비동기 버전"""
+    try:
+        return _rewrite_result(await abounded(get_llm().ainvoke(_rewrite_input(state)), reserve=GATHER_RESERVE))
+    except DeadlineExceeded as e:
+        return _rewrite_skipped(state, e)
+
+
 # ======================================
 # 6⃣ 최종 답변 생성 단계
 # ======================================
-def generate_guideline_answer(state: GuidelineRagState) -> GuidelineRagState:
-    """
-    모든 추출 정보를 종합해 학생 질문에 대한 최종 답변 생성
-    """
+answer_prompt = ChatPromptTemplate.from_messages([
+    ("system", """당신은 대학 편입 모집요강 전문 상담가입니다.
+    학생의 질문과 관련 정보를 종합하여 답변을 작성하세요.
+    답변은 마크다운 형식으로 작성하며, 각 정보의 출처를 명확히 표시해야 합니다.
+    출력 구조:
+    1. 핵심 요약
+    2. 세부 내용
+    3. 참고 출처
+    """),
+    ("human", "질문: {question}\n\n관련 정보:\n{info}\n\n참고 출처:\n{src}")
+])
+
+# 단일 출처 모드: 통합 에이전트의 최종 답변과 같은 가이드라인으로 바로 최종 답변 작성
+final_answer_prompt = ChatPromptTemplate.from_messages([
+    ("system", FINAL_ANSWER_GUIDELINES),
+    ("human", "질문: {question}\n\n관련 정보:\n{info}\n\n참고 출처:\n{src}")
+])
+
+
+def related_facts(related_info: List[Dict]) -> List[Dict]:
+    """문서별 추출 결과를 사실 단위 목록으로 펼침 (source: 문서 출처, context_packer 형식)"""
+    return [
+        {**fact, "source": info["source"]}
+        for info in related_info
+        for fact in info.get("facts") or [
+            {"content": info["content"], "relevance": info.get("avg_relevance"), "faithfulness": info.get("avg_faithfulness")}
+        ]
+    ]
+
+
+def _packed_info(state: GuidelineRagState) -> str:
+    """추출된 사실을 중복 제거 / 점수순 정렬 후 토큰 예산까지만 포함"""
+    facts = related_facts(state.get("related_info", []))
+    return pack_facts(facts, budget=CONTEXT_BUDGET_SUB_AGENT, name="guideline_answer").text
+
+
+def _answer_input(state: GuidelineRagState):
     log("==== [4단계] generate_guideline_answer (최종 답변 생성) 시작 ====", state)
 
-    # 정보 병합 및 출처 표시
-    info_text = "\n".join([f"- {i['content']} (출처: {i['source']})" for i in state["related_info"]])
+    # 정보 병합 및 출처 표시 (토큰 예산 적용)
+    info_text = _packed_info(state)
     source_summary = "\n".join([f"- {s}" for s in state.get("sources", [])])
 
-    answer_prompt = ChatPromptTemplate.from_messages([
-        ("system", """당신은 대학 편입 모집요강 전문 상담가입니다.
-        학생의 질문과 관련 정보를 종합하여 답변을 작성하세요.
-        답변은 마크다운 형식으로 작성하며, 각 정보의 출처를 명확히 표시해야 합니다.
-        출력 구조:
-        1. 핵심 요약
-        2. 세부 내용
-        3. 참고 출처
-        """),
-        ("human", "질문: {question}\n\n관련 정보:\n{info}\n\n참고 출처:\n{src}")
-    ])
-
-    answer = llm.invoke(answer_prompt.format(
+    prompt = final_answer_prompt if state.get("final_style") else answer_prompt
+    return prompt.format(
         question=state["question"],
         info=info_text,
         src=source_summary
-    ))
+    )
+
 
+def _answer_llm(state: GuidelineRagState):
+    """최종 답변 형식이면 스트리밍 API가 토큰을 전달하도록 태그를 붙임"""
+    return get_llm().with_config(tags=[FINAL_ANSWER_TAG]) if state.get("final_style") else get_llm()
+
+
+def _answer_result(state: GuidelineRagState, answer) -> GuidelineRagState:
     print("🗒 생성된 답변 미리보기:\n", answer.content[:300], "...")
     log(" 최종 답변 생성 완료")
     return {"node_answer": answer.content, "sources": state.get("sources", [])}
 
 
+def _best_effort_answer(state: GuidelineRagState, e: DeadlineExceeded) -> GuidelineRagState:
+    """시간 초과 시 추출된 정보를 그대로 답변으로 사용 (최종 답변 단계에서 종합됨)"""
+    mark_degraded(f"GuidelineDB 답변 생성 생략 (추출 정보 사용): {e}")
+    info_text = _packed_info(state)
+    return {"node_answer": info_text, "sources": state.get("sources", [])}
+
+
+def generate_guideline_answer(state: GuidelineRagState) -> GuidelineRagState:
+    """
+    모든 추출 정보를 종합해 학생 질문에 대한 최종 답변 생성
+    """
+    try:
+        return _answer_result(state, bounded(_answer_llm(state).invoke, _answer_input(state), reserve=ANSWER_RESERVE))
+    except DeadlineExceeded as e:
+        return _best_effort_answer(state, e)
+
+
+async def agenerate_guideline_answer(state: GuidelineRagState) -> GuidelineRagState:
+    """generate_guideline_answer의 비동기 버전"""
+    try:
+        return _answer_result(state, await abounded(_answer_llm(state).ainvoke(_answer_input(state)), reserve=ANSWER_RESERVE))
+    except DeadlineExceeded as e:
+        return _best_effort_answer(state, e)
+
+
 # ======================================
 # 7⃣ 판단 단계
 # ======================================
@@ -232,89 +430,87 @@ def should_continue_guideline(state: GuidelineRagState) -> Literal["계속", "
         print(f"📈 충분한 정보 확보 ({info_count}개) → 종료")
         return "종료"
 
+    if not has_budget(MIN_REWRITE_BUDGET):
+        mark_degraded("남은 시간 부족 → GuidelineDB 쿼리 재작성 루프 생략")
+        return "종료"
+
     print("🔄 정보 부족 → 쿼리 재작성 후 재검색")
     return "계속"
 
 
 # ======================================
-# 8⃣ 그래프 구성 및 컴파일
+# 8⃣ 그래프 구성 및 컴파일 (표준 노드명, 최초 사용 시 한 번만 컴파일)
 # ======================================
-log(" [초기화] LangGraph Guideline Search Workflow 구성 시작")
-
-guideline_graph = StateGraph(GuidelineRagState)
-
-guideline_graph.add_node("retrieve", retrieve_guideline_docs)
-guideline_graph.add_node("extract", extract_guideline_info)
-guideline_graph.add_node("rewrite", rewrite_guideline_query)
-guideline_graph.add_node("answer", generate_guideline_answer)
+def build_guideline_graph(evidence_only: bool = False) -> StateGraph:
+    """완성편입 Guideline Graph 구성
 
-guideline_graph.add_edge(START, "retrieve")
-guideline_graph.add_edge("retrieve", "extract")
+    START → retrieve_documents → extract_and_evaluate
+     ├─(계속)→ rewrite_query → retrieve_documents
+     └─(종료)→ generate_answer → END
 
-guideline_graph.add_conditional_edges(
-    "extract",
-    should_continue_guideline,
-    {"계속": "rewrite", "종료": "answer"}
-)
-
-guideline_graph.add_edge("rewrite", "retrieve")
-guideline_graph.add_edge("answer", END)
+    evidence_only=True이면 답변을 생성하지 않고 추출 단계에서 종료
+    (related_info / sources만 반환, 통합 에이전트의 최종 답변 단계에서 한 번에 답변 생성)
+    """
+    # 그래프 생성
+    workflow = StateGraph(GuidelineRagState)
+
+    # 노드 추가 (표준화된 이름 사용, invoke/ainvoke 모두 지원)
+    workflow.add_node("retrieve_documents", RunnableLambda(retrieve_guideline_docs, afunc=aretrieve_guideline_docs))       # GuidelineDB 검색
+    workflow.add_node("extract_and_evaluate", RunnableLambda(extract_guideline_info, afunc=aextract_guideline_info))       # 정보 추출 및 점수 평가
+    workflow.add_node("rewrite_query", RunnableLambda(rewrite_guideline_query, afunc=arewrite_guideline_query))            # 검색 쿼리 재작성
+    if not evidence_only:
+        workflow.add_node("generate_answer", RunnableLambda(generate_guideline_answer, afunc=agenerate_guideline_answer))  # 최종 답변 생성
+
+    # 엣지 연결
+    workflow.add_edge(START, "retrieve_documents")
+    workflow.add_edge("retrieve_documents", "extract_and_evaluate")
+
+    # 조건부 엣지 연결
+    workflow.add_conditional_edges(
+        "extract_and_evaluate",
+        should_continue_guideline,  # 판단 로직
+        {
+            "계속": "rewrite_query",
+            "종료": END if evidence_only else "generate_answer"
+        }
+    )
 
-guideline_agent = guideline_graph.compile()
-log(" [완료] Guideline Agent 컴파일 완료")
+    # 루프: 쿼리 재작성 후 다시 검색
+    workflow.add_edge("rewrite_query", "retrieve_documents")
 
+    # 최종 답변 후 종료
+    if not evidence_only:
+        workflow.add_edge("generate_answer", END)
+    return workflow
 
-# ======================================
-# 🎯 완성편입 Guideline Graph (표준 노드명 버전)
-# ======================================
 
-# 그래프 생성
-workflow = StateGraph(GuidelineRagState)
-
-# 노드 추가 (표준화된 이름 사용)
-workflow.add_node("retrieve_documents", retrieve_guideline_docs)       # GuidelineDB 검색
-workflow.add_node("extract_and_evaluate", extract_guideline_info)      # 정보 추출 및 점수 평가
-workflow.add_node("rewrite_query", rewrite_guideline_query)            # 검색 쿼리 재작성
-workflow.add_node("generate_answer", generate_guideline_answer)        # 최종 답변 생성
-
-# 엣지 연결
-workflow.add_edge(START, "retrieve_documents")
-workflow.add_edge("retrieve_documents", "extract_and_evaluate")
-
-# 조건부 엣지 연결
-workflow.add_conditional_edges(
-    "extract_and_evaluate",
-    should_continue_guideline,  # 판단 로직
-    {
-        "계속": "rewrite_query",
-        "종료": "generate_answer"
-    }
-)
+@component("guideline_agent")
+def get_guideline_agent():
+    guideline_agent = build_guideline_graph().compile()
+    log(" [완료] Guideline Agent 컴파일 완료")
+    return guideline_agent
 
-# 루프: 쿼리 재작성 후 다시 검색
-workflow.add_edge("rewrite_query", "retrieve_documents")
 
-# 최종 답변 후 종료
-workflow.add_edge("generate_answer", END)
+@component("guideline_evidence_agent")
+def get_guideline_evidence_agent():
+    """답변 생성 없이 근거(related_info / sources)만 반환하는 Guideline Agent"""
+    guideline_evidence_agent = build_guideline_graph(evidence_only=True).compile()
+    log(" [완료] Guideline Evidence Agent 컴파일 완료")
+    return guideline_evidence_agent
 
-# 그래프 컴파일
-guideline_agent = workflow.compile()
 
 # ======================================
-# 🧭 그래프 시각화
+# 🧭 그래프 시각화 (Jupyter 환경에서 직접 호출)
 # ======================================
-if display is not None and Image is not None:
-    display(Image(guideline_agent.get_graph().draw_mermaid_png()))
-    print("\n [완료] Guideline Agent 그래프 구조 시각화 완료 ")
-else:
-    print("\n [완료] Guideline Agent 컴파일 완료 (그래프 시각화는 Jupyter 환경에서만 가능) ")
+def show_guideline_graph():
+    if display is not None and Image is not None:
+        display(Image(get_guideline_agent().get_graph().draw_mermaid_png()))
+    else:
+        print(" 그래프 시각화는 Jupyter 환경에서만 가능합니다.")
 
-# ======================================
-#  트리 구조 텍스트 로그
-# ======================================
-print("\nGuideline Workflow 구조:")
-print("""
-START → retrieve_documents → extract_and_evaluate
- ├─(계속)→ rewrite_query → retrieve_documents
- └─(종료)→ generate_answer → END
-""")
+
+# 이전 버전 호환: from step5_guideline_agent import guideline_agent 는 접근 시점에 컴파일
+def __getattr__(name):
+    if name == "guideline_agent":
+        return get_guideline_agent()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,6 +1,11 @@
 # Cell 22
 from langchain_core.prompts import ChatPromptTemplate
-from typing import Literal, Optional, List
+from langchain_core.runnables import RunnableLambda
+from langchain_core.runnables.config import ContextThreadPoolExecutor
+from typing import Literal, Optional, List, Dict
+from concurrent.futures import TimeoutError as FuturesTimeoutError, wait
+import asyncio
+import os
 try:
     from IPython.display import Image, display
 except ImportError:
@@ -10,8 +15,23 @@ except ImportError:
 from langgraph.graph import StateGraph, START, END
 from pydantic import BaseModel, Field
 from step2_states import QAState
-from step3_db_and_search import web_search
-from step4_llm import llm
+from step3_db_and_search import web_search, multi_web_search
+from step4_llm import get_llm, build_llm
+from components import component
+from answer_style import FINAL_ANSWER_GUIDELINES, FINAL_ANSWER_TAG
+from context_packer import pack_facts, CONTEXT_BUDGET_SUB_AGENT
+from deadline import (
+    bounded, abounded, has_budget, timeout_for, mark_degraded, DeadlineExceeded,
+    ANSWER_RESERVE, MIN_REWRITE_BUDGET,
+)
+
+# 검색/추출/재작성 단계는 서브 에이전트 답변 + 최종 답변 생성 시간을 남겨둠
+GATHER_RESERVE = ANSWER_RESERVE * 2
+
+# 다중 쿼리 검색: 첫 검색은 원래 질문으로, 부족하면 재작성 단계에서 제안된 후보 쿼리를 모두 동시에 검색
+# (이 한 번의 넓은 검색이 이후의 재작성 → 재검색 반복을 대신함)
+MULTI_QUERY_ENABLED = os.getenv("WEB_MULTI_QUERY", "1") == "1"
+MAX_SEARCH_QUERIES = int(os.getenv("WEB_MAX_SEARCH_QUERIES", "3"))
 
 # ==============================
 # 0⃣ Pydantic 스키마 정의 (필수!)
@@ -31,6 +51,7 @@ class ExtractedInformation(BaseModel):
 class RefinedQuestion(BaseModel):
     """재작성된 검색 쿼리"""
     question_refined: str = Field(description="개선된 검색 쿼리")
+    candidate_queries: List[str] = Field(default_factory=list, description="제안한 2-3개의 검색 쿼리 전체")
     reason: str = Field(default="", description="재작성 이유")
 
 # ==============================
@@ -38,20 +59,54 @@ class RefinedQuestion(BaseModel):
 # ==============================
 class SearchRagState(QAState):
     rewritten_query: Optional[str] = None          # 재작성한 질문
+    search_queries: Optional[List[str]] = None     # 동시에 검색할 후보 쿼리 (다중 쿼리 검색)
     documents: Optional[List] = None               # 검색된 문서 리스트  추가!
     extracted_info: Optional[List] = None          # 추출된 정보 조각 리스트
     node_answer: Optional[str] = None              # 최종 답변
     num_generations: int = 0                       # 반복 횟수
+    final_style: bool = False                      # 학생에게 바로 보여줄 최종 답변 형식으로 작성 (통합 에이전트 단일 출처 모드)
 
 
 # ==============================
 # 2⃣ 문서 검색 단계
 # ==============================
-def retrieve_documents(state: SearchRagState) -> SearchRagState:
+def _retrieve_query(state: SearchRagState) -> str:
     print(" --- [1단계] 문서 검색 ---")
     query = state.get("rewritten_query", state["question"])
     print(f"🔎 검색 쿼리: {query}")
-    docs = web_search.invoke(query)
+    return query
+
+
+def _search_tool_input(state: SearchRagState):
+    """후보 쿼리가 여러 개면 다중 쿼리 검색, 아니면 단일 쿼리 검색 (tool, 입력)"""
+    queries = state.get("search_queries") or []
+    if len(queries) > 1:
+        print(" --- [1단계] 문서 검색 (다중 쿼리) ---")
+        for query in queries:
+            print(f"🔎 검색 쿼리: {query}")
+        return multi_web_search, {"queries": queries}
+    return web_search, _retrieve_query(state)
+
+
+def retrieve_documents(state: SearchRagState) -> SearchRagState:
+    try:
+        tool, tool_input = _search_tool_input(state)
+        docs = bounded(tool.invoke, tool_input, reserve=GATHER_RESERVE)
+    except DeadlineExceeded as e:
+        mark_degraded(f"웹 검색 생략: {e}")
+        docs = []
+    print(f"📄 검색 결과 문서 수: {len(docs)}")
+    return {"documents": docs}
+
+
+async def aretrieve_documents(state: SearchRagState) -> SearchRagState:
+    """retrieve_documents의 비동기 버전"""
+    try:
+        tool, tool_input = _search_tool_input(state)
+        docs = await abounded(tool.ainvoke(tool_input), reserve=GATHER_RESERVE)
+    except DeadlineExceeded as e:
+        mark_degraded(f"웹 검색 생략: {e}")
+        docs = []
     print(f"📄 검색 결과 문서 수: {len(docs)}")
     return {"documents": docs}
 
@@ -59,6 +114,87 @@ def retrieve_documents(state: SearchRagState) -> SearchRagState:
 # ==============================
 # 3⃣ 정보 추출 및 평가 단계
 # ==============================
+MAX_DOC_LENGTH = 3000  #  문서 최대 길이 제한 (메모리 보호)
+MAX_EXTRACT_DOCS = 3   #  최대 3개 문서만 처리
+EXTRACT_TIMEOUT = float(os.getenv("WEB_EXTRACT_TIMEOUT", "20"))  # 문서별 추출 제한 시간 (초)
+
+extract_prompt = ChatPromptTemplate.from_messages([
+    ("system", """당신은 인터넷 정보 검색 전문가입니다. 주어진 문서에서 질문과 관련된 주요 사실과 정보를 최대 3개만 간결하게 추출하세요. 
+    각 추출된 정보에 대해 다음 두 가지 측면을 0에서 1 사이의 점수로 평가하세요:
+    1. 질문과 답변의 관련성
+    2. 답변의 충실성
+    
+    마지막으로, 문서 전체의 질문 관련성을 0에서 1 사이의 점수로 평가하세요."""),
+    ("human", "[질문]\n{question}\n\n[문서 내용]\n{document_content}")
+])
+
+
+# 추출 체인은 한 번만 구성해 모든 문서/요청에서 재사용
+# 제한 시간을 넘겨 버린 호출이 계속 실행되지 않도록 클라이언트 제한 시간도 EXTRACT_TIMEOUT으로 설정 (재시도 없음)
+@component("web_extract_chain")
+def get_web_extract_chain():
+    llm = build_llm(timeout=EXTRACT_TIMEOUT, max_retries=0)
+    return extract_prompt | llm.with_structured_output(ExtractedInformation)
+
+
+def _extraction_input(state: SearchRagState, idx: int, total: int, doc) -> Dict[str, str]:
+    print(f"\n📘 문서 {idx+1}/{total} 분석 중...")
+
+    #  문서 내용 길이 제한 (메모리 과부하 방지)
+    doc_content = doc.page_content[:MAX_DOC_LENGTH]
+    if len(doc.page_content) > MAX_DOC_LENGTH:
+        print(f" 문서가 너무 큽니다. {MAX_DOC_LENGTH}자로 자름")
+
+    return {"question": state["question"], "document_content": doc_content}
+
+
+def _collect_strips(doc, extracted_data: ExtractedInformation) -> List[InformationStrip]:
+    """점수 기준을 통과한 정보 조각만 출처를 붙여 반환"""
+    print(f"   📊 문서 관련성: {extracted_data.query_relevance:.2f}")
+
+    if extracted_data.query_relevance < 0.7:  # 기준 완화 (0.8 → 0.7)
+        print("    문서 관련성 낮음 → 제외")
+        return []
+
+    strips = []
+    for strip in extracted_data.strips:
+        if strip.relevance_score >= 0.7 and strip.faithfulness_score >= 0.7:
+            strip.source = doc.metadata.get("source_url", doc.metadata.get("url", "출처 미상"))
+            strips.append(strip)
+            print(f"    정보 추출: {strip.content[:50]}...")
+    return strips
+
+
+def _extraction_result(state: SearchRagState, extracted_strips: List) -> SearchRagState:
+    print(f"\n 총 추출된 정보 개수: {len(extracted_strips)}")
+
+    return {
+        "extracted_info": extracted_strips,
+        "num_generations": state.get("num_generations", 0) + 1
+    }
+
+
+def _collect_extractions(state: SearchRagState, targets: List, results: List) -> SearchRagState:
+    """문서 순서대로 결과를 모으고, 실패/시간 초과 문서는 제외"""
+    extracted_strips = []
+    for idx, (doc, result) in enumerate(zip(targets, results)):
+        if isinstance(result, Exception):
+            reason = "시간 초과" if isinstance(result, (TimeoutError, FuturesTimeoutError, asyncio.TimeoutError)) else str(result)[:100]
+            print(f"    문서 {idx+1} 처리 오류 → 제외: {reason}")
+            continue
+        extracted_strips.extend(_collect_strips(doc, result))
+    return _extraction_result(state, extracted_strips)
+
+
+def _extract_timeout(state: SearchRagState) -> Optional[float]:
+    """문서별 추출 제한 시간 (남은 시간 예산이 없으면 None → 추출 생략)"""
+    timeout = timeout_for(EXTRACT_TIMEOUT, reserve=GATHER_RESERVE)
+    if timeout <= 0:
+        mark_degraded("남은 시간 부족 → 웹 문서 정보 추출 생략")
+        return None
+    return timeout
+
+
 def extract_and_evaluate_information(state: SearchRagState) -> SearchRagState:
     print("🧩 --- [2단계] 정보 추출 및 평가 ---")
 
@@ -68,131 +204,229 @@ def extract_and_evaluate_information(state: SearchRagState) -> SearchRagState:
         print("❗ 문서가 없습니다.")
         return {"extracted_info": [], "num_generations": state.get("num_generations", 0) + 1}
 
-    extracted_strips = []
-    MAX_DOC_LENGTH = 3000  #  문서 최대 길이 제한 (메모리 보호)
-
-    for idx, doc in enumerate(docs[:3]):  #  최대 3개 문서만 처리
-        print(f"\n📘 문서 {idx+1}/{len(docs[:3])} 분석 중...")
-        
-        try:
-            #  문서 내용 길이 제한 (메모리 과부하 방지)
-            doc_content = doc.page_content[:MAX_DOC_LENGTH]
-            if len(doc.page_content) > MAX_DOC_LENGTH:
-                print(f" 문서가 너무 큽니다. {MAX_DOC_LENGTH}자로 자름")
-            
-            extract_prompt = ChatPromptTemplate.from_messages([
-                ("system", """당신은 인터넷 정보 검색 전문가입니다. 주어진 문서에서 질문과 관련된 주요 사실과 정보를 최대 3개만 간결하게 추출하세요. 
-                각 추출된 정보에 대해 다음 두 가지 측면을 0에서 1 사이의 점수로 평가하세요:
-                1. 질문과 답변의 관련성
-                2. 답변의 충실성
-                
-                마지막으로, 문서 전체의 질문 관련성을 0에서 1 사이의 점수로 평가하세요."""),
-                ("human", "[질문]\n{question}\n\n[문서 내용]\n{document_content}")
-            ])
-
-            extract_llm = llm.with_structured_output(ExtractedInformation)
-            
-            extracted_data = extract_llm.invoke(extract_prompt.format(
-                question=state["question"],
-                document_content=doc_content
-            ))
-
-            print(f"   📊 문서 관련성: {extracted_data.query_relevance:.2f}")
-            
-            if extracted_data.query_relevance < 0.7:  # 기준 완화 (0.8 → 0.7)
-                print("    문서 관련성 낮음 → 제외")
-                continue
-
-            for strip in extracted_data.strips:
-                if strip.relevance_score >= 0.7 and strip.faithfulness_score >= 0.7:
-                    strip.source = doc.metadata.get("source_url", doc.metadata.get("url", "출처 미상"))
-                    extracted_strips.append(strip)
-                    print(f"    정보 추출: {strip.content[:50]}...")
-        
-        except Exception as e:
-            print(f"    문서 처리 오류: {str(e)[:100]}")
-            continue  # 오류 발생 시 다음 문서로
+    timeout = _extract_timeout(state)
+    if timeout is None:
+        return {"extracted_info": [], "num_generations": state.get("num_generations", 0) + 1}
 
-    print(f"\n 총 추출된 정보 개수: {len(extracted_strips)}")
+    targets = docs[:MAX_EXTRACT_DOCS]
+    chain = get_web_extract_chain()
+
+    # 문서별 추출을 동시에 실행하고, 제한 시간 안에 끝나지 않은 문서는 버림
+    # 요청마다 문서 수만큼의 작업자를 두어 모든 문서가 바로 시작됨 (다른 요청의 대기열에서 시간을 쓰지 않음)
+    executor = ContextThreadPoolExecutor(max_workers=len(targets), thread_name_prefix="web-extract")
+    try:
+        futures = [
+            executor.submit(chain.invoke, _extraction_input(state, idx, len(targets), doc))
+            for idx, doc in enumerate(targets)
+        ]
+        wait(futures, timeout=timeout)
+    finally:
+        # 끝나지 않은 호출은 기다리지 않음 (클라이언트 제한 시간으로 곧 종료됨)
+        executor.shutdown(wait=False)
+
+    results = []
+    for future in futures:
+        if not future.done():
+            results.append(FuturesTimeoutError())
+        elif future.exception() is not None:
+            results.append(future.exception())
+        else:
+            results.append(future.result())
+
+    return _collect_extractions(state, targets, results)
+
+
+async def aextract_and_evaluate_information(state: SearchRagState) -> SearchRagState:
+    """extract_and_evaluate_information의 비동기 버전"""
+    print("🧩 --- [2단계] 정보 추출 및 평가 ---")
 
-    return {
-        "extracted_info": extracted_strips,
-        "num_generations": state.get("num_generations", 0) + 1
-    }
+    docs = state.get("documents", [])
+    if not docs:
+        print("❗ 문서가 없습니다.")
+        return {"extracted_info": [], "num_generations": state.get("num_generations", 0) + 1}
+
+    timeout = _extract_timeout(state)
+    if timeout is None:
+        return {"extracted_info": [], "num_generations": state.get("num_generations", 0) + 1}
+
+    targets = docs[:MAX_EXTRACT_DOCS]
+    chain = get_web_extract_chain()
+
+    results = await asyncio.gather(
+        *[
+            asyncio.wait_for(chain.ainvoke(_extraction_input(state, idx, len(targets), doc)), timeout)
+            for idx, doc in enumerate(targets)
+        ],
+        return_exceptions=True
+    )
+    return _collect_extractions(state, targets, results)
 
 
 # ==============================
 # 4⃣ 쿼리 재작성 단계
 # ==============================
-def rewrite_query(state: SearchRagState) -> SearchRagState:
+rewrite_prompt = ChatPromptTemplate.from_messages([
+    ("system", """당신은 인터넷 정보 검색 전문가입니다. 주어진 원래 질문과 추출된 정보를 바탕으로, 더 관련성 있고 충실한 정보를 찾기 위해 검색 쿼리를 개선해주세요.
+
+    다음 사항을 고려하여 검색 쿼리를 개선하세요:
+    1. 원래 질문의 핵심 요소
+    2. 추출된 정보의 관련성 점수
+    3. 추출된 정보의 충실성 점수
+    4. 부족한 정보나 더 자세히 알아야 할 부분
+
+    개선된 검색 쿼리 작성 단계:
+    1. 2-3개의 검색 쿼리를 제안하세요.
+    2. 각 쿼리는 구체적이고 간결해야 합니다(5-10 단어 사이).
+    3. 질문과 관련된 전문 용어를 적절히 활용하세요.
+    4. 각 쿼리 뒤에는 해당 쿼리를 제안한 이유를 간단히 설명하세요.
+
+    출력 형식:
+    1. [개선된 검색 쿼리 1]
+    - 이유: [이 쿼리를 제안한 이유 설명]
+    2. [개선된 검색 쿼리 2]
+    - 이유: [이 쿼리를 제안한 이유 설명]
+    3. [개선된 검색 쿼리 3]
+    - 이유: [이 쿼리를 제안한 이유 설명]
+
+    마지막으로, 제안된 쿼리 중 가장 효과적일 것 같은 쿼리를 선택하고 그 이유를 설명하세요."""),
+    ("human", "질문: {question}\n\n추출된 정보:\n{extracted_info}")
+])
+
+
+def _rewrite_input(state: SearchRagState):
     print("🪄 --- [3단계] 쿼리 재작성 ---")
 
     extracted_info_str = "\n".join([strip.content for strip in state.get("extracted_info", [])])
-
-    rewrite_prompt = ChatPromptTemplate.from_messages([
-        ("system", """당신은 인터넷 정보 검색 전문가입니다. 주어진 원래 질문과 추출된 정보를 바탕으로, 더 관련성 있고 충실한 정보를 찾기 위해 검색 쿼리를 개선해주세요.
-
-        다음 사항을 고려하여 검색 쿼리를 개선하세요:
-        1. 원래 질문의 핵심 요소
-        2. 추출된 정보의 관련성 점수
-        3. 추출된 정보의 충실성 점수
-        4. 부족한 정보나 더 자세히 알아야 할 부분
-
-        개선된 검색 쿼리 작성 단계:
-        1. 2-3개의 검색 쿼리를 제안하세요.
-        2. 각 쿼리는 구체적이고 간결해야 합니다(5-10 단어 사이).
-        3. 질문과 관련된 전문 용어를 적절히 활용하세요.
-        4. 각 쿼리 뒤에는 해당 쿼리를 제안한 이유를 간단히 설명하세요.
-
-        출력 형식:
-        1. [개선된 검색 쿼리 1]
-        - 이유: [이 쿼리를 제안한 이유 설명]
-        2. [개선된 검색 쿼리 2]
-        - 이유: [이 쿼리를 제안한 이유 설명]
-        3. [개선된 검색 쿼리 3]
-        - 이유: [이 쿼리를 제안한 이유 설명]
-
-        마지막으로, 제안된 쿼리 중 가장 효과적일 것 같은 쿼리를 선택하고 그 이유를 설명하세요."""),
-        ("human", "질문: {question}\n\n추출된 정보:\n{extracted_info}")
-    ])
-
-    rewrite_llm = llm.with_structured_output(RefinedQuestion)
-    response = rewrite_llm.invoke(rewrite_prompt.format(
+    return rewrite_prompt.format(
         question=state["question"],
         extracted_info=extracted_info_str
-    ))
+    )
+
+
+def _rewrite_skipped(state: SearchRagState, e: DeadlineExceeded) -> SearchRagState:
+    """시간 초과 시 기존 쿼리로 재검색 (판단 단계에서 곧 종료됨)"""
+    mark_degraded(f"웹 검색 쿼리 재작성 생략: {e}")
+    return {"rewritten_query": state.get("rewritten_query") or state["question"]}
+
 
+def _rewrite_result(response: RefinedQuestion) -> SearchRagState:
+    """선택된 쿼리 + 후보 쿼리 (다중 쿼리 검색이 켜져 있으면 모두 동시에 검색)"""
     print(f"💡 재작성된 쿼리: {response.question_refined}")
-    return {"rewritten_query": response.question_refined}
+    if not MULTI_QUERY_ENABLED:
+        return {"rewritten_query": response.question_refined}
+
+    queries = []
+    for query in [response.question_refined] + list(response.candidate_queries or []):
+        query = (query or "").strip()
+        if query and query not in queries:
+            queries.append(query)
+    queries = queries[:MAX_SEARCH_QUERIES]
+    if len(queries) > 1:
+        print(f"💡 후보 쿼리 {len(queries)}개 동시 검색 예정")
+    return {"rewritten_query": response.question_refined, "search_queries": queries}
+
+
+# 재작성 체인은 한 번만 구성해 모든 요청에서 재사용
+@component("web_rewrite_llm")
+def get_web_rewrite_llm():
+    return get_llm().with_structured_output(RefinedQuestion)
+
+
+def rewrite_query(state: SearchRagState) -> SearchRagState:
+    rewrite_llm = get_web_rewrite_llm()
+    try:
+        response = bounded(rewrite_llm.invoke, _rewrite_input(state), reserve=GATHER_RESERVE)
+    except DeadlineExceeded as e:
+        return _rewrite_skipped(state, e)
+
+    return _rewrite_result(response)
+
+
+async def arewrite_query(state: SearchRagState) -> SearchRagState:
+    """rewrite_query의 비동기 버전"""
+    rewrite_llm = get_web_rewrite_llm()
+    try:
+        response = await abounded(rewrite_llm.ainvoke(_rewrite_input(state)), reserve=GATHER_RESERVE)
+    except DeadlineExceeded as e:
+        return _rewrite_skipped(state, e)
+
+    return _rewrite_result(response)
 
 
 # ==============================
 # 5⃣ 최종 답변 생성 단계
 # ==============================
-def generate_node_answer(state: SearchRagState) -> SearchRagState:
+answer_prompt = ChatPromptTemplate.from_messages([
+    ("system", """당신은 인터넷 정보 검색 전문가입니다. 주어진 질문과 추출된 정보를 바탕으로 답변을 생성해주세요. 
+    답변은 마크다운 형식으로 작성하며, 각 정보의 출처를 명확히 표시해야 합니다. 
+    답변 구조:
+    1. 질문에 대한 직접적인 답변
+    2. 관련 출처 및 링크
+    3. 추가 설명 또는 예시 (필요한 경우)
+    4. 결론 및 요약
+    각 섹션에서 사용된 정보의 출처를 괄호 안에 명시하세요. 예: (출처: 블로그 (www.blog.com/page/001)"""),
+    ("human", "질문: {question}\n\n추출된 정보:\n{extracted_info}")
+])
+
+# 단일 출처 모드: 통합 에이전트의 최종 답변과 같은 가이드라인으로 바로 최종 답변 작성
+final_answer_prompt = ChatPromptTemplate.from_messages([
+    ("system", FINAL_ANSWER_GUIDELINES),
+    ("human", "질문: {question}\n\n추출된 정보:\n{extracted_info}")
+])
+
+
+def strip_facts(extracted_info: List[InformationStrip]) -> List[Dict]:
+    """추출된 정보 조각을 사실 목록으로 변환 (context_packer 형식)"""
+    return [
+        {"content": strip.content, "source": strip.source, "relevance": strip.relevance_score, "faithfulness": strip.faithfulness_score}
+        for strip in extracted_info or []
+    ]
+
+
+def _packed_info(state: SearchRagState) -> str:
+    """추출된 정보를 중복 제거 / 점수순 정렬 후 토큰 예산까지만 포함"""
+    return pack_facts(strip_facts(state.get("extracted_info")), budget=CONTEXT_BUDGET_SUB_AGENT, name="web_answer").text
+
+
+def _answer_input(state: SearchRagState):
     print("🧠 --- [4단계] 답변 생성 ---")
 
-    extracted_info_str = "\n".join([
-        f"- {strip.content} (출처: {strip.source}, 관련성: {strip.relevance_score:.2f}, 충실성: {strip.faithfulness_score:.2f})"
-        for strip in state.get("extracted_info", [])
-    ])
-
-    answer_prompt = ChatPromptTemplate.from_messages([
-        ("system", """당신은 인터넷 정보 검색 전문가입니다. 주어진 질문과 추출된 정보를 바탕으로 답변을 생성해주세요. 
-        답변은 마크다운 형식으로 작성하며, 각 정보의 출처를 명확히 표시해야 합니다. 
-        답변 구조:
-        1. 질문에 대한 직접적인 답변
-        2. 관련 출처 및 링크
-        3. 추가 설명 또는 예시 (필요한 경우)
-        4. 결론 및 요약
-        각 섹션에서 사용된 정보의 출처를 괄호 안에 명시하세요. 예: (출처: 블로그 (www.blog.com/page/001)"""),
-        ("human", "질문: {question}\n\n추출된 정보:\n{extracted_info}")
-    ])
-
-    node_answer = llm.invoke(answer_prompt.format(
+    extracted_info_str = _packed_info(state)
+    prompt = final_answer_prompt if state.get("final_style") else answer_prompt
+    return prompt.format(
         question=state["question"],
         extracted_info=extracted_info_str
-    ))
+    )
+
+
+def _answer_llm(state: SearchRagState):
+    """최종 답변 형식이면 스트리밍 API가 토큰을 전달하도록 태그를 붙임"""
+    return get_llm().with_config(tags=[FINAL_ANSWER_TAG]) if state.get("final_style") else get_llm()
+
+
+def _best_effort_answer(state: SearchRagState, e: DeadlineExceeded) -> SearchRagState:
+    """시간 초과 시 추출된 정보를 그대로 답변으로 사용 (최종 답변 단계에서 종합됨)"""
+    mark_degraded(f"웹 검색 답변 생성 생략 (추출 정보 사용): {e}")
+    extracted_info_str = _packed_info(state)
+    return {"node_answer": extracted_info_str}
+
+
+def generate_node_answer(state: SearchRagState) -> SearchRagState:
+    try:
+        node_answer = bounded(_answer_llm(state).invoke, _answer_input(state), reserve=ANSWER_RESERVE)
+    except DeadlineExceeded as e:
+        return _best_effort_answer(state, e)
+
+    print(" 생성된 답변 미리보기:\n", node_answer.content[:300], "...")
+    return {"node_answer": node_answer.content}
+
+
+async def agenerate_node_answer(state: SearchRagState) -> SearchRagState:
+    """generate_node_answer의 비동기 버전"""
+    try:
+        node_answer = await abounded(_answer_llm(state).ainvoke(_answer_input(state)), reserve=ANSWER_RESERVE)
+    except DeadlineExceeded as e:
+        return _best_effort_answer(state, e)
 
     print(" 생성된 답변 미리보기:\n", node_answer.content[:300], "...")
     return {"node_answer": node_answer.content}
@@ -202,40 +436,76 @@ def generate_node_answer(state: SearchRagState) -> SearchRagState:
 # 6⃣ 반복 판단 단계
 # ==============================
 def should_continue(state: SearchRagState) -> Literal["계속", "종료"]:
+    if len(state.get("extracted_info", [])) >= 1:
+        print(" 충분한 정보 확보 → 종료")
+        return "종료"
+    if len(state.get("search_queries") or []) > 1:
+        # 재작성 1회 후 후보 쿼리를 모두 검색했으므로 다시 재작성해도 얻을 것이 적음
+        print("🔁 다중 쿼리 검색 완료 → 종료")
+        return "종료"
+    # 첫 검색(원래 질문)이 부족하면 재작성 1회는 허용 (다중 쿼리 검색이 켜져 있으면 이 한 번이 넓은 검색)
     if state["num_generations"] >= 2:
         print("🔁 반복 횟수 초과 → 종료")
         return "종료"
-    if len(state.get("extracted_info", [])) >= 1:
-        print(" 충분한 정보 확보 → 종료")
+    if not has_budget(MIN_REWRITE_BUDGET):
+        mark_degraded("남은 시간 부족 → 웹 검색 쿼리 재작성 루프 생략")
         return "종료"
     print("🔄 정보 부족 → 쿼리 재작성 후 재검색")
     return "계속"
 
 
 # ==============================
-# 7⃣ LangGraph 구성
+# 7⃣ LangGraph 구성 (최초 사용 시 한 번만 컴파일)
 # ==============================
-workflow = StateGraph(SearchRagState)
-
-workflow.add_node("retrieve", retrieve_documents)
-workflow.add_node("extract_and_evaluate", extract_and_evaluate_information)
-workflow.add_node("rewrite_query", rewrite_query)
-workflow.add_node("generate_answer", generate_node_answer)
-
-workflow.add_edge(START, "retrieve")
-workflow.add_edge("retrieve", "extract_and_evaluate")
-
-workflow.add_conditional_edges(
-    "extract_and_evaluate",
-    should_continue,
-    {"계속": "rewrite_query", "종료": "generate_answer"}
-)
-
-workflow.add_edge("rewrite_query", "retrieve")
-workflow.add_edge("generate_answer", END)
-
-# 컴파일 및 시각화
-search_web_agent = workflow.compile()
-if display is not None and Image is not None:
-    display(Image(search_web_agent.get_graph().draw_mermaid_png()))
-print("\n [완료] 웹 검색 기반 RAG 에이전트 구성 완료")
+def build_web_graph(evidence_only: bool = False) -> StateGraph:
+    """evidence_only=True이면 답변을 생성하지 않고 추출 단계에서 종료 (extracted_info만 반환)"""
+    workflow = StateGraph(SearchRagState)
+
+    # 각 노드는 invoke/ainvoke 모두 지원
+    workflow.add_node("retrieve", RunnableLambda(retrieve_documents, afunc=aretrieve_documents))
+    workflow.add_node("extract_and_evaluate", RunnableLambda(extract_and_evaluate_information, afunc=aextract_and_evaluate_information))
+    workflow.add_node("rewrite_query", RunnableLambda(rewrite_query, afunc=arewrite_query))
+    if not evidence_only:
+        workflow.add_node("generate_answer", RunnableLambda(generate_node_answer, afunc=agenerate_node_answer))
+
+    workflow.add_edge(START, "retrieve")
+    workflow.add_edge("retrieve", "extract_and_evaluate")
+
+    workflow.add_conditional_edges(
+        "extract_and_evaluate",
+        should_continue,
+        {"계속": "rewrite_query", "종료": END if evidence_only else "generate_answer"}
+    )
+
+    workflow.add_edge("rewrite_query", "retrieve")
+    if not evidence_only:
+        workflow.add_edge("generate_answer", END)
+    return workflow
+
+
+@component("search_web_agent")
+def get_search_web_agent():
+    search_web_agent = build_web_graph().compile()
+    print("\n [완료] 웹 검색 기반 RAG 에이전트 구성 완료")
+    return search_web_agent
+
+
+@component("search_web_evidence_agent")
+def get_search_web_evidence_agent():
+    """답변 생성 없이 근거(extracted_info)만 반환하는 웹 검색 에이전트"""
+    search_web_evidence_agent = build_web_graph(evidence_only=True).compile()
+    print("\n [완료] 웹 검색 근거 수집 에이전트 구성 완료")
+    return search_web_evidence_agent
+
+
+# 시각화 (Jupyter 환경에서 직접 호출)
+def show_web_graph():
+    if display is not None and Image is not None:
+        display(Image(get_search_web_agent().get_graph().draw_mermaid_png()))
+
+
+# 이전 버전 호환: from step6_web_agent import search_web_agent 는 접근 시점에 컴파일
+def __getattr__(name):
+    if name == "search_web_agent":
+        return get_search_web_agent()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -5,6 +5,7 @@ from pydantic import BaseModel, Field
 from typing_extensions import TypedDict
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
+from langchain_core.runnables import RunnableLambda
 from langgraph.graph import StateGraph, START, END
 try:
     from IPython.display import Image, display
@@ -13,9 +14,15 @@ except ImportError:
     Image = None
     display = None
 from typing import Literal
-from step4_llm import llm
-from step5_guideline_agent import guideline_agent
-from step6_web_agent import search_web_agent
+import os
+from step4_llm import get_llm
+from step5_guideline_agent import get_guideline_agent, get_guideline_evidence_agent, related_facts
+from step6_web_agent import get_search_web_agent, get_search_web_evidence_agent, strip_facts
+from components import component
+from local_router import log_routing_decision
+from deadline import bounded, abounded, mark_degraded, DeadlineExceeded
+from answer_style import FINAL_ANSWER_GUIDELINES, FINAL_ANSWER_TAG
+from context_packer import pack_facts, CONTEXT_BUDGET_FINAL
 
 # ======================================
 # 통합 에이전트 상태 정의 ( prepare_context 활용)
@@ -25,7 +32,8 @@ class IntegratedAgentState(TypedDict):
     student_profile: Dict[str, str]           #  학생 프로필
     recent_dialogues: List[Dict[str, str]]    #  최근 대화 내역
     context: str                              #  prepare_context로 생성
-    answers: Annotated[List[str], add]
+    answers: Annotated[List[str], add]        #  서브 에이전트 답변 (answer 모드) / 검색 실패 안내
+    evidence: Annotated[List[Dict], add]      #  서브 에이전트 근거 (evidence 모드): source_type, content, source, relevance, faithfulness
     final_answer: str
     datasources: List[str]
 
@@ -44,9 +52,6 @@ class ToolSelectors(BaseModel):
         description="Select one or more tools, based on the user's question.",
     )
 
-# 구조화된 출력을 위한 LLM 설정
-structured_llm_tool_selector = llm.with_structured_output(ToolSelectors)
-
 # 라우팅을 위한 프롬프트 템플릿
 system = """당신은 대학 편입 상담 전문 AI 어시스턴트입니다. 
 다음 가이드라인에 따라 사용자 질문을 적절한 도구로 라우팅하세요:
@@ -62,40 +67,110 @@ route_prompt = ChatPromptTemplate.from_messages([
     ("human", "{question}"),
 ])
 
-# 질문 라우터 정의
-question_tool_router = route_prompt | structured_llm_tool_selector
+# 질문 라우터 정의 (구조화된 출력을 위한 LLM 설정 포함, 최초 사용 시 생성)
+@component("question_tool_router")
+def get_question_tool_router():
+    structured_llm_tool_selector = get_llm().with_structured_output(ToolSelectors)
+    return route_prompt | structured_llm_tool_selector
+
+
+# ======================================
+# 통합 라우팅 결정 (복잡도 + 데이터 소스를 한 번의 호출로)
+# - api.get_answer가 복잡도 판별과 도구 선택을 따로 호출하지 않도록 함
+# - 결정된 datasources를 그래프 입력으로 넘기면 analyze_question 노드를 건너뜀
+# ======================================
+class RouteDecision(BaseModel):
+    """Decides question complexity and, for complex questions, the tools to search."""
+    complexity: Literal["simple", "complex"] = Field(
+        description="simple: general study advice, complex: needs university/schedule/admission information.",
+    )
+    tools: List[ToolSelector] = Field(
+        default_factory=list,
+        description="Select one or more tools when complexity is complex.",
+    )
+    reason: str = Field(default="", description="Short reason for the decision.")
+
+
+unified_route_system = """당신은 대학 편입 상담 질문을 라우팅하는 분류기입니다.
+
+1. complexity를 결정하세요:
+   - simple: 일반적인 학습 방법, 공부 조언, 학습 전략에 대한 질문 (특정 대학명, 연도, 일정이 없음)
+     예: "수학 공부는 어떻게 해야 할까요?", "오답노트 정리법", "영어 단어 암기법"
+   - complex: 특정 대학명, 연도/일정, 전형/모집요강/시험 과목 등 검색이나 데이터베이스 조회가 필요한 질문
+
+2. complexity가 complex이면 tools를 선택하세요:
+   - 특정 대학의 편입 모집요강, 시험 과목, 전형 방법 등 내부 가이드라인DB에 있을만한 질문은 search_guideline
+   - 최신 정보, 입시 일정, 합격자 발표, 또는 가이드라인DB에 없을 것 같은 정보는 search_web
+   - 질문이 애매하거나 두 가지 모두 필요한 경우 두 도구를 모두 선택
+
+판단 근거를 reason 필드에 간단히 적어주세요."""
+
+unified_route_prompt = ChatPromptTemplate.from_messages([
+    ("system", unified_route_system),
+    ("human", "{question}"),
+])
+
+
+@component("route_decider")
+def get_route_decider():
+    return unified_route_prompt | get_llm().with_structured_output(RouteDecision)
+
+
+def _route_query(question: str, context: str = "") -> Dict[str, str]:
+    return {"question": f"{context}\n\n질문: {question}" if context else question}
 
-print(" 질문 라우터 설정 완료")
+
+def decide_route(question: str, context: str = "") -> RouteDecision:
+    """복잡도와 데이터 소스를 한 번의 LLM 호출로 결정"""
+    return get_route_decider().invoke(_route_query(question, context))
+
+
+async def adecide_route(question: str, context: str = "") -> RouteDecision:
+    """decide_route의 비동기 버전"""
+    return await get_route_decider().ainvoke(_route_query(question, context))
 
 
 # ======================================
 # 컨텍스트 준비 노드 ( 원래 prepare_context 함수 재사용)
 # ======================================
-def prepare_context_node(state: IntegratedAgentState) -> IntegratedAgentState:
-    """
-    학생 프로필과 최근 대화 내역을 종합하여 context 생성
-    (Cell 6의 원래 prepare_context 로직 기반)
-    """
-    print("\n --- 컨텍스트 준비 중 ---")
-    
+def build_context(
+    question: str,
+    student_profile: Dict[str, str] = None,
+    recent_dialogues: List[Dict[str, str]] = None
+) -> str:
+    """학생 프로필 + 최근 대화 내역 + 질문을 하나의 컨텍스트 문자열로 결합"""
     # 학생 프로필 불러오기
-    profile = state.get("student_profile", {})
+    profile = student_profile or {}
     target_uni = profile.get("target_university", "미지정")
     # 'track' 또는 'major_category' 모두 지원
     track = profile.get("track", profile.get("major_category", "계열 미지정"))
     
     # 최근 대화 내역 가져오기 (학생과 선생님 5개 정도)
-    dialogues = state.get("recent_dialogues", [])
+    dialogues = recent_dialogues or []
     dialogue_summary = " ".join(
         [f"{d['role']}: {d['message']}" for d in dialogues[-5:]]
     )
     
     # 질문과 맥락 결합
-    context = (
+    return (
         f"[학생 프로필] 목표 대학: {target_uni}, 계열: {track}\n"
         f"[최근 대화 요약] {dialogue_summary}\n"
-        f"[학생 질문] {state['question']}"
+        f"[학생 질문] {question}"
     )
+
+
+def prepare_context_node(state: IntegratedAgentState) -> IntegratedAgentState:
+    """
+    학생 프로필과 최근 대화 내역을 종합하여 context 생성
+    (Cell 6의 원래 prepare_context 로직 기반)
+    """
+    print("\n --- 컨텍스트 준비 중 ---")
+    
+    profile = state.get("student_profile", {})
+    target_uni = profile.get("target_university", "미지정")
+    track = profile.get("track", profile.get("major_category", "계열 미지정"))
+    dialogues = state.get("recent_dialogues", [])
+    context = build_context(state["question"], profile, dialogues)
     
     print(f" 컨텍스트 생성 완료")
     print(f"   - 목표 대학: {target_uni}")
@@ -108,21 +183,57 @@ def prepare_context_node(state: IntegratedAgentState) -> IntegratedAgentState:
 # ======================================
 # 질문 라우팅 노드 정의
 # ======================================
-def analyze_question_tool_search(state: IntegratedAgentState):
-    """사용자 질문을 분석하여 적절한 도구를 선택"""
+def _enriched_question(state: IntegratedAgentState) -> str:
+    """컨텍스트가 있으면 질문 앞에 붙여 반환"""
     question = state["question"]
     context = state.get("context", "")
-    
-    print(f"\n 질문 분석 중: {question}")
-    
-    # 컨텍스트 포함하여 분석 (더 정확한 라우팅)
-    query = f"{context}\n\n질문: {question}" if context else question
-    result = question_tool_router.invoke({"question": query})
+    return f"{context}\n\n질문: {question}" if context else question
+
+
+def _route_result(state: IntegratedAgentState, result) -> IntegratedAgentState:
     datasources = [tool.tool for tool in result.tools]
     print(f" 선택된 도구: {datasources}")
+    # 도구 선택만 기록 (force_mode로 들어온 질문도 있으므로 복잡도는 남기지 않음)
+    log_routing_decision(state["question"], None, datasources, source="question_tool_router")
     return {"datasources": datasources}
 
 
+def _route_skipped(e: DeadlineExceeded) -> IntegratedAgentState:
+    """시간 초과 시 가장 빠른 GuidelineDB만 검색"""
+    mark_degraded(f"질문 분석 생략 (GuidelineDB만 검색): {e}")
+    return {"datasources": ["search_guideline"]}
+
+
+def analyze_question_tool_search(state: IntegratedAgentState):
+    """사용자 질문을 분석하여 적절한 도구를 선택"""
+    print(f"\n 질문 분석 중: {state['question']}")
+    
+    # 컨텍스트 포함하여 분석 (더 정확한 라우팅)
+    try:
+        result = bounded(get_question_tool_router().invoke, {"question": _enriched_question(state)})
+    except DeadlineExceeded as e:
+        return _route_skipped(e)
+    return _route_result(state, result)
+
+
+async def aanalyze_question_tool_search(state: IntegratedAgentState):
+    """analyze_question_tool_search의 비동기 버전"""
+    print(f"\n 질문 분석 중: {state['question']}")
+    try:
+        result = await abounded(get_question_tool_router().ainvoke({"question": _enriched_question(state)}))
+    except DeadlineExceeded as e:
+        return _route_skipped(e)
+    return _route_result(state, result)
+
+
+def route_after_context(state: IntegratedAgentState) -> List[str]:
+    """라우팅이 미리 결정되어 입력되었으면 analyze_question을 건너뛰고 바로 검색 노드로"""
+    if state.get("datasources"):
+        print(f" 사전 결정된 도구 사용 (질문 분석 생략): {state['datasources']}")
+        return route_datasources_tool_search(state)
+    return ["analyze_question"]
+
+
 def route_datasources_tool_search(state: IntegratedAgentState) -> List[str]:
     """선택된 데이터 소스에 따라 라우팅"""
     datasources = set(state['datasources'])
@@ -137,32 +248,116 @@ def route_datasources_tool_search(state: IntegratedAgentState) -> List[str]:
 # ======================================
 # 서브 에이전트 노드 정의 ( 컨텍스트 활용)
 # ======================================
+# 서브 에이전트 실행 방식
+# - evidence (기본): 서브 에이전트는 검색/추출/평가까지만 실행하고 근거(evidence)만 반환
+#                   → 최종 답변 단계에서 근거를 바탕으로 한 번만 답변 생성
+# - answer: 서브 에이전트가 각자 답변을 생성한 뒤 최종 답변 단계에서 다시 종합 (이전 방식)
+SUB_AGENT_MODE = os.getenv("SUB_AGENT_MODE", "evidence")
+
+SUB_AGENT_CONFIG = {"recursion_limit": 10}  #  재귀 제한
+
+# 단일 출처 모드 (answer 모드에서 검색 도구가 하나만 선택된 경우)
+# - 서브 에이전트가 최종 답변 가이드라인(answer_style.py)으로 바로 답변하고 최종 종합(generate_answer)은 건너뜀
+# - evidence 모드는 이미 최종 답변 단계에서 한 번만 생성하므로 해당 없음
+SINGLE_SOURCE_BYPASS = os.getenv("SINGLE_SOURCE_BYPASS", "1") == "1"
+
+# 최종 답변 프롬프트에 근거를 나열하는 순서 (병렬 실행 완료 순서와 무관하게 고정)
+EVIDENCE_ORDER = ["GuidelineDB", "웹 검색"]
+
+
+def _evidence_mode() -> bool:
+    return SUB_AGENT_MODE == "evidence"
+
+
+def _single_source(state: IntegratedAgentState) -> bool:
+    """이 검색 노드의 답변이 곧 최종 답변인지 (answer 모드 + 선택된 검색 도구가 하나)"""
+    if not SINGLE_SOURCE_BYPASS or _evidence_mode() or not state.get("datasources"):
+        return False
+    return len(route_datasources_tool_search(state)) == 1
+
+
+def _sub_agent_input(state: IntegratedAgentState, single_source: bool) -> Dict:
+    return {"question": _enriched_question(state), "final_style": single_source}
+
+
+def _guideline_evidence(result: Dict) -> List[Dict]:
+    """Guideline Agent 결과(related_info)를 사실 단위 근거 목록으로 변환"""
+    return [
+        {**fact, "source_type": "GuidelineDB", "source": f"GuidelineDB ({fact.get('source') or '출처 미기재'})"}
+        for fact in related_facts(result.get("related_info") or [])
+    ]
+
+
+def _web_evidence(result: Dict) -> List[Dict]:
+    """웹 검색 에이전트 결과(extracted_info)를 근거 목록으로 변환"""
+    return [{**fact, "source_type": "웹 검색"} for fact in strip_facts(result.get("extracted_info"))]
+
+
+def _sub_agent_answer(answer: Dict, label: str, empty_message: str) -> IntegratedAgentState:
+    """서브 에이전트 결과에서 답변을 안전하게 추출하고 출처 라벨을 붙임"""
+    node_answer = answer.get("node_answer", "")
+    if not node_answer:
+        node_answer = empty_message
+    else:
+        # 출처 정보 추가
+        node_answer = f"[{label}]\n{node_answer}"
+    return {"answers": [node_answer]}
+
+
+def _sub_agent_result(
+    result: Dict,
+    evidence: List[Dict],
+    label: str,
+    empty_message: str,
+    single_source: bool = False
+) -> IntegratedAgentState:
+    """evidence 모드면 근거 목록, answer 모드면 서브 에이전트 답변을 상태에 추가"""
+    if single_source and result.get("node_answer"):
+        # 최종 답변 형식으로 작성된 답변 → 최종 종합 생략
+        print(" 단일 출처 → 서브 에이전트 답변을 최종 답변으로 사용 (최종 종합 생략)")
+        return {"final_answer": result["node_answer"]}
+    if not _evidence_mode():
+        return _sub_agent_answer(result, label, empty_message)
+    if not evidence:
+        # 근거가 없다는 사실도 최종 답변 단계에 전달
+        return {"answers": [empty_message]}
+    print(f" 근거 {len(evidence)}개 수집")
+    return {"evidence": evidence}
+
+
+def _guideline_agent():
+    return get_guideline_evidence_agent() if _evidence_mode() else get_guideline_agent()
+
+
+def _web_agent():
+    return get_search_web_evidence_agent() if _evidence_mode() else get_search_web_agent()
+
+
 def guideline_rag_node(state: IntegratedAgentState) -> IntegratedAgentState:
     """GuidelineDB 검색 에이전트 실행 (컨텍스트 포함)"""
     print("\n---  GuidelineDB 검색 에이전트 시작 ---")
-    question = state["question"]
-    context = state.get("context", "")
     
     try:
         # 컨텍스트와 함께 질문 전달
-        enriched_question = f"{context}\n\n질문: {question}" if context else question
-        
-        # 타임아웃 설정 및 안전한 호출
-        answer = guideline_agent.invoke(
-            {"question": enriched_question},
-            config={"recursion_limit": 10}  #  재귀 제한
-        )
+        single_source = _single_source(state)
+        result = _guideline_agent().invoke(_sub_agent_input(state, single_source), config=SUB_AGENT_CONFIG)
         print(" GuidelineDB 검색 완료")
+        return _sub_agent_result(result, _guideline_evidence(result), "GuidelineDB 검색 결과", "GuidelineDB에서 관련 정보를 찾을 수 없습니다.", single_source)
         
-        # 안전하게 답변 추출
-        node_answer = answer.get("node_answer", "")
-        if not node_answer:
-            node_answer = "GuidelineDB에서 관련 정보를 찾을 수 없습니다."
-        else:
-            # 출처 정보 추가
-            node_answer = f"[GuidelineDB 검색 결과]\n{node_answer}"
-            
-        return {"answers": [node_answer]}
+    except Exception as e:
+        print(f" GuidelineDB 검색 오류: {str(e)[:100]}")
+        return {"answers": ["GuidelineDB 검색 중 오류가 발생했습니다."]}
+
+
+async def aguideline_rag_node(state: IntegratedAgentState) -> IntegratedAgentState:
+    """guideline_rag_node의 비동기 버전"""
+    print("\n---  GuidelineDB 검색 에이전트 시작 ---")
+    
+    try:
+        single_source = _single_source(state)
+        result = await _guideline_agent().ainvoke(_sub_agent_input(state, single_source), config=SUB_AGENT_CONFIG)
+        print(" GuidelineDB 검색 완료")
+        return _sub_agent_result(result, _guideline_evidence(result), "GuidelineDB 검색 결과", "GuidelineDB에서 관련 정보를 찾을 수 없습니다.", single_source)
         
     except Exception as e:
         print(f" GuidelineDB 검색 오류: {str(e)[:100]}")
@@ -172,169 +367,223 @@ def guideline_rag_node(state: IntegratedAgentState) -> IntegratedAgentState:
 def web_rag_node(state: IntegratedAgentState) -> IntegratedAgentState:
     """웹 검색 에이전트 실행 (컨텍스트 포함)"""
     print("\n---  웹 검색 에이전트 시작 ---")
-    question = state["question"]
-    context = state.get("context", "")
     
     try:
         # 컨텍스트와 함께 질문 전달
-        enriched_question = f"{context}\n\n질문: {question}" if context else question
-        
-        # 타임아웃 설정 및 안전한 호출
-        answer = search_web_agent.invoke(
-            {"question": enriched_question},
-            config={"recursion_limit": 10}  #  재귀 제한
-        )
+        single_source = _single_source(state)
+        result = _web_agent().invoke(_sub_agent_input(state, single_source), config=SUB_AGENT_CONFIG)
         print(" 웹 검색 완료")
+        return _sub_agent_result(result, _web_evidence(result), "웹 검색 결과", "웹 검색에서 관련 정보를 찾을 수 없습니다.", single_source)
         
-        # 안전하게 답변 추출
-        node_answer = answer.get("node_answer", "")
-        if not node_answer:
-            node_answer = "웹 검색에서 관련 정보를 찾을 수 없습니다."
-        else:
-            # 출처 정보 추가
-            node_answer = f"[웹 검색 결과]\n{node_answer}"
-            
-        return {"answers": [node_answer]}
+    except Exception as e:
+        print(f" 웹 검색 오류: {str(e)[:100]}")
+        return {"answers": ["웹 검색 중 오류가 발생했습니다."]}
+
+
+async def aweb_rag_node(state: IntegratedAgentState) -> IntegratedAgentState:
+    """web_rag_node의 비동기 버전"""
+    print("\n---  웹 검색 에이전트 시작 ---")
+    
+    try:
+        single_source = _single_source(state)
+        result = await _web_agent().ainvoke(_sub_agent_input(state, single_source), config=SUB_AGENT_CONFIG)
+        print(" 웹 검색 완료")
+        return _sub_agent_result(result, _web_evidence(result), "웹 검색 결과", "웹 검색에서 관련 정보를 찾을 수 없습니다.", single_source)
         
     except Exception as e:
         print(f" 웹 검색 오류: {str(e)[:100]}")
         return {"answers": ["웹 검색 중 오류가 발생했습니다."]}
 
 
+def route_after_search(state: IntegratedAgentState) -> str:
+    """단일 출처 모드로 최종 답변이 이미 작성되었으면 최종 종합 생략"""
+    return END if state.get("final_answer") else "generate_answer"
+
+
 # ======================================
 # 최종 답변 생성 노드
 # ======================================
 # RAG 프롬프트 정의
 rag_prompt = ChatPromptTemplate.from_messages([
-    ("system", """당신은 대학 편입 전문 상담가입니다. 제공된 정보를 바탕으로 학생의 질문에 답변하세요.
-
-다음 가이드라인을 따르세요:
-1. 제공된 문서의 정보만 사용하세요.
-2. 문서에 관련 정보가 부족하면 "제공된 정보로는 충분한 답변을 할 수 없습니다"라고 말하세요.
-3. 각 문장마다 정보의 출처를 명시하세요. 형식:
-   - GuidelineDB: "(출처 GuidelineDB (출처명))"
-   - 웹 검색: "(출처 제목 (URL))"
-4. 추측하거나 문서에 없는 정보를 추가하지 마세요.
-5. 친절한 선생님의 말투로 학생들에게 직접 과외하듯 답변하되 필요없는 서론은 제외하고 본론만 간결하고 명확하게 작성하세요.
-6. 불필요한 정보는 생략하세요.
-7. 여러 출처에서 같은 정보를 제공하면 모든 관련 출처를 인용하세요.
-8. 여러 출처의 정보를 결합할 때는 각 출처를 인용하면서 일관되게 작성하세요.
-9. 어떤 정보를 통해서 답변을 만들거나 AI 툴을 활용하는 것을 알아차리지 못하도록 온전히 사람이 직접 생각해서 답변한 것처럼 해주세요. (제공된 정보에 의하면~ 와 같은 말 사용 금지)
-10. 특수문자를 사용하지 말고 사람이 말하듯 한 문단으로 작성해주세요.
-
-출처 인용 예시:
-"중앙대학교 이과 편입은 수학 시험만 응시합니다 (GuidelineDB (cau2025-page7)). 시험 일정은 2025년 1월 18일입니다 (중앙대 편입 모집요강, https://example.com)."
-"""),
+    ("system", FINAL_ANSWER_GUIDELINES),
     ("human", "다음 문서를 사용하여 질문에 답변하세요:\n\n[문서]\n{documents}\n\n[질문]\n{question}"),
 ])
 
 
-def answer_final(state: IntegratedAgentState) -> IntegratedAgentState:
-    """수집된 정보를 종합하여 최종 답변 생성 (컨텍스트 활용)"""
+def _rag_chain():
+    return rag_prompt | get_llm().with_config(tags=[FINAL_ANSWER_TAG]) | StrOutputParser()
+
+
+def _documents(state: IntegratedAgentState) -> List[str]:
+    """
+    최종 답변에 사용할 문서: 근거 블록 (evidence 모드) + 서브 에이전트 답변/검색 실패 안내
+    GuidelineDB/웹 검색 간 중복 제거 후 점수순으로 CONTEXT_BUDGET_FINAL 토큰까지만 포함
+    """
+    answers = state.get("answers", [])
+    if not isinstance(answers, list):
+        answers = [answers]
+    facts = list(state.get("evidence") or []) + [
+        {"content": answer, "truncatable": True} for answer in answers if answer
+    ]
+    packed = pack_facts(facts, budget=CONTEXT_BUDGET_FINAL, name="answer_final")
+
+    # 포함된 근거는 출처 종류별 블록으로 (출처 표기는 rag_prompt의 인용 형식에 맞춤)
+    grouped: Dict[str, List[str]] = {}
+    others: List[str] = []
+    for fact, line in zip(packed.facts, packed.lines):
+        if fact.get("source_type"):
+            grouped.setdefault(fact["source_type"], []).append(line)
+        else:
+            others.append(line)
+    order = EVIDENCE_ORDER + [source_type for source_type in grouped if source_type not in EVIDENCE_ORDER]
+    blocks = [f"[{source_type} 결과]\n" + "\n".join(grouped[source_type]) for source_type in order if source_type in grouped]
+    return blocks + others
+
+
+def _rag_input(state: IntegratedAgentState) -> Dict[str, str]:
     print("\n---  최종 답변 생성 중 ---")
-    question = state["question"]
-    context = state.get("context", "")
-    documents = state.get("answers", [])
-    
-    if not isinstance(documents, list):
-        documents = [documents]
 
-    # 문서 내용을 문자열로 결합
-    documents_text = "\n\n".join(documents)
-    
-    # 컨텍스트와 함께 최종 질문 생성
-    enriched_question = f"{context}\n\n질문: {question}" if context else question
+    # 문서 내용을 문자열로 결합, 컨텍스트와 함께 최종 질문 생성
+    return {
+        "documents": "\n\n".join(_documents(state)),
+        "question": _enriched_question(state)
+    }
+
+
+def _best_effort_final(state: IntegratedAgentState, e: DeadlineExceeded) -> IntegratedAgentState:
+    """시간 초과 시 수집된 근거 / 서브 에이전트 답변을 그대로 이어 붙여 반환"""
+    mark_degraded(f"최종 답변 종합 생략 (수집된 정보 사용): {e}")
+    generation = "\n\n".join(_documents(state)) or "시간 내에 답변을 생성하지 못했습니다. 잠시 후 다시 질문해주세요."
+    return {"final_answer": generation, "question": state["question"]}
+
 
+def answer_final(state: IntegratedAgentState) -> IntegratedAgentState:
+    """수집된 정보를 종합하여 최종 답변 생성 (컨텍스트 활용)"""
     # RAG generation
-    rag_chain = rag_prompt | llm | StrOutputParser()
-    generation = rag_chain.invoke({
-        "documents": documents_text, 
-        "question": enriched_question
-    })
+    rag_chain = _rag_chain()
+    try:
+        generation = bounded(rag_chain.invoke, _rag_input(state))
+    except DeadlineExceeded as e:
+        return _best_effort_final(state, e)
     print(" 최종 답변 생성 완료")
-    return {"final_answer": generation, "question": question}
+    return {"final_answer": generation, "question": state["question"]}
 
 
-print(" 노드 정의 완료")
+async def aanswer_final(state: IntegratedAgentState) -> IntegratedAgentState:
+    """answer_final의 비동기 버전"""
+    rag_chain = _rag_chain()
+    try:
+        generation = await abounded(rag_chain.ainvoke(_rag_input(state)))
+    except DeadlineExceeded as e:
+        return _best_effort_final(state, e)
+    print(" 최종 답변 생성 완료")
+    return {"final_answer": generation, "question": state["question"]}
+
 
 
 # ======================================
 # 통합 그래프 구성 ( prepare_context 포함)
 # ======================================
-# LangGraph의 StateGraph, START, END 노드 임포트
+def build_integrated_graph() -> StateGraph:
+    # ======================================
+    # 노드 정의를 딕셔너리로 관리
+    # - 노드 이름(key)과 실행 함수(value)를 매핑
+    # - LLM/검색을 호출하는 노드는 동기/비동기 구현을 함께 등록 (invoke/ainvoke 모두 지원)
+    # ======================================
+    nodes = {
+        "prepare_context": prepare_context_node,                                                      # 컨텍스트 준비: 학생 프로필 + 대화 내역 → context 생성
+        "analyze_question": RunnableLambda(analyze_question_tool_search, afunc=aanalyze_question_tool_search),  # 질문 분석: LLM이 질문을 분석하여 적절한 도구 선택 (GuidelineDB / Web)
+        "search_guideline": RunnableLambda(guideline_rag_node, afunc=aguideline_rag_node),           # GuidelineDB 검색: 내부 DB에서 편입 정보 검색
+        "search_web": RunnableLambda(web_rag_node, afunc=aweb_rag_node),                              # 웹 검색: Tavily API로 최신 정보 검색
+        "generate_answer": RunnableLambda(answer_final, afunc=aanswer_final),                         # 최종 답변 생성: 수집된 정보를 종합하여 답변 생성
+    }
+
+    # ======================================
+    # 그래프 생성: IntegratedAgentState를 상태로 사용
+    # - 모든 노드가 이 상태 구조를 공유함
+    # ======================================
+    integrated_builder = StateGraph(IntegratedAgentState)
+
+    # ======================================
+    # 노드 추가: 딕셔너리에 정의된 모든 노드를 그래프에 등록
+    # ======================================
+    for node_name, node_func in nodes.items():
+        integrated_builder.add_node(node_name, node_func)  # 각 노드를 그래프에 추가
+
+    # ======================================
+    # 엣지 추가 (병렬 처리 지원)
+    # ======================================
+
+    # 1⃣ START → prepare_context
+    # - 워크플로우 시작: 가장 먼저 컨텍스트를 준비
+    # - 입력: question, student_profile, recent_dialogues
+    # - 출력: context (형식화된 컨텍스트 문자열)
+    integrated_builder.add_edge(START, "prepare_context")
+
+    # 2⃣ prepare_context → analyze_question (또는 바로 검색 노드)
+    # - 컨텍스트 준비 완료 후 질문 분석 단계로 이동
+    # - LLM이 컨텍스트와 질문을 분석하여 어떤 도구를 사용할지 결정
+    # - 입력에 datasources가 이미 있으면 (api의 통합 라우팅 결정) 질문 분석을 건너뜀
+    integrated_builder.add_conditional_edges(
+        "prepare_context",
+        route_after_context,
+        ["analyze_question", "search_guideline", "search_web"]
+    )
 
-# ======================================
-# 노드 정의를 딕셔너리로 관리
-# - 노드 이름(key)과 실행 함수(value)를 매핑
-# ======================================
-nodes = {
-    "prepare_context": prepare_context_node,           # 컨텍스트 준비: 학생 프로필 + 대화 내역 → context 생성
-    "analyze_question": analyze_question_tool_search,  # 질문 분석: LLM이 질문을 분석하여 적절한 도구 선택 (GuidelineDB / Web)
-    "search_guideline": guideline_rag_node,            # GuidelineDB 검색: 내부 DB에서 편입 정보 검색
-    "search_web": web_rag_node,                        # 웹 검색: Tavily API로 최신 정보 검색
-    "generate_answer": answer_final,                   # 최종 답변 생성: 수집된 정보를 종합하여 답변 생성
-}
+    # 3⃣ analyze_question → 조건부 라우팅 (도구 선택)
+    # - route_datasources_tool_search 함수가 반환한 도구로 라우팅
+    # - 반환 가능한 값: ["search_guideline"], ["search_web"], ["search_guideline", "search_web"]
+    # - 두 개가 선택되면 병렬로 실행됨!
+    integrated_builder.add_conditional_edges(
+        "analyze_question",                      # 출발 노드
+        route_datasources_tool_search,           # 라우팅 결정 함수 (어느 노드로 갈지 결정)
+        ["search_guideline", "search_web"]       # 가능한 목적지 노드 리스트
+    )
 
-# ======================================
-# 그래프 생성: IntegratedAgentState를 상태로 사용
-# - 모든 노드가 이 상태 구조를 공유함
-# ======================================
-integrated_builder = StateGraph(IntegratedAgentState)
+    # 4⃣ 검색 노드들을 generate_answer에 연결
+    # - search_guideline과 search_web 모두 generate_answer로 연결
+    # - 병렬 실행 가능: 두 검색이 동시에 진행되고 모두 완료되면 generate_answer 실행
+    # - answers / evidence 필드는 Annotated[List, add]로 정의되어 자동으로 병합됨
+    # - 단일 출처 모드에서 서브 에이전트가 이미 최종 답변을 작성했으면 바로 END
+    for node in ["search_guideline", "search_web"]:
+        integrated_builder.add_conditional_edges(node, route_after_search, ["generate_answer", END])
 
-# ======================================
-# 노드 추가: 딕셔너리에 정의된 모든 노드를 그래프에 등록
-# ======================================
-for node_name, node_func in nodes.items():
-    integrated_builder.add_node(node_name, node_func)  # 각 노드를 그래프에 추가
+    # 5⃣ generate_answer → END
+    # - 최종 답변 생성 후 워크플로우 종료
+    # - 출력: final_answer (학생에게 제공할 최종 답변)
+    integrated_builder.add_edge("generate_answer", END)
+    return integrated_builder
 
-# ======================================
-# 엣지 추가 (병렬 처리 지원)
-# ======================================
-
-# 1⃣ START → prepare_context
-# - 워크플로우 시작: 가장 먼저 컨텍스트를 준비
-# - 입력: question, student_profile, recent_dialogues
-# - 출력: context (형식화된 컨텍스트 문자열)
-integrated_builder.add_edge(START, "prepare_context")
-
-# 2⃣ prepare_context → analyze_question
-# - 컨텍스트 준비 완료 후 질문 분석 단계로 이동
-# - LLM이 컨텍스트와 질문을 분석하여 어떤 도구를 사용할지 결정
-integrated_builder.add_edge("prepare_context", "analyze_question")
-
-# 3⃣ analyze_question → 조건부 라우팅 (도구 선택)
-# - route_datasources_tool_search 함수가 반환한 도구로 라우팅
-# - 반환 가능한 값: ["search_guideline"], ["search_web"], ["search_guideline", "search_web"]
-# - 두 개가 선택되면 병렬로 실행됨!
-integrated_builder.add_conditional_edges(
-    "analyze_question",                      # 출발 노드
-    route_datasources_tool_search,           # 라우팅 결정 함수 (어느 노드로 갈지 결정)
-    ["search_guideline", "search_web"]       # 가능한 목적지 노드 리스트
-)
-
-# 4⃣ 검색 노드들을 generate_answer에 연결
-# - search_guideline과 search_web 모두 generate_answer로 연결
-# - 병렬 실행 가능: 두 검색이 동시에 진행되고 모두 완료되면 generate_answer 실행
-# - answers 필드는 Annotated[List[str], add]로 정의되어 자동으로 병합됨
-for node in ["search_guideline", "search_web"]:
-    integrated_builder.add_edge(node, "generate_answer")
-
-# 5⃣ generate_answer → END
-# - 최종 답변 생성 후 워크플로우 종료
-# - 출력: final_answer (학생에게 제공할 최종 답변)
-integrated_builder.add_edge("generate_answer", END)
 
 # ======================================
-# 그래프 컴파일
+# 그래프 컴파일 (최초 사용 시 한 번만)
 # - StateGraph를 실행 가능한 객체로 변환
-# - 이후 integrated_agent.invoke()로 실행 가능
+# - 이후 get_integrated_agent().invoke()로 실행 가능
 # ======================================
-integrated_agent = integrated_builder.compile()
+@component("integrated_agent")
+def get_integrated_agent():
+    integrated_agent = build_integrated_graph().compile()
+    print("\n [완료] 통합 에이전트 구성 완료 (prepare_context 포함)")
+    return integrated_agent
+
 
 # ======================================
-# 그래프 시각화
+# 그래프 시각화 (Jupyter 환경에서 직접 호출)
 # - Mermaid 다이어그램으로 워크플로우 구조 표시
 # ======================================
-if display is not None and Image is not None:
-    display(Image(integrated_agent.get_graph().draw_mermaid_png()))
-print("\n [완료] 통합 에이전트 구성 완료 (prepare_context 포함)")
+def show_integrated_graph():
+    if display is not None and Image is not None:
+        display(Image(get_integrated_agent().get_graph().draw_mermaid_png()))
+
+
+# 이전 버전 호환: from step7_integrated_agent import integrated_agent 등은 접근 시점에 초기화
+_LAZY_ATTRS = {
+    "integrated_agent": get_integrated_agent,
+    "question_tool_router": get_question_tool_router,
+}
+
+
+def __getattr__(name):
+    if name in _LAZY_ATTRS:
+        return _LAZY_ATTRS[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,94 @@
+"""
+🧪 GuidelineDB 에이전트 LLM 호출 횟수 회귀 벤치마크
+
+질문별로 GuidelineDB 에이전트를 실행하고 LLM 호출 횟수와 반복(재작성) 횟수를 측정합니다.
+정보 추출 점수가 제대로 파싱되지 않으면 모든 문서가 필터링되어
+쿼리 재작성 → 재검색 → 재추출 루프가 최대 횟수까지 돌기 때문에 호출 수가 약 2배가 됩니다.
+
+실행:
+    python test_guideline_llm_calls.py
+    python test_guideline_llm_calls.py --max-avg-calls 4
+
+평균 호출 수가 기준을 넘으면 종료 코드 1을 반환합니다.
+(반복 없이 끝나면 문서 수(k=2)만큼의 추출 + 답변 생성 1회 = 3회)
+"""
+
+import argparse
+import sys
+import time
+from typing import Dict
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from step5_guideline_agent import get_guideline_agent
+
+
+# 측정용 질문 (GuidelineDB에 있을 만한 질문 위주)
+QUESTIONS = [
+    "중앙대학교 이과 편입은 어떤 과목을 준비해야 하나요?",
+    "연세대학교 편입 시험 과목이 궁금해요",
+    "고려대 학사편입 지원 자격은 어떻게 되나요?",
+    "한양대 편입 수학 시험 범위 알려주세요",
+    "성균관대 편입 영어 시험은 어떤 유형인가요?",
+]
+
+
+class LLMCallCounter(BaseCallbackHandler):
+    """그래프 실행 중 발생한 LLM 호출 수를 셉니다."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def on_llm_start(self, serialized, prompts, **kwargs):
+        self.calls += 1
+
+    def on_chat_model_start(self, serialized, messages, **kwargs):
+        self.calls += 1
+
+
+def run_question(question: str) -> Dict:
+    """질문 하나를 실행하고 호출 수 / 반복 수 / 소요 시간을 반환"""
+    counter = LLMCallCounter()
+    start = time.perf_counter()
+    result = get_guideline_agent().invoke(
+        {"question": question},
+        config={"recursion_limit": 10, "callbacks": [counter]}
+    )
+    return {
+        "question": question,
+        "llm_calls": counter.calls,
+        "loops": result.get("num_generations", 0),
+        "related_info": len(result.get("related_info", [])),
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GuidelineDB 에이전트 LLM 호출 횟수 벤치마크")
+    parser.add_argument("--max-avg-calls", type=float, default=4.0,
+                        help="질문당 평균 LLM 호출 수 상한 (기본값: 4)")
+    args = parser.parse_args()
+
+    rows = [run_question(q) for q in QUESTIONS]
+
+    print("\n" + "=" * 80)
+    print("GuidelineDB 에이전트 LLM 호출 횟수")
+    print("=" * 80)
+    for row in rows:
+        print(f"- {row['question'][:30]:<30} | LLM 호출 {row['llm_calls']:>2}회 | "
+              f"반복 {row['loops']}회 | 추출 정보 {row['related_info']}개 | {row['seconds']:.1f}초")
+
+    avg_calls = sum(r["llm_calls"] for r in rows) / len(rows)
+    max_loops = sum(1 for r in rows if r["loops"] >= 2)
+    print("-" * 80)
+    print(f"평균 LLM 호출: {avg_calls:.2f}회 (상한 {args.max_avg_calls})")
+    print(f"최대 반복까지 간 질문: {max_loops}/{len(rows)}")
+
+    if avg_calls > args.max_avg_calls:
+        print("❗ 평균 LLM 호출 수가 상한을 초과했습니다.")
+        sys.exit(1)
+    print("✅ 통과")
+
+
+if __name__ == "__main__":
+    main()
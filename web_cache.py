@@ -0,0 +1,190 @@
+# 웹 검색 결과 캐시 (SQLite 영구 저장 + TTL)
+"""
+Tavily 검색 결과를 (retriever 종류, k, 정규화된 쿼리) 기준으로 저장해 두고,
+같은 쿼리가 TTL 안에 다시 들어오면 API를 호출하지 않고 저장된 결과를 반환합니다.
+모집요강 정보는 며칠 단위로 바뀌므로 몇 시간 캐시해도 안전하고, 지연 시간과 유료 API 호출을 줄일 수 있습니다.
+
+- 만료: 저장 후 WEB_CACHE_TTL초가 지나면 조회되지 않고 정리됨
+- 용량: WEB_CACHE_MAX_ITEMS개를 넘으면 WEB_CACHE_EVICTION 정책으로 삭제
+  - lru (기본): 가장 오래전에 사용된 항목부터
+  - fifo: 가장 오래전에 저장된 항목부터
+- SQLite 파일(WEB_CACHE_PATH)에 저장되어 재시작 후에도 유지
+
+사용법:
+    retriever = CachedWebRetriever(underlying=TavilySearchAPIRetriever(k=10), cache=WebSearchCache(), name="tavily")
+    docs = retriever.invoke("중앙대 편입 일정")        # 두 번째 호출부터는 캐시에서 반환
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+from langchain_core.callbacks import AsyncCallbackManagerForRetrieverRun, CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+from embedding_cache import normalize_text
+
+
+WEB_CACHE_ENABLED = os.getenv("WEB_CACHE_ENABLED", "1") == "1"
+WEB_CACHE_TTL = float(os.getenv("WEB_CACHE_TTL", str(6 * 60 * 60)))   # 기본 6시간
+WEB_CACHE_MAX_ITEMS = int(os.getenv("WEB_CACHE_MAX_ITEMS", "5000"))
+WEB_CACHE_EVICTION = os.getenv("WEB_CACHE_EVICTION", "lru")           # lru | fifo
+
+EVICTION_ORDER = {"lru": "last_used_at", "fifo": "created_at"}
+
+
+class WebSearchCache:
+    """웹 검색 결과 SQLite 캐시 (TTL + 최대 항목 수)"""
+
+    def __init__(
+        self,
+        cache_path: Optional[str] = None,
+        ttl: float = WEB_CACHE_TTL,
+        max_items: int = WEB_CACHE_MAX_ITEMS,
+        eviction: str = WEB_CACHE_EVICTION,
+    ):
+        if eviction not in EVICTION_ORDER:
+            raise ValueError(f"지원하지 않는 캐시 삭제 정책: {eviction} (lru / fifo)")
+        self.cache_path = cache_path or os.getenv("WEB_CACHE_PATH", "./web_search_cache.sqlite")
+        self.ttl = ttl
+        self.max_items = max_items
+        self.eviction = eviction
+
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "expired": 0, "evicted": 0}
+
+        self._conn = sqlite3.connect(self.cache_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS web_results ("
+            " key TEXT PRIMARY KEY, query TEXT NOT NULL, documents TEXT NOT NULL,"
+            " created_at REAL NOT NULL, last_used_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    # --------------------------------------
+    # 캐시 내부 동작
+    # --------------------------------------
+    @staticmethod
+    def key(query: str, k: Optional[int], namespace: str = "") -> str:
+        """(retriever 종류, k, 정규화된 쿼리)의 SHA-256 (대소문자/공백 차이는 같은 쿼리로 취급)"""
+        raw = f"{namespace}\x00{k}\x00{normalize_text(query).lower()}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[List[Document]]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT documents, created_at FROM web_results WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self._stats["misses"] += 1
+                return None
+            documents, created_at = row
+            if self.ttl > 0 and now - created_at > self.ttl:
+                self._conn.execute("DELETE FROM web_results WHERE key = ?", (key,))
+                self._conn.commit()
+                self._stats["expired"] += 1
+                self._stats["misses"] += 1
+                return None
+            self._conn.execute("UPDATE web_results SET last_used_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self._stats["hits"] += 1
+        return [Document(page_content=item["page_content"], metadata=item["metadata"]) for item in json.loads(documents)]
+
+    def put(self, key: str, query: str, docs: List[Document]) -> None:
+        now = time.time()
+        documents = json.dumps(
+            [{"page_content": doc.page_content, "metadata": doc.metadata} for doc in docs],
+            ensure_ascii=False,
+            default=str,
+        )
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO web_results (key, query, documents, created_at, last_used_at) VALUES (?, ?, ?, ?, ?)",
+                (key, query, documents, now, now),
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now: float) -> None:
+        """만료 항목 정리 후 최대 항목 수를 넘는 만큼 삭제 정책 순서대로 삭제 (lock 안에서 호출)"""
+        if self.ttl > 0:
+            cursor = self._conn.execute("DELETE FROM web_results WHERE created_at < ?", (now - self.ttl,))
+            self._stats["expired"] += cursor.rowcount
+        if self.max_items <= 0:
+            return
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM web_results").fetchone()
+        overflow = count - self.max_items
+        if overflow > 0:
+            column = EVICTION_ORDER[self.eviction]
+            self._conn.execute(
+                f"DELETE FROM web_results WHERE key IN (SELECT key FROM web_results ORDER BY {column} LIMIT ?)",
+                (overflow,),
+            )
+            self._stats["evicted"] += overflow
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM web_results")
+            self._conn.commit()
+
+    # --------------------------------------
+    # 통계
+    # --------------------------------------
+    def stats(self) -> Dict[str, float]:
+        """캐시 적중/미스/만료/삭제 카운터"""
+        with self._lock:
+            stats = dict(self._stats)
+            (stats["items"],) = self._conn.execute("SELECT COUNT(*) FROM web_results").fetchone()
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        stats["ttl"] = self.ttl
+        stats["eviction"] = self.eviction
+        return stats
+
+
+class CachedWebRetriever(BaseRetriever):
+    """
+    웹 검색 retriever 앞단의 캐시 래퍼 (invoke / ainvoke 모두 지원)
+    캐시에 없을 때만 실제 retriever(Tavily / fixture) 호출, 빈 결과는 저장하지 않음
+    """
+
+    underlying: BaseRetriever
+    cache: WebSearchCache
+    name: str = "web"
+
+    model_config = {"arbitrary_types_allowed": True}
+
+    def _cache_key(self, query: str) -> str:
+        return self.cache.key(query, getattr(self.underlying, "k", None), self.name)
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        key = self._cache_key(query)
+        docs = self.cache.get(key)
+        if docs is not None:
+            print(f"    ⚡ 웹 검색 캐시 적중: {query}")
+            return docs
+        docs = self.underlying.invoke(query, config={"callbacks": run_manager.get_child()})
+        if docs:
+            self.cache.put(key, query, docs)
+        return docs
+
+    async def _aget_relevant_documents(
+        self, query: str, *, run_manager: AsyncCallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        key = self._cache_key(query)
+        docs = self.cache.get(key)
+        if docs is not None:
+            print(f"    ⚡ 웹 검색 캐시 적중: {query}")
+            return docs
+        docs = await self.underlying.ainvoke(query, config={"callbacks": run_manager.get_child()})
+        if docs:
+            self.cache.put(key, query, docs)
+        return docs
+
+    def stats(self) -> Dict[str, float]:
+        return self.cache.stats()
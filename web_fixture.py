@@ -0,0 +1,79 @@
+# Tavily 대신 사용하는 로컬 웹 검색 retriever (오프라인 테스트 / 부하 벤치마크용)
+"""
+WEB_RETRIEVER=fixture이면 get_web_retriever()가 Tavily 대신 이 retriever를 사용합니다.
+API 키, 네트워크, 유료 호출 없이 웹 검색 경로(다중 쿼리 검색, 추출, 캐시)를 그대로 실행할 수 있습니다.
+
+fixture 파일 (WEB_FIXTURE_PATH, 기본 ./web_search_fixture.json):
+    [
+        {"title": "...", "url": "https://...", "content": "...", "keywords": ["편입", "중앙대"]},
+        ...
+    ]
+
+- 쿼리와 제목/내용/키워드의 단어가 겹치는 정도로 점수를 매겨 상위 k개 반환 (Tavily처럼 metadata에 source / title / score)
+- 겹치는 문서가 없으면 빈 목록 (검색 결과 없음 경로 테스트)
+- WEB_FIXTURE_LATENCY초만큼 기다린 뒤 반환 (부하 벤치마크에서 실제 API 지연 시간 흉내)
+"""
+
+import asyncio
+import json
+import os
+import re
+import time
+from typing import Dict, List, Set
+
+from langchain_core.callbacks import AsyncCallbackManagerForRetrieverRun, CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+
+WEB_FIXTURE_PATH = os.getenv("WEB_FIXTURE_PATH", "./web_search_fixture.json")
+WEB_FIXTURE_LATENCY = float(os.getenv("WEB_FIXTURE_LATENCY", "0"))
+
+
+def _terms(text: str) -> Set[str]:
+    return {term for term in re.findall(r"\w+", text.lower()) if len(term) > 1}
+
+
+def load_fixture(path: str = WEB_FIXTURE_PATH) -> List[Dict]:
+    with open(path, encoding="utf-8") as f:
+        entries = json.load(f)
+    print(f" 웹 검색 fixture 로드: {len(entries)}개 문서 ({path})")
+    return entries
+
+
+class FixtureWebRetriever(BaseRetriever):
+    """fixture 문서에서 단어 겹침 점수로 검색하는 TavilySearchAPIRetriever 대체 retriever"""
+
+    entries: List[Dict]
+    k: int = 10
+    latency: float = WEB_FIXTURE_LATENCY
+
+    def _search(self, query: str) -> List[Document]:
+        query_terms = _terms(query)
+        scored = []
+        for entry in self.entries:
+            entry_terms = _terms(" ".join([entry.get("title", ""), entry.get("content", "")] + entry.get("keywords", [])))
+            overlap = len(query_terms & entry_terms)
+            if overlap:
+                scored.append((overlap / len(query_terms), entry))
+        scored.sort(key=lambda item: -item[0])
+
+        return [
+            Document(
+                page_content=entry.get("content", ""),
+                metadata={"source": entry.get("url", ""), "title": entry.get("title", "제목 없음"), "score": round(score, 3)},
+            )
+            for score, entry in scored[:self.k]
+        ]
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        if self.latency > 0:
+            time.sleep(self.latency)
+        return self._search(query)
+
+    async def _aget_relevant_documents(
+        self, query: str, *, run_manager: AsyncCallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        if self.latency > 0:
+            await asyncio.sleep(self.latency)
+        return self._search(query)